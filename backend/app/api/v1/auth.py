@@ -2,52 +2,90 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.core import deps, security
 from app.core.config import settings
 from app.core.database import get_db
-from app.models.core import User
+from app.core.query_budget import query_budget
+from app.models.core import User, Role
 from app.schemas.auth import Token
+from app.schemas.core import User as UserSchema
+from app.services.passwords import password_hasher
+from app.services.permissions import cache_user_permissions
 # No more deps import here
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login_access_token(
-    db: Session = Depends(get_db),
+@query_budget(7)
+async def login_access_token(
+    db: AsyncSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+    result = await db.execute(
+        select(User.id, User.password_hash).where(User.email == form_data.username)
+    )
+    credentials = result.first()
+    # bcrypt is CPU-bound; it runs in the password hashing pool. End the
+    # transaction first so no connection is held while waiting on it.
+    await db.rollback()
+    valid, new_hash = (False, None)
+    if credentials:
+        valid, new_hash = await password_hasher.verify(form_data.password, credentials.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
-    elif not user.is_active:
+    result = await db.execute(
+        select(User)
+        .options(selectinload(User.roles).selectinload(Role.permissions))
+        .where(User.id == credentials.id)
+    )
+    user = result.scalars().first()
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user",
         )
+    if new_hash:
+        # Stored with a different bcrypt cost; upgrade it transparently
+        user.password_hash = new_hash
+        await db.commit()
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    # Get all permission codes for this user
-    permissions = set()
-    for role in user.roles:
-        for perm in role.permissions:
-            permissions.add(perm.code)
-            
+    # Permissions and pv come from the same load: a cached set could predate
+    # a role change made by another process that already bumped the version
+    permissions = cache_user_permissions(user)
+    claims = None
+    if settings.AUTH_STATELESS_PRINCIPAL:
+        claims = {
+            "act": user.is_active,
+            "perms": sorted(permissions),
+            "pv": user.permissions_version or 0,
+        }
+
     return {
         "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id, expires_delta=access_token_expires, claims=claims
         ),
         "token_type": "bearer",
         "user": user,
-        "permissions": list(permissions)
+        "permissions": sorted(permissions)
     }
 
-@router.get("/me")
-def read_user_me(
+@router.get("/me", response_model=UserSchema)
+@query_budget(6)
+async def read_user_me(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    return current_user
+    result = await db.execute(
+        select(User)
+        .options(selectinload(User.roles).selectinload(Role.permissions))
+        .where(User.id == current_user.id)
+    )
+    return result.scalars().first()
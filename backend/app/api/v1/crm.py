@@ -1,99 +1,229 @@
+from datetime import datetime
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import deps
-from app.core.database import get_db
-from app.models.crm import Customer, Lead, Opportunity, OpportunityStage
+from app.core.cache import invalidate, invalidate_on_commit
+from app.core.database import get_db, get_unit_of_work
+from app.core.fields import Fields, FieldSelection
+from app.core.includes import Includes, IncludeSelection
+from app.core.pagination import CursorParams, paginate
+from app.core.query_budget import query_budget
+from app.core.responses import row_page
+from app.models.crm import Customer, DuplicateCluster, Lead, Opportunity, OpportunityStage
 from app.schemas.crm import (
-    Customer as CustomerSchema, CustomerCreate,
-    Lead as LeadSchema, LeadCreate,
-    Opportunity as OpportunitySchema, OpportunityCreate
+    Customer as CustomerSchema, CustomerCreate, CustomerCreated,
+    Lead as LeadSchema, LeadCreate, LeadCreated,
+    Opportunity as OpportunitySchema, OpportunityCreate,
+    DuplicateCandidate, DuplicateClusterMember
 )
+from app.schemas.bulk import BulkImportResult
+from app.schemas.pagination import Page
 from app.services.audit import log_action
+from app.services.bulk import bulk_insert, read_bulk_rows
+from app.services.dedupe import check_duplicates_on_create, find_duplicates
+from app.services.export import ExportFormat, created_between, export_response
 
 router = APIRouter()
 
+LEAD_INCLUDES = Includes({"customer": (Lead.customer,)})
+OPPORTUNITY_INCLUDES = Includes({"customer": (Opportunity.customer,)}, default=["customer"])
+CUSTOMER_FIELDS = Fields(Customer, CustomerSchema)
+LEAD_FIELDS = Fields(Lead, LeadSchema)
+OPPORTUNITY_FIELDS = Fields(Opportunity, OpportunitySchema)
+
 # Customers
-@router.get("/customers", response_model=List[CustomerSchema])
-def read_customers(
-    db: Session = Depends(get_db),
+@router.get("/customers", response_model=Page[CustomerSchema])
+@query_budget(4)
+async def read_customers(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    fields: FieldSelection = Depends(CUSTOMER_FIELDS),
+    current_user: Any = Depends(deps.PermissionChecker(["crm.customers.read"]))
+):
+    query = select(*fields.columns)
+    return row_page(await paginate(db, query, page, Customer.id, scalars=False))
+
+@router.get("/customers/export")
+@query_budget(4)
+async def export_customers(
+    format: ExportFormat = ExportFormat.CSV,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     current_user: Any = Depends(deps.PermissionChecker(["crm.customers.read"]))
 ):
-    return db.query(Customer).all()
+    query = select(*Customer.__table__.columns).order_by(Customer.id)
+    query = created_between(query, Customer.created_at, start, end)
+    return export_response(query, format, "customers")
 
-@router.post("/customers", response_model=CustomerSchema)
-def create_customer(
+@router.post("/customers", response_model=CustomerCreated)
+@query_budget(10)
+async def create_customer(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     cust_in: CustomerCreate,
+    allow_duplicate: bool = False,
     current_user: Any = Depends(deps.PermissionChecker(["crm.customers.write"]))
 ):
+    duplicates = await check_duplicates_on_create(db, "customer", cust_in, allow_duplicate)
     cust = Customer(**cust_in.dict())
     db.add(cust)
-    db.commit()
-    db.refresh(cust)
-    log_action(db, current_user.id, "CREATE", "customer", cust.id, {"name": cust.name})
+    await db.flush()
+    await log_action(db, current_user.id, "CREATE", "customer", cust.id, {"name": cust.name})
+    invalidate_on_commit(db, "dashboard")
+    cust.possible_duplicates = duplicates
     return cust
 
+@router.post("/customers/bulk", response_model=BulkImportResult)
+async def bulk_create_customers(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(deps.PermissionChecker(["crm.customers.write"]))
+):
+    rows = await read_bulk_rows(request)
+    result = await bulk_insert(
+        db, model=Customer, schema=CustomerCreate, rows=rows,
+        actor_id=current_user.id, entity_type="customer",
+    )
+    invalidate("dashboard")
+    return result
+
+@router.post("/customers/duplicates", response_model=List[DuplicateCandidate])
+@query_budget(4)
+async def check_customer_duplicates(
+    cust_in: CustomerCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(deps.PermissionChecker(["crm.customers.read"]))
+):
+    return await find_duplicates(db, "customer", cust_in)
+
+@router.get("/customers/duplicate-clusters", response_model=Page[DuplicateClusterMember])
+@query_budget(4)
+async def read_customer_duplicate_clusters(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    current_user: Any = Depends(deps.PermissionChecker(["crm.customers.read"]))
+):
+    query = select(DuplicateCluster).where(DuplicateCluster.entity_type == "customer")
+    return await paginate(db, query, page, DuplicateCluster.id)
+
 # Leads
-@router.get("/leads", response_model=List[LeadSchema])
-def read_leads(
-    db: Session = Depends(get_db),
+@router.get("/leads", response_model=Page[LeadSchema])
+@query_budget(4)
+async def read_leads(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    include: IncludeSelection = Depends(LEAD_INCLUDES),
+    fields: FieldSelection = Depends(LEAD_FIELDS),
     current_user: Any = Depends(deps.PermissionChecker(["crm.leads.read"]))
 ):
-    return db.query(Lead).all()
+    query = select(Lead).options(*include.options, *fields.options)
+    return fields.page(include.fill(await paginate(db, query, page, Lead.id)))
 
-@router.post("/leads", response_model=LeadSchema)
-def create_lead(
+@router.post("/leads", response_model=LeadCreated)
+@query_budget(9)
+async def create_lead(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     lead_in: LeadCreate,
+    allow_duplicate: bool = False,
     current_user: Any = Depends(deps.PermissionChecker(["crm.leads.write"]))
 ):
+    duplicates = await check_duplicates_on_create(db, "lead", lead_in, allow_duplicate)
     lead = Lead(**lead_in.dict())
     db.add(lead)
-    db.commit()
-    db.refresh(lead)
-    log_action(db, current_user.id, "CREATE", "lead", lead.id, {"name": lead.name})
+    await db.flush()
+    await log_action(db, current_user.id, "CREATE", "lead", lead.id, {"name": lead.name})
+    await db.refresh(lead, ["customer"])
+    lead.possible_duplicates = duplicates
     return lead
 
+@router.post("/leads/bulk", response_model=BulkImportResult)
+async def bulk_create_leads(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(deps.PermissionChecker(["crm.leads.write"]))
+):
+    rows = await read_bulk_rows(request)
+    return await bulk_insert(
+        db, model=Lead, schema=LeadCreate, rows=rows,
+        actor_id=current_user.id, entity_type="lead",
+    )
+
+@router.post("/leads/duplicates", response_model=List[DuplicateCandidate])
+@query_budget(4)
+async def check_lead_duplicates(
+    lead_in: LeadCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(deps.PermissionChecker(["crm.leads.read"]))
+):
+    return await find_duplicates(db, "lead", lead_in)
+
+@router.get("/leads/duplicate-clusters", response_model=Page[DuplicateClusterMember])
+@query_budget(4)
+async def read_lead_duplicate_clusters(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    current_user: Any = Depends(deps.PermissionChecker(["crm.leads.read"]))
+):
+    query = select(DuplicateCluster).where(DuplicateCluster.entity_type == "lead")
+    return await paginate(db, query, page, DuplicateCluster.id)
+
 # Opportunities
-@router.get("/opportunities", response_model=List[OpportunitySchema])
-def read_opportunities(
-    db: Session = Depends(get_db),
+@router.get("/opportunities", response_model=Page[OpportunitySchema])
+@query_budget(5)
+async def read_opportunities(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    include: IncludeSelection = Depends(OPPORTUNITY_INCLUDES),
+    fields: FieldSelection = Depends(OPPORTUNITY_FIELDS),
     current_user: Any = Depends(deps.PermissionChecker(["crm.opportunities.read"]))
 ):
-    return db.query(Opportunity).all()
+    query = select(Opportunity).options(*include.options, *fields.options)
+    return fields.page(include.fill(await paginate(db, query, page, Opportunity.id)))
+
+@router.get("/opportunities/export")
+@query_budget(4)
+async def export_opportunities(
+    format: ExportFormat = ExportFormat.CSV,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: Any = Depends(deps.PermissionChecker(["crm.opportunities.read"]))
+):
+    query = select(*Opportunity.__table__.columns).order_by(Opportunity.id)
+    query = created_between(query, Opportunity.created_at, start, end)
+    return export_response(query, format, "opportunities")
 
 @router.post("/opportunities", response_model=OpportunitySchema)
-def create_opportunity(
+@query_budget(8)
+async def create_opportunity(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     opp_in: OpportunityCreate,
     current_user: Any = Depends(deps.PermissionChecker(["crm.opportunities.write"]))
 ):
     opp = Opportunity(**opp_in.dict())
     db.add(opp)
-    db.commit()
-    db.refresh(opp)
-    log_action(db, current_user.id, "CREATE", "opportunity", opp.id, {"title": opp.title})
+    await db.flush()
+    await log_action(db, current_user.id, "CREATE", "opportunity", opp.id, {"title": opp.title})
+    await db.refresh(opp, ["value", "customer"])
     return opp
 
 @router.post("/opportunities/{id}/stage")
-def update_opportunity_stage(
+@query_budget(6)
+async def update_opportunity_stage(
     id: int,
     stage: OpportunityStage,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     current_user: Any = Depends(deps.PermissionChecker(["crm.opportunities.write"]))
 ):
-    opp = db.query(Opportunity).filter(Opportunity.id == id).first()
+    opp = await db.get(Opportunity, id)
     if not opp:
         raise HTTPException(status_code=404, detail="Opportunity not found")
     
     old_stage = opp.stage
     opp.stage = stage
-    db.commit()
-    db.refresh(opp)
-    
-    log_action(db, current_user.id, "UPDATE_STAGE", "opportunity", opp.id, {"from": old_stage, "to": stage})
+    await log_action(db, current_user.id, "UPDATE_STAGE", "opportunity", opp.id, {"from": old_stage, "to": stage})
+    await db.flush()
     return opp
@@ -1,39 +1,67 @@
 from typing import Any, Dict, List
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import deps
+from app.core.cache import cached_response
 from app.core.database import get_db
-from app.models.core import User
-from app.models.hr import Employee, LeaveRequest
-from app.models.inventory import Product, InventoryTransaction
-from app.models.crm import Customer
-from app.schemas.inventory import InventoryTransaction as TransactionSchema
+from app.core.pagination import CursorParams, paginate
+from app.core.query_budget import query_budget
+from app.models.hr import LeaveRequest
+from app.models.inventory import InventoryTransaction, StockAlert
+from app.schemas.inventory import InventoryTransaction as TransactionSchema, StockAlert as StockAlertSchema
+from app.schemas.pagination import Page
 from app.schemas.hr import LeaveRequest as LeaveRequestSchema
+from app.services.counters import get_counters
 
 router = APIRouter()
 
 @router.get("/summary")
-def get_summary(
-    db: Session = Depends(get_db),
+@query_budget(4)
+@cached_response("dashboard")
+async def get_summary(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(deps.PermissionChecker(["dashboard.read"]))
 ):
+    counts = await get_counters(db)
     return {
-        "users_count": db.query(User).count(),
-        "employees_count": db.query(Employee).count(),
-        "products_count": db.query(Product).count(),
-        "customers_count": db.query(Customer).count(),
+        "users_count": counts["users"],
+        "employees_count": counts["employees"],
+        "products_count": counts["products"],
+        "customers_count": counts["customers"],
     }
 
 @router.get("/recent-activity")
-def get_recent_activity(
-    db: Session = Depends(get_db),
+@query_budget(5)
+@cached_response("dashboard")
+async def get_recent_activity(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(deps.PermissionChecker(["dashboard.read"]))
 ):
-    recent_transactions = db.query(InventoryTransaction).order_by(InventoryTransaction.created_at.desc()).limit(10).all()
-    recent_leave_requests = db.query(LeaveRequest).order_by(LeaveRequest.created_at.desc()).limit(10).all()
+    result = await db.execute(
+        select(InventoryTransaction).order_by(InventoryTransaction.created_at.desc()).limit(10)
+    )
+    recent_transactions = result.scalars().all()
+    result = await db.execute(
+        select(LeaveRequest).order_by(LeaveRequest.created_at.desc()).limit(10)
+    )
+    recent_leave_requests = result.scalars().all()
     
     return {
         "recent_transactions": recent_transactions,
         "recent_leave_requests": recent_leave_requests
     }
+
+@router.get("/stock-alerts", response_model=Page[StockAlertSchema])
+@query_budget(4)
+@cached_response("dashboard")
+async def get_stock_alerts(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    current_user: Any = Depends(deps.PermissionChecker(["dashboard.read"]))
+):
+    # Low-stock threshold crossings, newest first
+    return await paginate(db, select(StockAlert), page, StockAlert.id, descending=True)
@@ -1,123 +1,204 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.core import deps
-from app.core.database import get_db
+from app.core.cache import cached_response, invalidate, invalidate_on_commit
+from app.core.database import get_db, get_unit_of_work
+from app.core.fields import Fields, FieldSelection
+from app.core.includes import Includes, IncludeSelection
+from app.core.pagination import CursorParams, paginate
+from app.core.query_budget import query_budget
+from app.core.responses import row_page
 from app.models.hr import Department, Employee, LeaveRequest, LeaveStatus
 from app.schemas.hr import (
     Department as DepartmentSchema, DepartmentCreate,
     Employee as EmployeeSchema, EmployeeCreate,
     LeaveRequest as LeaveRequestSchema, LeaveRequestCreate, LeaveRequestUpdate
 )
+from app.schemas.bulk import BulkImportResult
+from app.schemas.pagination import Page
 from app.services.audit import log_action
+from app.services.bulk import bulk_insert, read_bulk_rows
 from datetime import datetime
 
 router = APIRouter()
 
+# Relationships serialized by LeaveRequestSchema (employee -> department)
+LEAVE_REQUEST_LOAD = selectinload(LeaveRequest.employee).selectinload(Employee.department)
+
+EMPLOYEE_INCLUDES = Includes({"department": (Employee.department,)}, default=["department"])
+LEAVE_REQUEST_INCLUDES = Includes(
+    {
+        "employee": (LeaveRequest.employee,),
+        "employee.department": (LeaveRequest.employee, Employee.department),
+    },
+    default=["employee.department"],
+)
+DEPARTMENT_FIELDS = Fields(Department, DepartmentSchema)
+EMPLOYEE_FIELDS = Fields(Employee, EmployeeSchema)
+LEAVE_REQUEST_FIELDS = Fields(LeaveRequest, LeaveRequestSchema)
+
+async def _get_leave_request(db: AsyncSession, id: int) -> LeaveRequest:
+    result = await db.execute(
+        select(LeaveRequest).options(LEAVE_REQUEST_LOAD).where(LeaveRequest.id == id)
+    )
+    leave = result.scalars().first()
+    if not leave:
+        raise HTTPException(status_code=404, detail="Leave request not found")
+    return leave
+
 # Departments
-@router.get("/departments", response_model=List[DepartmentSchema])
-def read_departments(
-    db: Session = Depends(get_db),
+@router.get("/departments", response_model=Page[DepartmentSchema])
+@query_budget(4)
+@cached_response("departments")
+async def read_departments(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    fields: FieldSelection = Depends(DEPARTMENT_FIELDS),
     current_user: Any = Depends(deps.PermissionChecker(["hr.departments.read"]))
 ):
-    return db.query(Department).all()
+    query = select(*fields.columns)
+    return row_page(await paginate(db, query, page, Department.id, scalars=False))
 
 @router.post("/departments", response_model=DepartmentSchema)
-def create_department(
+@query_budget(4)
+async def create_department(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     dept_in: DepartmentCreate,
     current_user: Any = Depends(deps.PermissionChecker(["hr.departments.write"]))
 ):
     dept = Department(name=dept_in.name)
     db.add(dept)
-    db.commit()
-    db.refresh(dept)
+    await db.flush()
+    invalidate_on_commit(db, "departments")
     return dept
 
 # Employees
-@router.get("/employees", response_model=List[EmployeeSchema])
-def read_employees(
-    db: Session = Depends(get_db),
+@router.get("/employees", response_model=Page[EmployeeSchema])
+@query_budget(5)
+async def read_employees(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    include: IncludeSelection = Depends(EMPLOYEE_INCLUDES),
+    fields: FieldSelection = Depends(EMPLOYEE_FIELDS),
     current_user: Any = Depends(deps.PermissionChecker(["hr.employees.read"]))
 ):
-    return db.query(Employee).all()
+    query = select(Employee).options(*include.options, *fields.options)
+    return fields.page(include.fill(await paginate(db, query, page, Employee.id)))
+
+@router.get("/employees/me", response_model=EmployeeSchema)
+@query_budget(4)
+async def read_my_employee(
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(deps.get_current_active_user)
+):
+    result = await db.execute(
+        select(Employee).options(selectinload(Employee.department)).where(Employee.user_id == current_user.id)
+    )
+    emp = result.scalars().first()
+    if not emp:
+        raise HTTPException(status_code=404, detail="No employee record linked to this user")
+    return emp
 
 @router.post("/employees", response_model=EmployeeSchema)
-def create_employee(
+@query_budget(10)
+async def create_employee(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     emp_in: EmployeeCreate,
     current_user: Any = Depends(deps.PermissionChecker(["hr.employees.write"]))
 ):
     emp = Employee(**emp_in.dict())
     db.add(emp)
-    db.commit()
-    db.refresh(emp)
-    log_action(db, current_user.id, "CREATE", "employee", emp.id, {"name": emp.full_name})
+    await db.flush()
+    await log_action(db, current_user.id, "CREATE", "employee", emp.id, {"name": emp.full_name})
+    invalidate_on_commit(db, "dashboard")
+    await db.refresh(emp, ["department"])
     return emp
 
+@router.post("/employees/bulk", response_model=BulkImportResult)
+async def bulk_create_employees(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(deps.PermissionChecker(["hr.employees.write"]))
+):
+    rows = await read_bulk_rows(request)
+    result = await bulk_insert(
+        db, model=Employee, schema=EmployeeCreate, rows=rows,
+        actor_id=current_user.id, entity_type="employee",
+    )
+    invalidate("dashboard")
+    return result
+
 # Leave Requests
-@router.get("/leave-requests", response_model=List[LeaveRequestSchema])
-def read_leave_requests(
-    db: Session = Depends(get_db),
+@router.get("/leave-requests", response_model=Page[LeaveRequestSchema])
+@query_budget(6)
+async def read_leave_requests(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    include: IncludeSelection = Depends(LEAVE_REQUEST_INCLUDES),
+    fields: FieldSelection = Depends(LEAVE_REQUEST_FIELDS),
     current_user: Any = Depends(deps.get_current_active_user)
 ):
     # RBAC logic: Employee sees own, Manager/Admin see all
-    user_permissions = {p.code for r in current_user.roles for p in r.permissions}
-    if "hr.leave.approve" in user_permissions:
-        return db.query(LeaveRequest).all()
-    
-    # Get employee record for this user
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
-    if not employee:
-        return []
-    return db.query(LeaveRequest).filter(LeaveRequest.employee_id == employee.id).all()
+    user_permissions = await deps.get_effective_permissions(db, current_user)
+    query = select(LeaveRequest).options(*include.options, *fields.options)
+    if "hr.leave.approve" not in user_permissions:
+        # Get employee record for this user
+        result = await db.execute(select(Employee.id).where(Employee.user_id == current_user.id))
+        employee_id = result.scalar()
+        if employee_id is None:
+            return fields.page({"items": [], "next_cursor": None})
+        query = query.where(LeaveRequest.employee_id == employee_id)
+    return fields.page(include.fill(await paginate(db, query, page, LeaveRequest.id)))
 
 @router.post("/leave-requests", response_model=LeaveRequestSchema)
-def create_leave_request(
+@query_budget(8)
+async def create_leave_request(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     leave_in: LeaveRequestCreate,
     current_user: Any = Depends(deps.PermissionChecker(["hr.leave.submit"]))
 ):
     leave = LeaveRequest(**leave_in.dict(), status=LeaveStatus.PENDING)
     db.add(leave)
-    db.commit()
-    db.refresh(leave)
-    log_action(db, current_user.id, "SUBMIT", "leave_request", leave.id)
-    return leave
+    await db.flush()
+    await log_action(db, current_user.id, "SUBMIT", "leave_request", leave.id)
+    invalidate_on_commit(db, "dashboard")
+    return await _get_leave_request(db, leave.id)
 
 @router.post("/leave-requests/{id}/approve", response_model=LeaveRequestSchema)
-def approve_leave_request(
+@query_budget(8)
+async def approve_leave_request(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     current_user: Any = Depends(deps.PermissionChecker(["hr.leave.approve"]))
 ):
-    leave = db.query(LeaveRequest).filter(LeaveRequest.id == id).first()
-    if not leave:
-        raise HTTPException(status_code=404, detail="Leave request not found")
+    leave = await _get_leave_request(db, id)
     leave.status = LeaveStatus.APPROVED
     leave.reviewed_by_user_id = current_user.id
     leave.reviewed_at = datetime.now()
-    db.commit()
-    db.refresh(leave)
-    log_action(db, current_user.id, "APPROVE", "leave_request", leave.id)
+    await log_action(db, current_user.id, "APPROVE", "leave_request", leave.id)
+    invalidate_on_commit(db, "dashboard")
+    await db.flush()
     return leave
 
 @router.post("/leave-requests/{id}/reject", response_model=LeaveRequestSchema)
-def reject_leave_request(
+@query_budget(8)
+async def reject_leave_request(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     current_user: Any = Depends(deps.PermissionChecker(["hr.leave.approve"]))
 ):
-    leave = db.query(LeaveRequest).filter(LeaveRequest.id == id).first()
-    if not leave:
-        raise HTTPException(status_code=404, detail="Leave request not found")
+    leave = await _get_leave_request(db, id)
     leave.status = LeaveStatus.REJECTED
     leave.reviewed_by_user_id = current_user.id
     leave.reviewed_at = datetime.now()
-    db.commit()
-    db.refresh(leave)
-    log_action(db, current_user.id, "REJECT", "leave_request", leave.id)
+    await log_action(db, current_user.id, "REJECT", "leave_request", leave.id)
+    invalidate_on_commit(db, "dashboard")
+    await db.flush()
     return leave
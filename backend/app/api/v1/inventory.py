@@ -1,62 +1,99 @@
+from datetime import date, datetime, time, timedelta
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import deps
-from app.core.database import get_db
+from app.core.cache import cached_response, invalidate, invalidate_on_commit
+from app.core.database import get_db, get_unit_of_work
+from app.core.fields import Fields, FieldSelection
+from app.core.includes import Includes, IncludeSelection
+from app.core.pagination import CursorParams, paginate
+from app.core.query_budget import query_budget
+from app.core.responses import row_page
 from app.models.inventory import Product, InventoryTransaction, TransactionType
 from app.schemas.inventory import (
     Product as ProductSchema, ProductCreate,
-    InventoryTransaction as TransactionSchema, TransactionCreate
+    InventoryTransaction as TransactionSchema, TransactionCreate,
+    TransactionBatchCreate, TransactionBatchResult, StockLevel
 )
+from app.schemas.bulk import BulkImportResult
+from app.schemas.pagination import Page
 from app.services.audit import log_action
+from app.services.bulk import bulk_insert, read_bulk_rows
+from app.services.export import ExportFormat, created_between, export_response
+from app.services.stock import stock_delta, with_low_stock_flag, write_stock_levels
+from app.services.stock_history import stock_as_of
 
 router = APIRouter()
 
-@router.get("/products", response_model=List[ProductSchema])
-def read_products(
-    db: Session = Depends(get_db),
+TRANSACTION_INCLUDES = Includes({"product": (InventoryTransaction.product,)}, default=["product"])
+PRODUCT_FIELDS = Fields(Product, ProductSchema)
+TRANSACTION_FIELDS = Fields(InventoryTransaction, TransactionSchema)
+
+@router.get("/products", response_model=Page[ProductSchema])
+@query_budget(4)
+@cached_response("products")
+async def read_products(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    fields: FieldSelection = Depends(PRODUCT_FIELDS),
     current_user: Any = Depends(deps.PermissionChecker(["inv.products.read"]))
 ):
-    return db.query(Product).all()
+    query = select(*fields.columns)
+    return row_page(await paginate(db, query, page, Product.id, scalars=False))
 
 @router.post("/products", response_model=ProductSchema)
-def create_product(
+@query_budget(8)
+async def create_product(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     prod_in: ProductCreate,
     current_user: Any = Depends(deps.PermissionChecker(["inv.products.write"]))
 ):
     prod = Product(**prod_in.dict())
     db.add(prod)
-    db.commit()
-    db.refresh(prod)
-    log_action(db, current_user.id, "CREATE", "product", prod.id, {"sku": prod.sku})
+    await db.flush()
+    await log_action(db, current_user.id, "CREATE", "product", prod.id, {"sku": prod.sku})
+    invalidate_on_commit(db, "products", "dashboard")
     return prod
 
+@router.post("/products/bulk", response_model=BulkImportResult)
+async def bulk_create_products(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(deps.PermissionChecker(["inv.products.write"]))
+):
+    rows = await read_bulk_rows(request)
+    result = await bulk_insert(
+        db, model=Product, schema=ProductCreate, rows=rows,
+        actor_id=current_user.id, entity_type="product", unique_field="sku",
+        prepare=with_low_stock_flag,
+    )
+    invalidate("products", "dashboard")
+    return result
+
 @router.post("/transactions", response_model=TransactionSchema)
-def create_transaction(
+@query_budget(8)
+async def create_transaction(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     trans_in: TransactionCreate,
     current_user: Any = Depends(deps.PermissionChecker(["inv.stock.transact"]))
 ):
-    product = db.query(Product).filter(Product.id == trans_in.product_id).with_for_update().first()
+    result = await db.execute(
+        select(Product).where(Product.id == trans_in.product_id).with_for_update()
+    )
+    product = result.scalars().first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     # Calculate new stock
-    new_stock = product.current_stock
-    if trans_in.type == TransactionType.IN:
-        new_stock += trans_in.quantity
-    elif trans_in.type == TransactionType.OUT:
-        new_stock -= trans_in.quantity
-    elif trans_in.type == TransactionType.ADJUSTMENT:
-        new_stock = trans_in.quantity # For simplicity, adjustment sets the absolute value or we could do relative. 
-        # Requirement says "ADJUSTMENT can increase/decrease but must not go negative". 
-        # Let's treat it as relative if quantity is positive/negative, or absolute. 
-        # Actually most ERPs treat adjustment as "set to this value" or "add this much". 
-        # Let's assume relative (add quantity).
-        new_stock = product.current_stock + trans_in.quantity
+    try:
+        new_stock = product.current_stock + stock_delta(trans_in.type, trans_in.quantity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if new_stock < 0:
         raise HTTPException(status_code=400, detail="Transaction would result in negative stock")
@@ -68,28 +105,119 @@ def create_transaction(
         actor_user_id=current_user.id
     )
     db.add(trans)
-    db.commit()
-    db.refresh(trans)
-    
-    log_action(db, current_user.id, "TRANSACT", "product", product.id, {"type": trans_in.type, "qty": trans_in.quantity})
+    await log_action(db, current_user.id, "TRANSACT", "product", product.id, {"type": trans_in.type, "qty": trans_in.quantity})
+    invalidate_on_commit(db, "products", "dashboard")
+    await db.flush()
+    await db.refresh(trans, ["product"])
     
     return trans
 
-@router.get("/transactions", response_model=List[TransactionSchema])
-def read_transactions(
+@router.post("/transactions/batch", response_model=TransactionBatchResult)
+@query_budget(8)
+async def create_transaction_batch(
+    *,
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
+    batch_in: TransactionBatchCreate,
+    current_user: Any = Depends(deps.PermissionChecker(["inv.stock.transact"]))
+):
+    # Lock every product touched by the batch in one statement, in ascending id
+    # order, so concurrent batches acquire row locks in the same order and
+    # cannot deadlock each other.
+    product_ids = sorted({line.product_id for line in batch_in.lines})
+    result = await db.execute(
+        select(Product).where(Product.id.in_(product_ids)).order_by(Product.id).with_for_update()
+    )
+    products = {p.id: p for p in result.scalars().all()}
+    missing = [pid for pid in product_ids if pid not in products]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Products not found: {missing}")
+
+    # Validate the whole batch in memory before writing anything
+    stock = {pid: p.current_stock for pid, p in products.items()}
+    for index, line in enumerate(batch_in.lines):
+        try:
+            stock[line.product_id] += stock_delta(line.type, line.quantity)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Line {index + 1}: {e}")
+        if stock[line.product_id] < 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Line {index + 1}: transaction would result in negative stock",
+            )
+
+    await write_stock_levels(db, products, stock)
+    # executemany INSERT; ids are not needed back, so no per-row round trips
+    await db.execute(
+        insert(InventoryTransaction),
+        [dict(line.dict(), actor_user_id=current_user.id) for line in batch_in.lines],
+    )
+    await log_action(
+        db, current_user.id, "TRANSACT_BATCH", "product", None,
+        {"lines": len(batch_in.lines), "products": product_ids},
+    )
+    invalidate_on_commit(db, "products", "dashboard")
+    await db.flush()
+    return {"count": len(batch_in.lines), "products": [products[pid] for pid in product_ids]}
+
+@router.get("/transactions", response_model=Page[TransactionSchema])
+@query_budget(5)
+async def read_transactions(
+    product_id: Optional[int] = None,
+    page: CursorParams = Depends(),
+    include: IncludeSelection = Depends(TRANSACTION_INCLUDES),
+    fields: FieldSelection = Depends(TRANSACTION_FIELDS),
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(deps.PermissionChecker(["inv.products.read"]))
+):
+    query = select(InventoryTransaction).options(*include.options, *fields.options)
+    if product_id:
+        query = query.where(InventoryTransaction.product_id == product_id)
+    # Newest first; ids are assigned in insertion order so they track created_at
+    return fields.page(include.fill(await paginate(db, query, page, InventoryTransaction.id, descending=True)))
+
+@router.get("/transactions/export")
+@query_budget(4)
+async def export_transactions(
+    format: ExportFormat = ExportFormat.CSV,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    product_id: Optional[int] = None,
+    current_user: Any = Depends(deps.PermissionChecker(["inv.products.read"]))
+):
+    query = select(*InventoryTransaction.__table__.columns).order_by(InventoryTransaction.id)
+    if product_id:
+        query = query.where(InventoryTransaction.product_id == product_id)
+    query = created_between(query, InventoryTransaction.created_at, start, end)
+    return export_response(query, format, "inventory_transactions")
+
+@router.get("/stock-as-of", response_model=Page[StockLevel])
+@query_budget(9)
+async def read_stock_as_of(
+    date: date,
     product_id: Optional[int] = None,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    page: CursorParams = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_user: Any = Depends(deps.PermissionChecker(["inv.products.read"]))
 ):
-    query = db.query(InventoryTransaction)
+    # Closing stock of the given day, for one product or a page of all of them
+    at = datetime.combine(date, time.min) + timedelta(days=1)
+    query = select(Product)
     if product_id:
-        query = query.filter(InventoryTransaction.product_id == product_id)
-    return query.order_by(InventoryTransaction.created_at.desc()).limit(limit).all()
+        query = query.where(Product.id == product_id)
+    result = await paginate(db, query, page, Product.id)
+    stock = await stock_as_of(db, result["items"], at)
+    result["items"] = [
+        {"product_id": p.id, "sku": p.sku, "stock": stock.get(p.id, 0)} for p in result["items"]
+    ]
+    return result
 
-@router.get("/low-stock", response_model=List[ProductSchema])
-def read_low_stock(
-    db: Session = Depends(get_db),
+@router.get("/low-stock", response_model=Page[ProductSchema])
+@query_budget(4)
+async def read_low_stock(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    fields: FieldSelection = Depends(PRODUCT_FIELDS),
     current_user: Any = Depends(deps.PermissionChecker(["inv.products.read"]))
 ):
-    return db.query(Product).filter(Product.current_stock <= Product.low_stock_threshold).all()
+    query = select(*fields.columns).where(Product.is_low_stock)
+    return row_page(await paginate(db, query, page, Product.id, scalars=False))
@@ -0,0 +1,42 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import deps
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.query_budget import query_budget
+from app.schemas.search import SearchResults
+from app.services.search import SEARCH_TYPES, search_documents
+
+router = APIRouter()
+
+@router.get("/", response_model=SearchResults)
+@query_budget(5)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = Query(
+        None, description=f"Comma-separated entity types ({', '.join(SEARCH_TYPES)}); all readable ones when omitted"
+    ),
+    limit: int = Query(settings.SEARCH_DEFAULT_LIMIT, ge=1, le=settings.SEARCH_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    current_user: Any = Depends(deps.get_current_active_user),
+):
+    permissions = await deps.get_effective_permissions(db, current_user)
+    if types is None:
+        # Only the types the caller may read
+        requested = [name for name, spec in SEARCH_TYPES.items() if spec.permission in permissions]
+    else:
+        requested = list(dict.fromkeys(name.strip() for name in types.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in SEARCH_TYPES]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown types: {', '.join(unknown)}. Allowed: {', '.join(SEARCH_TYPES)}",
+            )
+        for name in requested:
+            if SEARCH_TYPES[name].permission not in permissions:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"Missing permission: {SEARCH_TYPES[name].permission}",
+                )
+    return {"items": await search_documents(db, q, requested, limit)}
@@ -1,56 +1,89 @@
-from typing import Any, List
+from datetime import datetime
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core import deps, security
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import deps
+from app.core.cache import invalidate_on_commit
+from app.core.database import get_db, get_unit_of_work
+from app.core.fields import Fields, FieldSelection
+from app.core.includes import Includes, IncludeSelection
+from app.core.pagination import CursorParams, paginate
+from app.core.query_budget import query_budget
+from app.core.responses import row_page
 from app.models.core import User, Role, AuditLog
 from app.schemas.core import User as UserSchema, UserCreate, UserUpdate, AuditLog as AuditLogSchema
+from app.schemas.pagination import Page
 from app.services.audit import log_action
+from app.services.passwords import password_hasher
+from app.services.export import ExportFormat, created_between, export_response
 
 router = APIRouter()
 
-@router.get("/", response_model=List[UserSchema])
-def read_users(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+USER_INCLUDES = Includes(
+    {"roles": (User.roles,), "roles.permissions": (User.roles, Role.permissions)},
+    default=["roles.permissions"],
+)
+AUDIT_LOG_FIELDS = Fields(AuditLog, AuditLogSchema)
+
+@router.get("/", response_model=Page[UserSchema])
+@query_budget(6)
+async def read_users(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    include: IncludeSelection = Depends(USER_INCLUDES),
     current_user: User = Depends(deps.PermissionChecker(["users.read"]))
 ) -> Any:
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    query = select(User).options(*include.options)
+    return include.fill(await paginate(db, query, page, User.id))
 
 @router.post("/", response_model=UserSchema)
-def create_user(
+@query_budget(8)
+async def create_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_unit_of_work, scope="function"),
     user_in: UserCreate,
     current_user: User = Depends(deps.PermissionChecker(["users.write"]))
 ) -> Any:
-    user = db.query(User).filter(User.email == user_in.email).first()
-    if user:
+    result = await db.execute(select(User.id).where(User.email == user_in.email))
+    if result.first():
         raise HTTPException(
             status_code=400,
             detail="The user with this username already exists in the system.",
         )
     db_obj = User(
         email=user_in.email,
-        password_hash=security.get_password_hash(user_in.password),
-        is_active=user_in.is_active
+        password_hash=await password_hasher.hash(user_in.password),
+        is_active=user_in.is_active,
+        roles=[],
     )
     db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    
-    log_action(db, current_user.id, "CREATE", "user", db_obj.id, {"email": db_obj.email})
+    await db.flush()
+    await log_action(db, current_user.id, "CREATE", "user", db_obj.id, {"email": db_obj.email})
+    invalidate_on_commit(db, "dashboard")
     
     return db_obj
 
-@router.get("/audit-logs", response_model=List[AuditLogSchema])
-def read_audit_logs(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+@router.get("/audit-logs", response_model=Page[AuditLogSchema])
+@query_budget(4)
+async def read_audit_logs(
+    db: AsyncSession = Depends(get_db),
+    page: CursorParams = Depends(),
+    fields: FieldSelection = Depends(AUDIT_LOG_FIELDS),
+    current_user: User = Depends(deps.PermissionChecker(["audit.read"]))
+) -> Any:
+    # Newest first; ids are assigned in insertion order so they track created_at
+    query = select(*fields.columns)
+    return row_page(await paginate(db, query, page, AuditLog.id, descending=True, scalars=False))
+
+@router.get("/audit-logs/export")
+@query_budget(4)
+async def export_audit_logs(
+    format: ExportFormat = ExportFormat.CSV,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     current_user: User = Depends(deps.PermissionChecker(["audit.read"]))
 ) -> Any:
-    logs = db.query(AuditLog).order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
-    return logs
+    query = select(*AuditLog.__table__.columns).order_by(AuditLog.id)
+    query = created_between(query, AuditLog.created_at, start, end)
+    return export_response(query, format, "audit_logs")
@@ -0,0 +1,135 @@
+import functools
+import hashlib
+import json
+from typing import Dict, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core import deps
+from app.core.config import settings
+from app.services.permissions import TTLCache
+
+# Per-route response cache. Entries hold the serialized body and its strong
+# ETag, keyed on path, query string and the caller's permission set. The cache
+# is per process: writes invalidate it locally, other workers converge within
+# the TTL. Each namespace also has a generation, bumped on invalidation: a
+# response rendered by a transaction that began before a bump is served but
+# not stored, so a slow reader cannot re-cache data from before the write.
+
+_PENDING_KEY = "response_cache_invalidations"
+_GENERATIONS_KEY = "response_cache_generations"
+_caches: Dict[str, TTLCache] = {}
+_generations: Dict[str, int] = {}
+_adapters: Dict[int, TypeAdapter] = {}
+
+
+class CachedBody:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def _serialize(request: Request, result) -> bytes:
+    route = request.scope.get("route")
+    response_model = getattr(route, "response_model", None)
+    if response_model is None:
+        return json.dumps(
+            jsonable_encoder(result), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+    adapter = _adapters.get(id(route))
+    if adapter is None:
+        adapter = _adapters[id(route)] = TypeAdapter(response_model)
+    return adapter.dump_json(adapter.validate_python(result, from_attributes=True), by_alias=True)
+
+
+def _response(cached: CachedBody, request: Request) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def cached_response(namespace: str, ttl: Optional[float] = None):
+    """Cache a GET endpoint's JSON response under namespace.
+
+    The endpoint must declare `request`, `db` and `current_user` parameters;
+    the permission checks run as usual before the cache is consulted. Write
+    paths drop the namespace with invalidate_on_commit(); a response is only
+    stored if the namespace was not invalidated since db's transaction began.
+    """
+    cache = _caches.setdefault(
+        namespace,
+        TTLCache(
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS if ttl is None else ttl,
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ),
+    )
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED:
+                return await endpoint(*args, **kwargs)
+            request: Request = kwargs["request"]
+            scope = await deps.get_effective_permissions(kwargs["db"], kwargs["current_user"])
+            key = (request.url.path, tuple(sorted(request.query_params.multi_items())), scope)
+            cached = cache.get(key)
+            if cached is None:
+                # Generation as of the transaction start, or now if none began
+                generation = kwargs["db"].info.get(_GENERATIONS_KEY, _generations).get(namespace, 0)
+                result = await endpoint(*args, **kwargs)
+                # Endpoints may render their own body (e.g. ?fields= pages)
+                body = result.body if isinstance(result, Response) else _serialize(request, result)
+                cached = CachedBody(body)
+                if _generations.get(namespace, 0) == generation:
+                    cache.set(key, cached)
+            return _response(cached, request)
+        return wrapper
+    return decorator
+
+
+def invalidate(*namespaces: str) -> None:
+    for namespace in namespaces:
+        _generations[namespace] = _generations.get(namespace, 0) + 1
+        cache = _caches.get(namespace)
+        if cache is not None:
+            cache.invalidate()
+
+
+def invalidate_on_commit(db, *namespaces: str) -> None:
+    """Drop the namespaces once db commits.
+
+    Bumping the generations also keeps requests whose transaction began
+    before the commit from storing what they read.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update(namespaces)
+
+
+@event.listens_for(Session, "after_begin")
+def _record_generations(session, transaction, connection):
+    session.info[_GENERATIONS_KEY] = dict(_generations)
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_invalidations(session):
+    session.info.pop(_GENERATIONS_KEY, None)
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        invalidate(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop(_GENERATIONS_KEY, None)
+    session.info.pop(_PENDING_KEY, None)
@@ -7,7 +7,101 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = "SET_YOUR_SECRET_KEY"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+
+    # Effective-permission cache used by PermissionChecker
+    PERMISSION_CACHE_TTL_SECONDS: int = 300
+    PERMISSION_CACHE_MAX_ENTRIES: int = 10000
+
+    # Stateless principal mode: tokens carry is_active, permission codes and the
+    # user's permissions_version, so requests are authorized without loading
+    # the User row. The version is re-checked from an in-process cache.
+    AUTH_STATELESS_PRINCIPAL: bool = False
+    PRINCIPAL_VERSION_TTL_SECONDS: int = 30
     
+    # Password hashing: bcrypt cost, and the dedicated process pool that runs
+    # it (0 workers runs it on the shared threadpool). Calls beyond
+    # PASSWORD_HASH_MAX_PENDING in flight are refused with 503.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Keyset pagination for list endpoints
+    PAGE_DEFAULT_LIMIT: int = 100
+    PAGE_MAX_LIMIT: int = 500
+
+    # Rows fetched per server-side cursor batch by the /export endpoints
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Bulk import endpoints: rows validated and inserted per chunk, one commit each
+    BULK_CHUNK_SIZE: int = 1000
+    BULK_MAX_ROWS: int = 200000
+
+    # Audit logging: "transactional" writes the audit row in the caller's
+    # transaction; "buffered" queues it for a background bulk writer once
+    # that transaction commits (counts on /metrics as audit_buffer_*).
+    AUDIT_MODE: str = "transactional"
+    AUDIT_BUFFER_MAX_SIZE: int = 10000
+    AUDIT_FLUSH_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 0.05
+
+    # Per-route response cache (dashboard, reference lists) with ETag/304
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+
+    # Prometheus metrics on /metrics (request and SQL instrumentation)
+    METRICS_ENABLED: bool = True
+
+    # Per-endpoint SQL statement budgets (@query_budget): QUERY_DEBUG adds an
+    # X-Query-Count header and logs requests over budget; QUERY_BUDGET_STRICT
+    # raises QueryBudgetExceeded instead (tests, CI)
+    QUERY_DEBUG: bool = False
+    QUERY_BUDGET_STRICT: bool = False
+
+    # Response compression: gzip, plus br / zstd when the brotli / zstandard
+    # packages are installed. Complete bodies below the minimum size are sent
+    # as-is; streamed exports are compressed chunk by chunk unless disabled.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_STREAMING: bool = True
+
+    # /search over customers, leads, products and employees, backed by the
+    # search_documents full-text index (maintained on write). The trigram
+    # index adds typo-tolerant matches; it keeps every indexed word in memory
+    # and follows search_documents every SEARCH_SYNC_INTERVAL_SECONDS, a job
+    # that also backfills an empty index (0 disables it).
+    SEARCH_DEFAULT_LIMIT: int = 20
+    SEARCH_MAX_LIMIT: int = 100
+    SEARCH_TRIGRAM_ENABLED: bool = True
+    SEARCH_TRIGRAM_MIN_SIMILARITY: float = 0.4
+    SEARCH_SYNC_INTERVAL_SECONDS: float = 5.0
+
+    # Customer / lead duplicate detection. Blocking keys (normalized email and
+    # phone, MinHash bands of the normalized name) are kept on write.
+    # Creates return the records they may duplicate as possible_duplicates;
+    # with DEDUPE_BLOCK_ON_CREATE, a match scoring DEDUPE_BLOCK_SCORE or more
+    # is refused with 409 unless allow_duplicate=true. Names count as
+    # matching from DEDUPE_NAME_SIMILARITY (trigram Jaccard). The clustering
+    # job regroups the tables every DEDUPE_CLUSTER_INTERVAL_SECONDS and
+    # backfills missing keys (0 disables it).
+    DEDUPE_ON_CREATE: bool = True
+    DEDUPE_BLOCK_ON_CREATE: bool = False
+    DEDUPE_BLOCK_SCORE: float = 0.9
+    DEDUPE_NAME_SIMILARITY: float = 0.6
+    DEDUPE_CLUSTER_INTERVAL_SECONDS: float = 86400.0
+
+    # Dashboard counters are maintained on write; this job re-derives the
+    # exact counts periodically (0 disables it)
+    COUNTER_RECONCILE_INTERVAL_SECONDS: float = 3600.0
+
+    # Per-product stock snapshots bounding /inventory/stock-as-of replays
+    # (0 disables the job)
+    STOCK_SNAPSHOT_INTERVAL_SECONDS: float = 86400.0
+
     # MySQL
     MYSQL_SERVER: str = "localhost"
     MYSQL_USER: str = "erp_user"
@@ -16,12 +110,30 @@ class Settings(BaseSettings):
     MYSQL_PORT: int = 3306
     DATABASE_URL: str = ""
 
+    # Async stack: routers run on AsyncSession over ASYNC_DATABASE_URL
+    # (aiomysql / aiosqlite) instead of a threadpool-bound sync Session.
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str = ""
+
     @validator("DATABASE_URL", pre=True)
     def assemble_db_connection(cls, v: str, values: dict) -> str:
         if isinstance(v, str) and v:
             return v
         return f"mysql+mysqldb://{values.get('MYSQL_USER')}:{values.get('MYSQL_PASSWORD')}@{values.get('MYSQL_SERVER')}:{values.get('MYSQL_PORT')}/{values.get('MYSQL_DB')}"
 
+    @validator("ASYNC_DATABASE_URL", pre=True)
+    def assemble_async_db_connection(cls, v: str, values: dict) -> str:
+        if isinstance(v, str) and v:
+            return v
+        sync_url = values.get("DATABASE_URL") or ""
+        scheme, sep, rest = sync_url.partition("://")
+        backend = scheme.split("+")[0]
+        if backend == "mysql":
+            return f"mysql+aiomysql{sep}{rest}"
+        if backend == "sqlite":
+            return f"sqlite+aiosqlite{sep}{rest}"
+        return sync_url
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -1,16 +1,160 @@
+from fastapi import Depends
 from sqlalchemy import create_engine
+from sqlalchemy.engine import FrozenResult
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Request sessions never expire on commit so handlers can keep returning the
+# objects they just wrote without triggering lazy reloads.
+RequestSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, pool_pre_ping=True)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+
+class SyncSessionAdapter:
+    """Exposes a sync Session through the subset of the AsyncSession API the
+    routers use, running each database call on the threadpool.
+
+    Results are buffered before leaving the worker thread, as AsyncSession does.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def info(self) -> dict:
+        return self.sync_session.info
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    def expunge(self, instance) -> None:
+        self.sync_session.expunge(instance)
+
+    def get_bind(self):
+        return self.sync_session.get_bind()
+
+    async def execute(self, statement, params=None, **kw):
+        def _execute():
+            result = self.sync_session.execute(statement, params, **kw)
+            try:
+                return result.freeze()
+            except NotImplementedError:
+                # Statements without a row-returning cursor (e.g. executemany INSERT)
+                return result
+        result = await run_in_threadpool(_execute)
+        return result() if isinstance(result, FrozenResult) else result
+
+    async def scalar(self, statement, params=None, **kw):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kw)
+
+    async def scalars(self, statement, params=None, **kw):
+        result = await self.execute(statement, params, **kw)
+        return result.scalars()
+
+    async def get(self, entity, ident, **kw):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kw)
+
+    async def refresh(self, instance, attribute_names=None, **kw):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names, **kw)
+
+    async def delete(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, objects=None) -> None:
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kw):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kw)
+
+    def begin_nested(self) -> "_NestedTransaction":
+        return _NestedTransaction(self.sync_session)
+
+
+class _NestedTransaction:
+    """async with support for SyncSessionAdapter.begin_nested(): the
+    savepoint is released on success and rolled back if the block raised."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def __aenter__(self):
+        self.transaction = await run_in_threadpool(self.session.begin_nested)
+        return self.transaction
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await run_in_threadpool(self.transaction.__exit__, exc_type, exc, tb)
+
+
+def begin_driver_transaction(session: Session) -> None:
+    """Open the database transaction now, e.g. before a first SAVEPOINT or
+    for reads that must share a snapshot.
+
+    pysqlite (and aiosqlite) only emit BEGIN ahead of DML: a SAVEPOINT
+    issued first would become the outermost transaction and releasing it
+    would commit, and plain SELECTs would each run on their own. Other
+    drivers are inside the transaction already.
+    """
+    connection = session.connection()
+    if connection.dialect.name != "sqlite":
+        return
+    driver = connection.connection.dbapi_connection
+    driver = getattr(driver, "_connection", driver)
+    if not driver.in_transaction:
+        connection.exec_driver_sql("BEGIN")
+
+
+async def get_db():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = SyncSessionAdapter(RequestSessionLocal())
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+async def get_unit_of_work(db=Depends(get_db)):
+    """Request-scoped unit of work for write endpoints.
+
+    Handlers only flush; the transaction is committed once after the endpoint
+    returns, or rolled back if it raised. Declare it with
+    Depends(get_unit_of_work, scope="function") so the commit runs before the
+    response is sent and a failed commit surfaces as an error.
+    """
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    await db.commit()
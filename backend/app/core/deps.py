@@ -1,21 +1,44 @@
-from typing import Generator, List
+from typing import FrozenSet, Generator, List, Union
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.core import User, Permission
 from app.schemas.auth import TokenPayload
+from app.services.permissions import get_user_permissions, get_principal_state
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-def get_current_user(
-    db: Session = Depends(get_db),
+class Principal:
+    """Authenticated caller reconstructed from a signed token, no User row loaded."""
+
+    def __init__(self, id: int, is_active: bool, permissions: FrozenSet[str]):
+        self.id = id
+        self.is_active = is_active
+        self.permissions = permissions
+
+async def _principal_from_token(db: AsyncSession, token_data: TokenPayload) -> Union[Principal, None]:
+    if token_data.perms is None or token_data.pv is None or token_data.act is None:
+        return None
+    state = await get_principal_state(db, token_data.sub)
+    if state is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    version, is_active = state
+    if not is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    if version != token_data.pv:
+        # Roles changed since the token was issued; fall back to the database
+        return None
+    return Principal(token_data.sub, token_data.act, frozenset(token_data.perms))
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(reusable_oauth2)
-) -> User:
+) -> Union[User, Principal]:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=["HS256"]
@@ -26,34 +49,43 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.id == token_data.sub).first()
+    if settings.AUTH_STATELESS_PRINCIPAL:
+        principal = await _principal_from_token(db, token_data)
+        if principal is not None:
+            return principal
+    user = await db.get(User, token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+async def get_current_active_user(
+    current_user: Union[User, Principal] = Depends(get_current_user),
+) -> Union[User, Principal]:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+async def get_effective_permissions(db: AsyncSession, user: Union[User, Principal]) -> FrozenSet[str]:
+    if isinstance(user, Principal):
+        return user.permissions
+    return await get_user_permissions(db, user.id, user.permissions_version or 0)
+
 class PermissionChecker:
     def __init__(self, required_permissions: List[str]):
         self.required_permissions = required_permissions
 
-    def __call__(self, user: User = Depends(get_current_active_user)):
-        user_permissions = set()
-        for role in user.roles:
-            for perm in role.permissions:
-                user_permissions.add(perm.code)
-        
+    async def __call__(
+        self,
+        db: AsyncSession = Depends(get_db),
+        user: Union[User, Principal] = Depends(get_current_active_user),
+    ) -> Union[User, Principal]:
+        user_permissions = await get_effective_permissions(db, user)
         for required in self.required_permissions:
             if required not in user_permissions:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail=f"Missing permission: {required}",
                 )
-        return True
+        return user
@@ -0,0 +1,76 @@
+from typing import Dict, FrozenSet, Optional
+from fastapi import HTTPException, Query, Response
+from pydantic import ConfigDict, TypeAdapter, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+from app.schemas.pagination import Page
+
+# ?fields= sparse fieldsets on list endpoints: only the requested columns are
+# selected and hydrated (load_only) and the page is serialized with a schema
+# trimmed to those fields. The primary key is always included, it is the
+# keyset pagination cursor.
+
+
+class FieldSelection:
+    def __init__(self, names: Optional[FrozenSet[str]], options: list, adapter: Optional[TypeAdapter], columns: list):
+        self.names = names
+        self.options = options
+        self.adapter = adapter
+        # Selected column attributes in schema order, for column-only selects
+        self.columns = columns
+
+    def page(self, result: dict):
+        """Return the Page as-is without ?fields=, otherwise a JSON response
+        holding only the selected fields."""
+        if self.adapter is None:
+            return result
+        body = self.adapter.dump_json(self.adapter.validate_python(result, from_attributes=True))
+        return Response(content=body, media_type="application/json")
+
+
+class Fields:
+    """Dependency parsing ?fields=a,b against the fields of a response schema.
+
+    Column fields become load_only() options; relationship fields (see
+    Includes) are kept in the trimmed schema and loaded as included.
+    """
+
+    def __init__(self, model, schema):
+        mapper = inspect(model)
+        self.schema = schema
+        self.column_names = {name for name in schema.model_fields if name in mapper.column_attrs}
+        self.relationships = {name for name in schema.model_fields if name in mapper.relationships}
+        self.primary_key = {column.key for column in mapper.primary_key}
+        self.model = model
+        self._columns = [getattr(model, name) for name in schema.model_fields if name in self.column_names]
+        self._adapters: Dict[FrozenSet[str], TypeAdapter] = {}
+
+    def _adapter(self, names: FrozenSet[str]) -> TypeAdapter:
+        adapter = self._adapters.get(names)
+        if adapter is None:
+            fields = self.schema.model_fields
+            trimmed = create_model(
+                f"{self.schema.__name__}Fields",
+                __config__=ConfigDict(from_attributes=True),
+                **{name: (fields[name].annotation, fields[name]) for name in fields if name in names},
+            )
+            adapter = self._adapters[names] = TypeAdapter(Page[trimmed])
+        return adapter
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return; all when omitted"),
+    ) -> FieldSelection:
+        if fields is None:
+            return FieldSelection(None, [], None, self._columns)
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - self.column_names - self.relationships
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+                       f"Allowed: {', '.join(sorted(self.column_names | self.relationships))}",
+            )
+        names = frozenset(requested | self.primary_key)
+        columns = [column for column in self._columns if column.key in names]
+        return FieldSelection(names, [load_only(*columns)], self._adapter(names), columns)
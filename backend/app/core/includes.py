@@ -0,0 +1,96 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Query
+from sqlalchemy import inspect
+from sqlalchemy.orm import defaultload, joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+# ?include= on list endpoints: the caller picks which related objects to embed
+# from a per-endpoint whitelist. Included relationships are eager-loaded for
+# the whole page (JOIN for many-to-one, one SELECT ... IN per collection);
+# the rest are raiseload()ed, and set to null / [] on the page by
+# IncludeSelection.fill() before it is serialized.
+
+
+def _chain(path: Tuple, last) -> object:
+    option = None
+    for i, attr in enumerate(path):
+        if i == len(path) - 1:
+            loader = last or (selectinload if attr.property.uselist else joinedload)
+        else:
+            loader = defaultload
+        option = loader(attr) if option is None else getattr(option, loader.__name__)(attr)
+    return option
+
+
+def _set_empty(objects: List, path: Tuple) -> None:
+    *parents, attr = path
+    for parent in parents:
+        related = []
+        for obj in objects:
+            value = getattr(obj, parent.key)
+            if parent.property.uselist:
+                related.extend(value)
+            elif value is not None:
+                related.append(value)
+        objects = related
+    empty = [] if attr.property.uselist else None
+    for obj in objects:
+        # Objects already in the session may have it loaded; keep that
+        if attr.key in inspect(obj).unloaded:
+            set_committed_value(obj, attr.key, empty)
+
+
+class IncludeSelection:
+    def __init__(self, options: List, omitted: List[Tuple]):
+        self.options = options
+        # Paths of the relationships left out, loaded as raiseload()
+        self.omitted = omitted
+
+    def fill(self, page: dict) -> dict:
+        """Set the omitted relationships of the page items to null / []."""
+        for path in self.omitted:
+            _set_empty(page["items"], path)
+        return page
+
+
+class Includes:
+    """Dependency parsing ?include=a,b.c into loader options.
+
+    paths maps include names to relationship attribute paths; a dotted name
+    must have its parent in paths too and implies it. Without the parameter
+    the default includes are loaded, so existing clients keep their shape.
+    """
+
+    def __init__(self, paths: Dict[str, Tuple], default: Sequence[str] = ()):
+        self.paths = paths
+        self.default = list(default)
+
+    def __call__(
+        self,
+        include: Optional[str] = Query(
+            None, description="Comma-separated related objects to embed; empty for none"
+        ),
+    ) -> IncludeSelection:
+        names = self.default if include is None else [n.strip() for n in include.split(",") if n.strip()]
+        unknown = [name for name in names if name not in self.paths]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown include: {', '.join(unknown)}. Allowed: {', '.join(self.paths)}",
+            )
+        selected = set()
+        for name in names:
+            parts = name.split(".")
+            selected.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+
+        options, omitted = [], []
+        for name, path in self.paths.items():
+            parent = name.rpartition(".")[0]
+            if parent and parent not in selected:
+                continue
+            if name in selected:
+                options.append(_chain(path, None))
+            else:
+                options.append(_chain(path, raiseload))
+                omitted.append(path)
+        return IncludeSelection(options, omitted)
@@ -0,0 +1,266 @@
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy import event
+from starlette.routing import compile_path
+
+# Minimal Prometheus instrumentation: in-process counters, gauges and
+# histograms rendered in the text exposition format by /metrics. Observations
+# are a dict lookup and a few additions under a lock, cheap enough to leave on.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = Lock()
+        REGISTRY.append(self)
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._values.items()]
+        lines = self._header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Collected(_Metric):
+    """Values read from collect() at scrape time, for state kept elsewhere.
+
+    collect returns (label values, value) pairs.
+    """
+
+    def __init__(self, name, documentation, type, labelnames, collect):
+        super().__init__(name, documentation, labelnames)
+        self.type = type
+        self.collect = collect
+
+    def render(self) -> list:
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in self.collect()
+        ]
+
+
+REGISTRY: list = []
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the response body is sent.",
+    ("method", "route"),
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled.", ("method", "route")
+)
+db_queries_total = Counter(
+    "db_queries_total", "SQL statements executed, by the route that issued them.", ("route",)
+)
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", ("route",), buckets=QUERY_BUCKETS
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request.", ("route",), buckets=COUNT_BUCKETS
+)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+    """Database activity of the current request."""
+    __slots__ = ("route", "queries", "query_seconds")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+# Set by MetricsMiddleware; copied into threadpool workers and greenlets with
+# the rest of the context, so engine events can attribute statements.
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_times"].pop()
+    stats = current_request.get()
+    route = stats.route if stats is not None else "none"
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+    db_queries_total.inc((route,))
+    db_query_duration_seconds.observe((route,), elapsed)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_times"):
+        conn.info["query_start_times"].pop()
+
+
+def instrument_engine(engine) -> None:
+    """Record statement counts and durations for a sync Engine (pass
+    AsyncEngine.sync_engine for the async stack)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """Per-route request counts, latency and in-flight requests.
+
+    Requests are labelled with the route template (e.g.
+    /api/v1/hr/leave-requests/{id}/approve), never the raw path, to keep
+    label cardinality bounded.
+    """
+
+    def __init__(self, app, max_cached_paths: int = 4096):
+        self.app = app
+        self.max_cached_paths = max_cached_paths
+        self._templates: Optional[list] = None
+        self._route_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = Lock()
+
+    def _route_templates(self, app) -> list:
+        # Included routers are not flattened into app.routes on every FastAPI
+        # version, so take the full templates from the OpenAPI paths as well.
+        if self._templates is None:
+            paths = [route.path for route in app.routes if getattr(route, "path", None)]
+            paths += [path for path in app.openapi()["paths"] if path not in paths]
+            self._templates = [(compile_path(path)[0], path) for path in paths]
+        return self._templates
+
+    def _route_label(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        with self._lock:
+            label = self._route_cache.get(key)
+        if label is not None:
+            return label
+        label = "unmatched"
+        for regex, template in self._route_templates(scope["app"]):
+            if regex.match(scope["path"]):
+                label = template
+                break
+        with self._lock:
+            self._route_cache[key] = label
+            while len(self._route_cache) > self.max_cached_paths:
+                self._route_cache.popitem(last=False)
+        return label
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        route = self._route_label(scope)
+        stats = RequestStats(route)
+        token = current_request.set(stats)
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_progress.inc((method, route))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration_seconds.observe((method, route), time.perf_counter() - start)
+            http_requests_in_progress.dec((method, route))
+            http_requests_total.inc((method, route, status))
+            db_queries_per_request.observe((route,), stats.queries)
+            current_request.reset(token)
@@ -0,0 +1,100 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional, Tuple
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+
+# Keyset pagination: pages are addressed by an opaque cursor holding the
+# (sort key, id) of the last row served, so each page is an index range scan
+# no matter how deep the client has paged.
+
+def _dump_value(value: Any) -> list:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, Decimal):
+        return ["dec", str(value)]
+    return ["v", value]
+
+def _load_value(dumped: list) -> Any:
+    kind, value = dumped
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "d":
+        return date.fromisoformat(value)
+    if kind == "dec":
+        return Decimal(value)
+    return value
+
+def encode_cursor(sort_value: Any, id: int) -> str:
+    raw = json.dumps([_dump_value(sort_value), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        dumped, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        id = int(id)
+        # Ids are BIGINT at most; a larger one would fail in the driver
+        if not -2**63 <= id < 2**63:
+            raise ValueError(id)
+        return _load_value(dumped), id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+class CursorParams:
+    def __init__(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1),
+    ):
+        self.cursor = cursor
+        self.limit = min(limit, settings.PAGE_MAX_LIMIT)
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    params: CursorParams,
+    id_column,
+    sort_column=None,
+    descending: bool = False,
+    scalars: bool = True,
+) -> dict:
+    """Apply keyset filtering/ordering to a select() and fetch one page.
+
+    Returns the Page envelope: {"items": [...], "next_cursor": str | None}.
+    sort_column defaults to id_column; ties on the sort key are broken by id.
+    With scalars=False the items are the result Rows of a column select.
+    """
+    if sort_column is None:
+        sort_column = id_column
+    if params.cursor:
+        sort_value, last_id = decode_cursor(params.cursor)
+        if sort_column is id_column:
+            cond = id_column < last_id if descending else id_column > last_id
+        elif descending:
+            cond = or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < last_id))
+        else:
+            cond = or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > last_id))
+        query = query.where(cond)
+
+    if sort_column is id_column:
+        order = [id_column.desc() if descending else id_column.asc()]
+    elif descending:
+        order = [sort_column.desc(), id_column.desc()]
+    else:
+        order = [sort_column.asc(), id_column.asc()]
+
+    result = await db.execute(query.order_by(*order).limit(params.limit + 1))
+    items = result.scalars().all() if scalars else result.all()
+    next_cursor = None
+    if len(items) > params.limit:
+        items = items[:params.limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,123 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Query budgets: endpoints declare the most SQL statements one call may issue
+# with @query_budget(n). A budget that holds regardless of page size is what
+# catches N+1 lazy loads creeping back into a handler.
+
+
+class QueryLog:
+    """SQL statements executed while the log is active."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+class QueryBudgetExceeded(AssertionError):
+    def __init__(self, label: str, budget: int, log: QueryLog):
+        self.budget = budget
+        self.log = log
+        lines = [f"{label} executed {log.count} SQL statements, budget is {budget}:"]
+        lines += [f"  {i}. {' '.join(statement.split())}" for i, statement in enumerate(log.statements, 1)]
+        super().__init__("\n".join(lines))
+
+
+# Copied into threadpool workers and greenlets with the rest of the context,
+# so statements run on either engine land in the logs of the calling request.
+_active_logs: ContextVar[Tuple[QueryLog, ...]] = ContextVar("query_logs", default=())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for log in _active_logs.get():
+        log.statements.append(statement)
+
+
+def instrument_engine(engine) -> None:
+    """Record statements for a sync Engine (pass AsyncEngine.sync_engine for
+    the async stack)."""
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def record_queries():
+    """Collect the statements executed in this context (and the threads and
+    greenlets it starts) into a QueryLog."""
+    log = QueryLog()
+    token = _active_logs.set(_active_logs.get() + (log,))
+    try:
+        yield log
+    finally:
+        _active_logs.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget: int, label: str = "Block"):
+    """Fail with the offending statements if the block runs more than budget
+    statements. For tests driving the app in-process."""
+    with record_queries() as log:
+        yield log
+    if log.count > budget:
+        raise QueryBudgetExceeded(label, budget, log)
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare the SQL statement budget of an endpoint, including the queries
+    made by its dependencies (auth, permission checks, commit)."""
+    def decorator(endpoint):
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+def get_query_budget(endpoint) -> Optional[int]:
+    return getattr(endpoint, "__query_budget__", None)
+
+
+class QueryBudgetMiddleware:
+    """Count the statements of each request against its endpoint's budget.
+
+    With debug_header the count is reported in X-Query-Count. Requests over
+    budget are logged with their statements, and with strict they raise
+    QueryBudgetExceeded once the response is sent, failing the calling test.
+    """
+
+    def __init__(self, app, debug_header: bool = False, strict: bool = False):
+        self.app = app
+        self.debug_header = debug_header
+        self.strict = strict
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.debug_header:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(log.count).encode()))
+                budget = get_query_budget(getattr(scope.get("route"), "endpoint", None))
+                if budget is not None:
+                    headers.append((b"x-query-budget", str(budget).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with record_queries() as log:
+            await self.app(scope, receive, send_wrapper)
+
+        route = scope.get("route")
+        budget = get_query_budget(getattr(route, "endpoint", None))
+        if budget is not None and log.count > budget:
+            error = QueryBudgetExceeded(f"{scope['method']} {scope['path']}", budget, log)
+            if self.strict:
+                raise error
+            logger.warning("%s", error)
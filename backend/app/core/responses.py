@@ -0,0 +1,29 @@
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+# Fast path for large flat lists: rows are fetched as column tuples and encoded
+# by orjson as-is, skipping ORM hydration and per-row Pydantic validation. Only
+# for schemas whose fields are all plain columns; the output matches what the
+# response_model would have produced.
+
+
+def _default(value: Any):
+    # Pydantic renders Decimal as a JSON string
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+def row_page(result: dict) -> ORJSONResponse:
+    """Render a Page of Row objects (paginate(..., scalars=False))."""
+    return ORJSONResponse({
+        "items": [row._asdict() for row in result["items"]],
+        "next_cursor": result["next_cursor"],
+    })
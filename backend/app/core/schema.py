@@ -0,0 +1,49 @@
+from typing import List
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+from app.core.database import Base
+from app import models  # registers every table on Base.metadata
+
+# Base.metadata.create_all only creates missing tables. upgrade_schema also
+# adds the columns and indexes later versions put on existing tables, so an
+# already-deployed database matches the models. Every step checks first and
+# re-running it is a no-op.
+
+
+def _add_missing_columns(connection) -> List[str]:
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    preparer = connection.dialect.identifier_preparer
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            # New columns are nullable or have a server default, so existing
+            # rows get a value
+            ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}"))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """Create missing tables, columns and indexes; returns what was added."""
+    with engine.begin() as connection:
+        existing = set(inspect(connection).get_table_names())
+        Base.metadata.create_all(connection)
+        added = [table.name for table in Base.metadata.sorted_tables if table.name not in existing]
+        added += _add_missing_columns(connection)
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            present = {index["name"] for index in inspect(connection).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in present:
+                    index.create(connection)
+                    added.append(index.name)
+    return added
@@ -1,11 +1,39 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import auth, users, hr, inventory, crm, dashboard
+from app.api.v1 import auth, users, hr, inventory, crm, dashboard, search
+from app.core import database, metrics, query_budget
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.services.audit import AUDIT_MODE_BUFFERED, audit_buffer
+from app.services.counters import counter_reconciler
+from app.services.dedupe import duplicate_clusterer
+from app.services.passwords import password_hasher
+from app.services.search import search_indexer
+from app.services.stock_history import stock_snapshotter
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    password_hasher.start()
+    counter_reconciler.start()
+    stock_snapshotter.start()
+    search_indexer.start()
+    duplicate_clusterer.start()
+    if settings.AUDIT_MODE == AUDIT_MODE_BUFFERED:
+        audit_buffer.start()
+    yield
+    counter_reconciler.stop()
+    stock_snapshotter.stop()
+    search_indexer.stop()
+    duplicate_clusterer.stop()
+    password_hasher.stop()
+    # Write out audit entries still queued in buffered mode
+    await audit_buffer.stop()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -17,12 +45,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument_engine(database.engine)
+    if database.async_engine is not None:
+        metrics.instrument_engine(database.async_engine.sync_engine)
+
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics():
+        return Response(metrics.render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+query_budget.instrument_engine(database.engine)
+if database.async_engine is not None:
+    query_budget.instrument_engine(database.async_engine.sync_engine)
+if settings.QUERY_DEBUG or settings.QUERY_BUDGET_STRICT:
+    app.add_middleware(
+        query_budget.QueryBudgetMiddleware,
+        debug_header=settings.QUERY_DEBUG,
+        strict=settings.QUERY_BUDGET_STRICT,
+    )
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+        streaming=settings.COMPRESSION_STREAMING,
+    )
+
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 app.include_router(hr.router, prefix=f"{settings.API_V1_STR}/hr", tags=["hr"])
 app.include_router(inventory.router, prefix=f"{settings.API_V1_STR}/inventory", tags=["inventory"])
 app.include_router(crm.router, prefix=f"{settings.API_V1_STR}/crm", tags=["crm"])
 app.include_router(dashboard.router, prefix=f"{settings.API_V1_STR}/dashboard", tags=["dashboard"])
+app.include_router(search.router, prefix=f"{settings.API_V1_STR}/search", tags=["search"])
 
 @app.get("/")
 def root():
@@ -1,4 +1,4 @@
-from .core import User, Role, Permission, AuditLog
+from .core import User, Role, Permission, AuditLog, EntityCounter, SearchDocument
 from .hr import Department, Employee, LeaveRequest
-from .inventory import Product, InventoryTransaction
-from .crm import Customer, Lead, Opportunity
+from .inventory import Product, InventoryTransaction, StockSnapshot, StockAlert
+from .crm import Customer, Lead, Opportunity, DuplicateKey, DuplicateCluster
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table, JSON
+from sqlalchemy import DDL, Column, Integer, String, Boolean, DateTime, ForeignKey, Table, JSON, UniqueConstraint, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -19,10 +19,15 @@ role_permissions = Table(
 
 class User(Base):
     __tablename__ = "users"
+    # Load server-generated columns during flush (RETURNING where the backend
+    # supports it) so write endpoints need no refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
+    # Bumped whenever roles or activation change; stateless tokens carry it
+    permissions_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -52,4 +57,51 @@ class AuditLog(Base):
     entity_type = Column(String(100), nullable=False)
     entity_id = Column(Integer, nullable=True)
     metadata_json = Column(JSON, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class EntityCounter(Base):
+    __tablename__ = "entity_counters"
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class SearchDocument(Base):
+    __tablename__ = "search_documents"
+    # One row per searchable entity, rewritten whenever its text changes
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    title = Column(String(255), nullable=False)
+    body = Column(String(1024))
+
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),
+        # Ids are never reused, so readers can follow new documents by id
+        {"sqlite_autoincrement": True},
+    )
+
+# Full-text index over title and body. MySQL uses a FULLTEXT index with the
+# ngram parser (substring-friendly for SKUs and emails); SQLite an external
+# content FTS5 table kept in sync by triggers. Other backends have no index.
+event.listen(SearchDocument.__table__, "after_create", DDL(
+    "ALTER TABLE search_documents ADD FULLTEXT INDEX ft_search_documents (title, body) WITH PARSER ngram"
+).execute_if(dialect="mysql"))
+
+for _statement in (
+    "CREATE VIRTUAL TABLE search_documents_fts USING fts5(title, body, content='search_documents', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+):
+    event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+event.listen(SearchDocument.__table__, "after_drop", DDL(
+    "DROP TABLE IF EXISTS search_documents_fts"
+).execute_if(dialect="sqlite"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Numeric, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -18,6 +18,7 @@ class OpportunityStage(str, enum.Enum):
 
 class Customer(Base):
     __tablename__ = "customers"
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     email = Column(String(255))
@@ -31,8 +32,9 @@ class Customer(Base):
 
 class Lead(Base):
     __tablename__ = "leads"
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True, index=True)
     name = Column(String(255), nullable=False)
     email = Column(String(255))
     phone = Column(String(50))
@@ -44,8 +46,9 @@ class Lead(Base):
 
 class Opportunity(Base):
     __tablename__ = "opportunities"
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     value = Column(Numeric(12, 2), default=0)
     stage = Column(SQLEnum(OpportunityStage), default=OpportunityStage.NEW)
@@ -54,3 +57,33 @@ class Opportunity(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     customer = relationship("Customer", back_populates="opportunities")
+
+class DuplicateKey(Base):
+    __tablename__ = "duplicate_keys"
+    # Blocking keys of customers and leads (see app.services.dedupe): records
+    # sharing a key are duplicate candidates
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    key = Column(String(16), nullable=False)
+
+    __table_args__ = (
+        Index("ix_duplicate_keys_type_key", "entity_type", "key"),
+        Index("ix_duplicate_keys_type_entity", "entity_type", "entity_id"),
+    )
+
+class DuplicateCluster(Base):
+    __tablename__ = "duplicate_clusters"
+    # Output of the clustering job, rewritten per entity type on every run.
+    # Members of a cluster are stored contiguously.
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    # Smallest entity id in the cluster
+    cluster_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_duplicate_clusters_type_id", "entity_type", "id"),
+    )
+
@@ -18,8 +18,9 @@ class Department(Base):
 
 class Employee(Base):
     __tablename__ = "employees"
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     full_name = Column(String(255), nullable=False)
     email = Column(String(255), nullable=False)
     department_id = Column(Integer, ForeignKey("departments.id"))
@@ -33,14 +34,15 @@ class Employee(Base):
 
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True, index=True)
-    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False, index=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     reason = Column(String(255))
     status = Column(SQLEnum(LeaveStatus), default=LeaveStatus.PENDING)
     reviewed_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     employee = relationship("Employee", back_populates="leave_requests")
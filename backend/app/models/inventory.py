@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Index, Numeric, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -9,8 +9,13 @@ class TransactionType(str, enum.Enum):
     OUT = "OUT"
     ADJUSTMENT = "ADJUSTMENT"
 
+class StockAlertType(str, enum.Enum):
+    LOW = "LOW"
+    RESTORED = "RESTORED"
+
 class Product(Base):
     __tablename__ = "products"
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True, index=True)
     sku = Column(String(50), unique=True, index=True, nullable=False)
     name = Column(String(255), nullable=False)
@@ -18,6 +23,9 @@ class Product(Base):
     unit = Column(String(20))
     current_stock = Column(Integer, default=0)
     low_stock_threshold = Column(Integer, default=10)
+    # current_stock <= low_stock_threshold, kept up to date on write so the
+    # low-stock list is an index lookup
+    is_low_stock = Column(Boolean, nullable=False, default=False, server_default="0", index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -25,12 +33,41 @@ class Product(Base):
 
 class InventoryTransaction(Base):
     __tablename__ = "inventory_transactions"
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    # Alone for the per-product list (paged by id); with created_at below for
+    # ledger range replays
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     type = Column(SQLEnum(TransactionType), nullable=False)
     quantity = Column(Integer, nullable=False)
     note = Column(String(255))
     actor_user_id = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     product = relationship("Product", back_populates="transactions")
+
+    __table_args__ = (
+        # Per-product ledger ranges, used to replay movements since a snapshot
+        Index("ix_inventory_transactions_product_created", "product_id", "created_at"),
+    )
+
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    # Stock after every movement created before taken_at
+    taken_at = Column(DateTime(timezone=True), nullable=False)
+    stock = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("product_id", "taken_at", name="uq_stock_snapshots_product_taken"),
+    )
+
+class StockAlert(Base):
+    __tablename__ = "stock_alerts"
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    type = Column(SQLEnum(StockAlertType), nullable=False)
+    stock = Column(Integer, nullable=False)
+    threshold = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
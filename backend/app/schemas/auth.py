@@ -9,6 +9,10 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[int] = None
+    # Principal claims, only present when AUTH_STATELESS_PRINCIPAL is enabled
+    act: Optional[bool] = None
+    perms: Optional[List[str]] = None
+    pv: Optional[int] = None
 
 class User(BaseModel):
     id: int
@@ -0,0 +1,16 @@
+from typing import List
+from pydantic import BaseModel
+
+class BulkFieldError(BaseModel):
+    field: str
+    message: str
+
+class BulkRowError(BaseModel):
+    row: int  # 1-based position in the submitted array / CSV data rows
+    errors: List[BulkFieldError]
+
+class BulkImportResult(BaseModel):
+    total: int
+    inserted: int
+    failed: int
+    errors: List[BulkRowError] = []
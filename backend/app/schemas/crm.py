@@ -38,6 +38,7 @@ class LeadUpdate(LeadBase):
 class Lead(LeadBase):
     id: int
     created_at: datetime
+    customer: Optional[Customer] = None
     class Config:
         from_attributes = True
 
@@ -58,6 +59,30 @@ class Opportunity(OpportunityBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-    customer: Customer
+    customer: Optional[Customer] = None
+    class Config:
+        from_attributes = True
+
+class DuplicateCandidate(BaseModel):
+    entity_id: int
+    name: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    company: Optional[str] = None
+    score: float
+    reasons: List[str]  # email, phone and/or name
+
+class CustomerCreated(Customer):
+    possible_duplicates: List[DuplicateCandidate] = []
+
+class LeadCreated(Lead):
+    possible_duplicates: List[DuplicateCandidate] = []
+
+class DuplicateClusterMember(BaseModel):
+    id: int
+    entity_type: str
+    entity_id: int
+    cluster_id: int
+    created_at: datetime
     class Config:
         from_attributes = True
@@ -52,6 +52,6 @@ class LeaveRequest(LeaveRequestBase):
     reviewed_by_user_id: Optional[int] = None
     reviewed_at: Optional[datetime] = None
     created_at: datetime
-    employee: Employee
+    employee: Optional[Employee] = None
     class Config:
         from_attributes = True
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 class ProductBase(BaseModel):
@@ -18,6 +18,7 @@ class ProductUpdate(ProductBase):
 class Product(ProductBase):
     id: int
     current_stock: int
+    is_low_stock: bool = False
     created_at: datetime
     updated_at: Optional[datetime] = None
     class Config:
@@ -37,6 +38,28 @@ class InventoryTransaction(BaseModel):
     note: Optional[str] = None
     actor_user_id: Optional[int] = None
     created_at: datetime
-    product: Product
+    product: Optional[Product] = None
     class Config:
         from_attributes = True
+
+class TransactionBatchCreate(BaseModel):
+    lines: List[TransactionCreate] = Field(..., min_length=1, max_length=1000)
+
+class TransactionBatchResult(BaseModel):
+    count: int
+    products: List[Product]
+
+class StockAlert(BaseModel):
+    id: int
+    product_id: int
+    type: str
+    stock: int
+    threshold: int
+    created_at: datetime
+    class Config:
+        from_attributes = True
+
+class StockLevel(BaseModel):
+    product_id: int
+    sku: str
+    stock: int
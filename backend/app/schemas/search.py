@@ -0,0 +1,13 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class SearchHit(BaseModel):
+    entity_type: str  # customer, lead, product or employee
+    entity_id: int
+    title: str
+    detail: Optional[str] = None
+    score: float
+    match: str  # "fulltext", or "fuzzy" for trigram (typo-tolerant) matches
+
+class SearchResults(BaseModel):
+    items: List[SearchHit]
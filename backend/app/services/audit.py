@@ -1,15 +1,230 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core import database, metrics
 from app.models.core import AuditLog
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Set
 
-def log_action(
-    db: Session,
+logger = logging.getLogger(__name__)
+
+AUDIT_MODE_TRANSACTIONAL = "transactional"
+AUDIT_MODE_BUFFERED = "buffered"
+
+
+class AuditBuffer:
+    """Bounded in-process queue of audit rows drained by a background thread.
+
+    The flusher bulk-inserts up to flush_batch_size rows at a time, at least
+    every flush_interval seconds. When the queue is full, producers wait up to
+    enqueue_timeout seconds (counted as "delayed") before the entry is dropped.
+    Once stop() has begun, entries are written directly instead.
+    """
+
+    def __init__(self, max_size: int, flush_batch_size: int, flush_interval: float, enqueue_timeout: float):
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_size)
+        self._stop = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.counters = {"enqueued": 0, "flushed": 0, "delayed": 0, "dropped": 0, "flush_errors": 0}
+        self._waiting: Set[asyncio.Task] = set()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters, queued=self._queue.qsize())
+
+    def start(self) -> None:
+        self._closed.clear()
+        self._start_thread()
+
+    def _start_thread(self) -> None:
+        with self._lock:
+            if self._closed.is_set() or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+            self._thread.start()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher after writing everything still queued, including
+        entries waiting for room."""
+        self._closed.set()
+        # The flusher keeps running meanwhile, making room for them
+        if self._waiting:
+            await asyncio.gather(*self._waiting)
+        await run_in_threadpool(self._stop_thread, timeout)
+
+    def _stop_thread(self, timeout: float) -> None:
+        with self._lock:
+            self._stop.set()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+        self._flush(self._drain(self._queue.qsize()))
+
+    def _flush_if_closed(self) -> None:
+        # stop() may have drained the queue for the last time before our put
+        if self._closed.is_set():
+            self._flush(self._drain(self._queue.qsize()))
+
+    def enqueue(self, entries: List[Dict[str, Any]]) -> None:
+        """Queue entries without blocking the event loop.
+
+        Entries that do not fit wait up to enqueue_timeout for room: inline
+        on a worker thread, in a background task on the event loop.
+        """
+        if self._closed.is_set():
+            self._count("enqueued", len(entries))
+            self._flush(entries)
+            return
+        self._start_thread()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        for entry in entries:
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                self._count("delayed")
+                if loop is None:
+                    self._put_waiting(entry)
+                else:
+                    task = loop.create_task(run_in_threadpool(self._put_waiting, entry))
+                    self._waiting.add(task)
+                    task.add_done_callback(self._waiting.discard)
+                continue
+            self._count("enqueued")
+        self._flush_if_closed()
+
+    def _put_waiting(self, entry: Dict[str, Any]) -> None:
+        try:
+            self._queue.put(entry, True, self.enqueue_timeout)
+        except queue.Full:
+            self._count("dropped")
+            logger.warning("Audit buffer full, dropped %s %s entry", entry["action"], entry["entity_type"])
+            return
+        self._count("enqueued")
+        self._flush_if_closed()
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        while len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        db = database.SessionLocal()
+        try:
+            db.execute(insert(AuditLog), rows)
+            db.commit()
+            self._count("flushed", len(rows))
+        except Exception:
+            db.rollback()
+            self._count("flush_errors")
+            logger.exception("Failed to flush %d audit entries", len(rows))
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            deadline = time.monotonic() + self.flush_interval
+            rows = []
+            while len(rows) < self.flush_batch_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    rows.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                rows.extend(self._drain(self.flush_batch_size - len(rows)))
+            self._flush(rows)
+
+
+audit_buffer = AuditBuffer(
+    max_size=settings.AUDIT_BUFFER_MAX_SIZE,
+    flush_batch_size=settings.AUDIT_FLUSH_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+)
+
+
+metrics.Collected(
+    "audit_buffer_entries_total",
+    "Buffered audit entries by outcome (enqueued, flushed, delayed, dropped, flush_errors).",
+    "counter", ("outcome",),
+    lambda: [((name,), value) for name, value in audit_buffer.stats().items() if name != "queued"],
+)
+metrics.Collected(
+    "audit_buffer_queued", "Buffered audit entries waiting to be written.", "gauge", (),
+    lambda: [((), audit_buffer.stats()["queued"])],
+)
+
+PENDING_KEY = "pending_audit_entries"
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed_entries(session):
+    # Buffered entries only leave the session once the change they describe
+    # is committed
+    entries = session.info.pop(PENDING_KEY, None)
+    if entries:
+        audit_buffer.enqueue(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_entries(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+async def log_action(
+    db: AsyncSession,
     actor_id: Optional[int],
     action: str,
     entity_type: str,
     entity_id: Optional[int] = None,
     metadata_json: Optional[dict] = None
 ):
+    """Record an audit entry.
+
+    In "transactional" mode the row is added to db and committed by the
+    caller together with the change it describes. In "buffered" mode it is
+    held on db until that commit, then queued and written asynchronously by
+    audit_buffer; a rollback discards it. Buffered entries carry the UTC
+    time they were recorded, since they may be written much later;
+    transactional rows take the column default.
+    """
+    if settings.AUDIT_MODE == AUDIT_MODE_BUFFERED:
+        db.info.setdefault(PENDING_KEY, []).append({
+            "created_at": datetime.now(timezone.utc),
+            "actor_user_id": actor_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "metadata_json": metadata_json,
+        })
+        return None
     log = AuditLog(
         actor_user_id=actor_id,
         action=action,
@@ -18,5 +233,4 @@ def log_action(
         metadata_json=metadata_json
     )
     db.add(log)
-    db.commit()
     return log
@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Type
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import database
+from app.core.config import settings
+from app.services.audit import log_action
+from app.services.counters import add_to_counter
+from app.services.dedupe import index_keys
+from app.services.search import index_rows
+
+
+def _parse_csv(text: str) -> List[Dict[str, Any]]:
+    reader = csv.DictReader(io.StringIO(text))
+    # Empty cells mean "not provided" so schema defaults apply
+    return [{k: (v if v != "" else None) for k, v in row.items() if k} for row in reader]
+
+
+async def read_bulk_rows(request: Request) -> List[Dict[str, Any]]:
+    """Read import rows from a JSON array body, a text/csv body or an
+    uploaded CSV file (multipart field "file")."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing CSV file field 'file'")
+        rows = _parse_csv((await upload.read()).decode("utf-8-sig"))
+    elif content_type.startswith("text/csv"):
+        rows = _parse_csv((await request.body()).decode("utf-8-sig"))
+    else:
+        try:
+            rows = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or CSV")
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of objects")
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many rows: {len(rows)} (max {settings.BULK_MAX_ROWS})",
+        )
+    return rows
+
+
+def _row_error(row: int, field: str, message: str) -> dict:
+    return {"row": row, "errors": [{"field": field, "message": message}]}
+
+
+def _index_column(table, name: str) -> str:
+    # MySQL names the violated index, not its column
+    for index in list(table.indexes) + list(table.constraints):
+        if index.name == name and index.columns:
+            return list(index.columns)[0].name
+    return "id" if name == "PRIMARY" else name
+
+
+def _integrity_errors(model, error: IntegrityError) -> List[dict]:
+    """Field-level messages for a row the database rejected, instead of the
+    driver's own (SQLite, MySQL and PostgreSQL wordings)."""
+    message = str(error.orig)
+    match = re.search(r"UNIQUE constraint failed: \w+\.(\w+)|Key \((\w+)\)=.* already exists", message)
+    if match:
+        return [{"field": match.group(1) or match.group(2), "message": "Already exists"}]
+    match = re.search(r"Duplicate entry .* for key '(?:\w+\.)?(\w+)'", message)
+    if match:
+        return [{"field": _index_column(model.__table__, match.group(1)), "message": "Already exists"}]
+    match = re.search(
+        r"NOT NULL constraint failed: \w+\.(\w+)|Column '(\w+)' cannot be null|null value in column \"(\w+)\"",
+        message,
+    )
+    if match:
+        return [{"field": next(g for g in match.groups() if g), "message": "Field required"}]
+    match = re.search(r"FOREIGN KEY \(`?(\w+)`?\)|Key \((\w+)\)=.* is not present", message)
+    if match:
+        return [{"field": match.group(1) or match.group(2), "message": "Referenced record does not exist"}]
+    if "FOREIGN KEY constraint failed" in message:
+        return [{"field": "__row__", "message": "Referenced record does not exist"}]
+    return [{"field": "__row__", "message": "Rejected by the database"}]
+
+
+async def _insert_chunk(db: AsyncSession, model, rows: List[tuple]) -> List[int]:
+    # One INSERT for the chunk; returns the ids of the rows it wrote
+    values = [values for _, values in rows]
+    if db.get_bind().dialect.insert_executemany_returning:
+        result = await db.execute(insert(model).returning(model.id), values)
+        return list(result.scalars().all())
+    # No RETURNING (MySQL): a single multi-row INSERT has a known row count,
+    # so InnoDB reserves its auto-increment values at once, consecutively
+    # (every innodb_autoinc_lock_mode), and LAST_INSERT_ID() is the first.
+    result = await db.execute(insert(model).values(values))
+    step = await db.scalar(text("SELECT @@auto_increment_increment"))
+    return [result.lastrowid + i * step for i in range(result.rowcount)]
+
+
+async def _insert_rows_individually(db: AsyncSession, model, rows: List[tuple]) -> tuple:
+    # Slow path for a chunk the database rejected: each row gets a savepoint,
+    # so the offending ones are skipped and the rest commit with the chunk.
+    await db.run_sync(database.begin_driver_transaction)
+    ids, errors = [], []
+    for row_number, values in rows:
+        try:
+            async with db.begin_nested():
+                result = await db.execute(insert(model).values(values))
+        except IntegrityError as e:
+            errors.append({"row": row_number, "errors": _integrity_errors(model, e)})
+            continue
+        ids.append(result.inserted_primary_key[0])
+    return ids, errors
+
+
+async def bulk_insert(
+    db: AsyncSession,
+    *,
+    model,
+    schema: Type[BaseModel],
+    rows: List[Dict[str, Any]],
+    actor_id: Optional[int],
+    entity_type: str,
+    unique_field: Optional[str] = None,
+    prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    chunk_size: Optional[int] = None,
+) -> dict:
+    """Validate and insert rows chunk by chunk.
+
+    Each chunk is written with a single (executemany) INSERT and one commit,
+    together with one summarizing BULK_CREATE audit entry. Rows failing
+    validation (or a unique check on unique_field) are reported and skipped;
+    if the database rejects the chunk, its rows are retried one savepoint at
+    a time within the same transaction.
+    prepare, if given, fills derived columns of each validated row, since the
+    Core INSERT bypasses ORM events; search documents and duplicate keys of
+    the chunk are written explicitly for the same reason.
+    """
+    chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+    inserted, errors = 0, []
+    seen_unique = set()
+
+    for start in range(0, len(rows), chunk_size):
+        valid: List[tuple] = []
+        for offset, raw in enumerate(rows[start:start + chunk_size]):
+            row_number = start + offset + 1
+            try:
+                values = schema(**raw).dict()
+                if prepare:
+                    values = prepare(values)
+            except ValidationError as e:
+                errors.append({
+                    "row": row_number,
+                    "errors": [
+                        {"field": ".".join(str(p) for p in err["loc"]), "message": err["msg"]}
+                        for err in e.errors()
+                    ],
+                })
+                continue
+            if unique_field:
+                key = values[unique_field]
+                if key in seen_unique:
+                    errors.append(_row_error(row_number, unique_field, "Duplicate value in import"))
+                    continue
+                seen_unique.add(key)
+            valid.append((row_number, values))
+
+        if unique_field and valid:
+            column = getattr(model, unique_field)
+            keys = [values[unique_field] for _, values in valid]
+            result = await db.execute(select(column).where(column.in_(keys)))
+            existing = set(result.scalars().all())
+            if existing:
+                for row_number, values in valid:
+                    if values[unique_field] in existing:
+                        errors.append(_row_error(row_number, unique_field, "Already exists"))
+                valid = [(n, v) for n, v in valid if v[unique_field] not in existing]
+
+        if not valid:
+            continue
+        try:
+            ids = await _insert_chunk(db, model, valid)
+        except IntegrityError:
+            await db.rollback()
+            ids, chunk_errors = await _insert_rows_individually(db, model, valid)
+            errors.extend(chunk_errors)
+        inserted += len(ids)
+        await add_to_counter(db, model, len(ids))
+        await index_rows(db, model, ids)
+        await index_keys(db, model, ids)
+        await log_action(
+            db, actor_id, "BULK_CREATE", entity_type, None,
+            {"count": len(ids), "rows": [valid[0][0], valid[-1][0]]},
+        )
+        await db.commit()
+
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "total": len(rows),
+        "inserted": inserted,
+        "failed": len(rows) - inserted,
+        "errors": errors,
+    }
@@ -0,0 +1,131 @@
+from collections import Counter
+from typing import Dict, List
+from sqlalchemy import event, func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.cache import invalidate_on_commit
+from app.core.config import settings
+from app.core.database import begin_driver_transaction
+from app.models.core import EntityCounter, User
+from app.models.crm import Customer
+from app.models.hr import Employee
+from app.models.inventory import Product
+from app.services.jobs import PeriodicJob
+
+# Counter name -> model whose rows it counts
+COUNTED_MODELS = {
+    "users": User,
+    "employees": Employee,
+    "products": Product,
+    "customers": Customer,
+}
+_COUNTER_NAMES = {model: name for name, model in COUNTED_MODELS.items()}
+
+
+def _increment(connection, deltas: Dict[str, int]) -> None:
+    for name, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(EntityCounter)
+                .where(EntityCounter.name == name)
+                .values(value=EntityCounter.value + delta)
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_rows(session, flush_context):
+    # ORM inserts and deletes of counted models adjust their counters inside
+    # the same transaction, so a rollback undoes both.
+    deltas = Counter()
+    for obj in session.new:
+        name = _COUNTER_NAMES.get(type(obj))
+        if name:
+            deltas[name] += 1
+    for obj in session.deleted:
+        name = _COUNTER_NAMES.get(type(obj))
+        if name:
+            deltas[name] -= 1
+    if deltas:
+        _increment(session.connection(), deltas)
+
+
+async def add_to_counter(db: AsyncSession, model, delta: int) -> None:
+    """Adjust the counter of model for rows written with Core statements
+    (bulk inserts), which bypass the ORM flush hook."""
+    name = _COUNTER_NAMES.get(model)
+    if name and delta:
+        await db.run_sync(lambda session: _increment(session.connection(), {name: delta}))
+
+
+def _insert_missing(connection, values: Dict[str, int]) -> None:
+    # Upsert that keeps a row another worker created first
+    rows = [{"name": name, "value": value} for name, value in values.items()]
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        statement = mysql_insert(EntityCounter)
+        statement = statement.on_duplicate_key_update(value=statement.table.c.value)
+    elif dialect == "postgresql":
+        statement = postgresql_insert(EntityCounter).on_conflict_do_nothing(index_elements=["name"])
+    else:
+        statement = sqlite_insert(EntityCounter).on_conflict_do_nothing(index_elements=["name"])
+    connection.execute(statement, rows)
+
+
+def _begin_snapshot(db: Session) -> None:
+    # Every read of the transaction sees the same committed state
+    if db.get_bind().dialect.name == "sqlite":
+        begin_driver_transaction(db)
+    else:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+def reconcile_counters(db: Session) -> Dict[str, int]:
+    """Correct every counter to the COUNT(*) of its table.
+
+    The counters and the counts are read in one snapshot without locking,
+    so writers are not held up by the scans. Their difference, the drift,
+    is then added to each counter in a short UPDATE, which keeps increments
+    committed while the counts ran.
+    """
+    _begin_snapshot(db)
+    stored = dict(db.execute(select(EntityCounter.name, EntityCounter.value)).all())
+    counts = {name: db.scalar(select(func.count()).select_from(model)) for name, model in COUNTED_MODELS.items()}
+    db.commit()
+
+    connection = db.connection()
+    _increment(connection, {name: counts[name] - value for name, value in stored.items() if name in counts})
+    missing = {name: count for name, count in counts.items() if name not in stored}
+    if missing:
+        _insert_missing(connection, missing)
+    invalidate_on_commit(db, "dashboard")
+    db.commit()
+    return counts
+
+
+def _create_missing_counters(db: Session, names: List[str]) -> Dict[str, int]:
+    # First use on this database: derive the missing counters once.
+    # Concurrent first requests may all get here; the upsert keeps the first
+    # row and everyone reads back the stored values.
+    _insert_missing(
+        db.connection(),
+        {name: db.scalar(select(func.count()).select_from(COUNTED_MODELS[name])) for name in names},
+    )
+    db.commit()
+    return dict(db.execute(select(EntityCounter.name, EntityCounter.value)).all())
+
+
+async def get_counters(db: AsyncSession) -> Dict[str, int]:
+    result = await db.execute(select(EntityCounter.name, EntityCounter.value))
+    counts = {row.name: row.value for row in result}
+    missing = [name for name in COUNTED_MODELS if name not in counts]
+    if missing:
+        counts = await db.run_sync(_create_missing_counters, missing)
+    return counts
+
+
+counter_reconciler = PeriodicJob(
+    "counter-reconciler", settings.COUNTER_RECONCILE_INTERVAL_SECONDS, reconcile_counters
+)
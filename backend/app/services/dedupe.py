@@ -0,0 +1,432 @@
+import hashlib
+import random
+import sys
+import zlib
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.crm import Customer, DuplicateCluster, DuplicateKey, Lead
+from app.services.jobs import PeriodicJob
+from app.services.search import similarity, tokenize, trigrams
+
+# Duplicate detection for customers and leads. Records are compared on
+# normalized email, phone and name (+ company). Candidates come from blocking
+# keys instead of all pairs: the normalized email, the phone, and MinHash LSH
+# bands of the name's trigrams, so names differing by a typo or word order
+# still share a key. Keys are stored in duplicate_keys on write, for the
+# check on create; the clustering job derives them again in memory.
+
+LEGAL_SUFFIXES = frozenset({
+    "inc", "incorporated", "ltd", "limited", "llc", "plc", "pvt", "pte", "private",
+    "co", "corp", "corporation", "company", "gmbh", "ag", "sa", "bv", "pty",
+})
+GMAIL_DOMAINS = frozenset({"gmail.com", "googlemail.com"})
+# Phones compare on their trailing digits, which drops country and trunk prefixes
+PHONE_DIGITS = 9
+MIN_PHONE_DIGITS = 7
+
+# 24 MinHash values in 8 bands of 3: names with a trigram Jaccard of 0.6
+# share a band ~86% of the time, 0.8 ~99.7%, 0.3 only ~20%.
+NUM_PERM = 24
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_random = random.Random(20261018)
+_PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Records scored per check on create, most shared keys first
+MAX_CANDIDATES = 50
+# Bucket members a record is compared with by the clustering job
+MAX_BUCKET_COMPARISONS = 8
+CHUNK_SIZE = 10000
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email:
+        return None
+    local, at, domain = email.strip().lower().rpartition("@")
+    if not at or not local or not domain:
+        return None
+    local = local.split("+", 1)[0]
+    if domain in GMAIL_DOMAINS:
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    if not phone:
+        return None
+    digits = "".join(ch for ch in phone if ch.isdigit())
+    if len(digits) < MIN_PHONE_DIGITS:
+        return None
+    return digits[-PHONE_DIGITS:]
+
+
+def normalize_company(company: Optional[str]) -> Optional[str]:
+    if not company:
+        return None
+    return " ".join(word for word in tokenize(company) if word not in LEGAL_SUFFIXES) or None
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    # Word order is ignored: "Smith, John" == "john smith"
+    if not name:
+        return None
+    return " ".join(sorted(word for word in tokenize(name) if word not in LEGAL_SUFFIXES)) or None
+
+
+class Features:
+    __slots__ = ("name", "email", "phone", "company")
+
+    def __init__(self, name, email, phone, company=None):
+        self.name = normalize_name(name)
+        self.email = normalize_email(email)
+        self.phone = normalize_phone(phone)
+        self.company = normalize_company(company)
+
+
+@lru_cache(maxsize=65536)
+def _trigram_hashes(gram: str) -> array:
+    # The trigram vocabulary is small, so each one is hashed NUM_PERM times once
+    h = zlib.crc32(gram.encode())
+    return array("I", (((a * h + b) % _PRIME) & 0xFFFFFFFF for a, b in _PERMUTATIONS))
+
+
+def minhash(name: str) -> List[int]:
+    return list(map(min, zip(*map(_trigram_hashes, trigrams(name)))))
+
+
+def _digest(raw: str) -> str:
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def _band_key(band: int, values) -> str:
+    return _digest(f"band{band}:" + ",".join(map(str, values)))
+
+
+def blocking_keys(features: Features) -> List[str]:
+    keys = []
+    if features.email:
+        keys.append(_digest("email:" + features.email))
+    if features.phone:
+        keys.append(_digest("phone:" + features.phone))
+    if features.name:
+        signature = minhash(features.name)
+        keys.extend(_band_key(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS))
+    return list(dict.fromkeys(keys))
+
+
+def _companies_compatible(a: Optional[str], b: Optional[str]) -> bool:
+    return a is None or b is None or a == b
+
+
+def _name_score(name_similarity: float, a_company: Optional[str], b_company: Optional[str]) -> float:
+    # A name match is only near-certain when both records name the same company
+    return name_similarity * (1.0 if a_company and a_company == b_company else 0.85)
+
+
+def match(a: Features, b: Features) -> Tuple[float, List[str]]:
+    """Score in [0, 1] and the rules that matched; (0.0, []) if none did."""
+    score, reasons = 0.0, []
+    if a.email and a.email == b.email:
+        score = 1.0
+        reasons.append("email")
+    if a.phone and a.phone == b.phone:
+        score = max(score, 0.9)
+        reasons.append("phone")
+    if a.name and b.name and _companies_compatible(a.company, b.company):
+        name_similarity = similarity(trigrams(a.name), trigrams(b.name))
+        if name_similarity >= settings.DEDUPE_NAME_SIMILARITY:
+            score = max(score, _name_score(name_similarity, a.company, b.company))
+            reasons.append("name")
+    return round(score, 4), reasons
+
+
+class DedupeType:
+    def __init__(self, name: str, model, has_company: bool):
+        self.name = name
+        self.model = model
+        self.attrs = ["name", "email", "phone"] + (["company"] if has_company else [])
+        self.columns = [model.id] + [getattr(model, attr) for attr in self.attrs]
+
+    def features(self, record) -> Features:
+        """Features of an ORM object, a row or a create schema."""
+        return Features(*(getattr(record, attr, None) for attr in self.attrs))
+
+
+DEDUPE_TYPES = {
+    "customer": DedupeType("customer", Customer, has_company=True),
+    "lead": DedupeType("lead", Lead, has_company=False),
+}
+_TYPES_BY_MODEL = {spec.model: spec for spec in DEDUPE_TYPES.values()}
+
+
+def _key_rows(spec: DedupeType, entity_id: int, features: Features) -> List[dict]:
+    return [
+        {"entity_type": spec.name, "entity_id": entity_id, "key": key}
+        for key in blocking_keys(features)
+    ]
+
+
+def _features_changed(obj, spec: DedupeType) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[attr].history.has_changes() for attr in spec.attrs)
+
+
+@event.listens_for(Session, "after_flush")
+def _index_flushed_rows(session, flush_context):
+    # Keys follow ORM writes inside the same transaction, like search documents
+    rows, stale = [], defaultdict(set)
+    for obj in session.new:
+        spec = _TYPES_BY_MODEL.get(type(obj))
+        if spec:
+            rows.extend(_key_rows(spec, obj.id, spec.features(obj)))
+    for obj in session.dirty:
+        spec = _TYPES_BY_MODEL.get(type(obj))
+        if spec and _features_changed(obj, spec):
+            stale[spec].add(obj.id)
+            rows.extend(_key_rows(spec, obj.id, spec.features(obj)))
+    for obj in session.deleted:
+        spec = _TYPES_BY_MODEL.get(type(obj))
+        if spec:
+            stale[spec].add(obj.id)
+    if not (rows or stale):
+        return
+    connection = session.connection()
+    for spec, ids in stale.items():
+        connection.execute(
+            delete(DuplicateKey).where(DuplicateKey.entity_type == spec.name, DuplicateKey.entity_id.in_(ids))
+        )
+    if rows:
+        connection.execute(insert(DuplicateKey), rows)
+
+
+def _chunks(db: Session, spec: DedupeType, after_id: int = 0) -> Iterator[list]:
+    # Keyset batches rather than a streamed cursor, so the caller can write
+    # on the same connection between batches
+    while True:
+        rows = db.execute(
+            select(*spec.columns).where(spec.model.id > after_id).order_by(spec.model.id).limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1].id
+
+
+def _index_rows(db: Session, spec: DedupeType) -> int:
+    db.execute(delete(DuplicateKey).where(DuplicateKey.entity_type == spec.name))
+    indexed = 0
+    for rows in _chunks(db, spec):
+        key_rows = [key_row for row in rows for key_row in _key_rows(spec, row.id, spec.features(row))]
+        if key_rows:
+            db.execute(insert(DuplicateKey), key_rows)
+        indexed += len(rows)
+    return indexed
+
+
+def _index_ids(db: Session, spec: DedupeType, ids: List[int]) -> None:
+    for start in range(0, len(ids), CHUNK_SIZE):
+        rows = db.execute(select(*spec.columns).where(spec.model.id.in_(ids[start:start + CHUNK_SIZE]))).all()
+        key_rows = [key_row for row in rows for key_row in _key_rows(spec, row.id, spec.features(row))]
+        if key_rows:
+            db.execute(insert(DuplicateKey), key_rows)
+
+
+async def index_keys(db: AsyncSession, model, ids: List[int]) -> None:
+    """Add keys for the new rows ids of model, written with Core statements
+    that bypass the ORM flush hook."""
+    spec = _TYPES_BY_MODEL.get(model)
+    if spec is None or not ids:
+        return
+    await db.run_sync(_index_ids, spec, ids)
+
+
+def rebuild_duplicate_keys(db: Session) -> Dict[str, int]:
+    """Recompute the keys of every customer and lead and commit."""
+    counts = {name: _index_rows(db, spec) for name, spec in DEDUPE_TYPES.items()}
+    db.commit()
+    return counts
+
+
+async def find_duplicates(db: AsyncSession, entity_type: str, record) -> List[dict]:
+    """Existing records of entity_type matching record (an object with the
+    entity's attributes), best first."""
+    spec = DEDUPE_TYPES[entity_type]
+    features = spec.features(record)
+    keys = blocking_keys(features)
+    if not keys:
+        return []
+    candidates = (
+        select(DuplicateKey.entity_id)
+        .where(DuplicateKey.entity_type == spec.name, DuplicateKey.key.in_(keys))
+        .group_by(DuplicateKey.entity_id)
+        .order_by(func.count().desc(), DuplicateKey.entity_id)
+        .limit(MAX_CANDIDATES)
+        .subquery()
+    )
+    result = await db.execute(
+        select(*spec.columns).join(candidates, candidates.c.entity_id == spec.model.id)
+    )
+    duplicates = []
+    for row in result:
+        score, reasons = match(features, spec.features(row))
+        if reasons:
+            duplicates.append({
+                "entity_id": row.id,
+                **{attr: getattr(row, attr) for attr in spec.attrs},
+                "score": score,
+                "reasons": reasons,
+            })
+    duplicates.sort(key=lambda candidate: (-candidate["score"], candidate["entity_id"]))
+    return duplicates
+
+
+async def check_duplicates_on_create(db: AsyncSession, entity_type: str, record, allow_duplicate: bool) -> List[dict]:
+    """Candidates a new record may duplicate, returned with the create as a
+    warning. With DEDUPE_BLOCK_ON_CREATE the create is refused with 409
+    instead when one scores DEDUPE_BLOCK_SCORE or more."""
+    if not settings.DEDUPE_ON_CREATE:
+        return []
+    duplicates = await find_duplicates(db, entity_type, record)
+    if (
+        settings.DEDUPE_BLOCK_ON_CREATE
+        and not allow_duplicate
+        and any(candidate["score"] >= settings.DEDUPE_BLOCK_SCORE for candidate in duplicates)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": f"Possible duplicate of an existing {entity_type}; "
+                           "resend with allow_duplicate=true to create it anyway",
+                "duplicates": duplicates,
+            },
+        )
+    return duplicates
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent = array("i")
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> int:
+        a, b = self.find(a), self.find(b)
+        # The smaller position (smaller id) stays the root
+        self.parent[max(a, b)] = min(a, b)
+        return min(a, b)
+
+
+def cluster_duplicates(db: Session, spec: DedupeType) -> int:
+    """Group all records of spec into duplicate clusters and replace its
+    duplicate_clusters rows; returns the number of clusters.
+
+    One pass over the table unions records sharing a normalized email or
+    phone and keeps each name's LSH band hashes; then, band by band, records
+    landing in the same bucket are unioned when their names and companies
+    match as in match(). Work and memory are linear in the number of records.
+    """
+    ids = array("I")
+    band_hashes = array("q")
+    names: List[Optional[str]] = []
+    # Company of each cluster, by root: a record without one must not chain
+    # name matches across clusters of different companies
+    companies: List[Optional[str]] = []
+    sets = _DisjointSet()
+
+    def join(a: int, b: int) -> None:
+        company = companies[sets.find(a)] or companies[sets.find(b)]
+        companies[sets.union(a, b)] = company
+    by_email: Dict[str, int] = {}
+    by_phone: Dict[str, int] = {}
+    no_bands = [0] * BANDS
+
+    for rows in _chunks(db, spec):
+        for row in rows:
+            position = sets.add()
+            features = spec.features(row)
+            ids.append(row.id)
+            names.append(features.name)
+            companies.append(features.company and sys.intern(features.company))
+            if features.name:
+                signature = minhash(features.name)
+                band_hashes.extend(hash(tuple(signature[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS))
+            else:
+                band_hashes.extend(no_bands)
+            for value, seen in ((features.email, by_email), (features.phone, by_phone)):
+                if value:
+                    first = seen.setdefault(value, position)
+                    if first != position:
+                        join(first, position)
+    del by_email, by_phone
+
+    threshold = settings.DEDUPE_NAME_SIMILARITY
+    for band in range(BANDS):
+        buckets: Dict[int, list] = {}
+        for position, name in enumerate(names):
+            if name is None:
+                continue
+            members = buckets.setdefault(band_hashes[position * BANDS + band], [])
+            for other in members:
+                root, other_root = sets.find(position), sets.find(other)
+                if root == other_root or not _companies_compatible(companies[root], companies[other_root]):
+                    continue
+                if similarity(trigrams(names[other]), trigrams(name)) >= threshold:
+                    join(other, position)
+            if len(members) < MAX_BUCKET_COMPARISONS:
+                members.append(position)
+        del buckets
+
+    roots = array("i", (sets.find(position) for position in range(len(ids))))
+    sizes = array("i", bytes(4 * len(ids)))
+    for root in roots:
+        sizes[root] += 1
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for position, root in enumerate(roots):
+        if sizes[root] > 1:
+            clusters[root].append(ids[position])
+
+    db.execute(delete(DuplicateCluster).where(DuplicateCluster.entity_type == spec.name))
+    rows, count = [], 0
+    for root in sorted(clusters):
+        members = clusters[root]
+        count += 1
+        rows.extend(
+            {"entity_type": spec.name, "entity_id": entity_id, "cluster_id": members[0]}
+            for entity_id in members
+        )
+        if len(rows) >= CHUNK_SIZE:
+            db.execute(insert(DuplicateCluster), rows)
+            rows = []
+    if rows:
+        db.execute(insert(DuplicateCluster), rows)
+    db.commit()
+    return count
+
+
+def run_duplicate_clustering(db: Session) -> Dict[str, int]:
+    """Backfill duplicate_keys if it is empty, then recluster every type."""
+    if db.scalar(select(DuplicateKey.id).limit(1)) is None:
+        rebuild_duplicate_keys(db)
+    return {name: cluster_duplicates(db, spec) for name, spec in DEDUPE_TYPES.items()}
+
+
+duplicate_clusterer = PeriodicJob(
+    "duplicate-clusterer", settings.DEDUPE_CLUSTER_INTERVAL_SECONDS, run_duplicate_clustering
+)
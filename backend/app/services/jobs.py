@@ -0,0 +1,51 @@
+import logging
+import threading
+from typing import Any, Callable, Optional
+from sqlalchemy.orm import Session
+from app.core import database
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Background thread calling job(db) every interval seconds with its own
+    SessionLocal session. An interval <= 0 disables the job."""
+
+    def __init__(self, name: str, interval: float, job: Callable[[Session], Any]):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> Any:
+        db = database.SessionLocal()
+        try:
+            return self.job(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                result = self.run_once()
+            except Exception:
+                logger.exception("Periodic job %s failed", self.name)
+                continue
+            logger.info("Periodic job %s finished: %s", self.name, result)
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from app.core import security
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool, off the shared threadpool.
+
+    At most max_pending hash operations may be in flight (running or queued
+    for a worker); further calls fail fast with 503 so a login burst cannot
+    pile up behind the pool. With workers=0 hashing runs on the threadpool,
+    still bounded by max_pending.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    def start(self) -> None:
+        if self.workers > 0 and self._executor is None:
+            # spawn: forking a process that already runs threads can deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent sign-ins, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        try:
+            if self._executor is None:
+                return await run_in_threadpool(fn, *args)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            except BrokenProcessPool:
+                logger.exception("Password hashing pool died, restarting it")
+                self._executor = None
+                self.start()
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Retry shortly")
+        finally:
+            self._pending -= 1
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Return (valid, new_hash); new_hash is set when the stored hash was
+        made with a different cost and should be replaced."""
+        return await self._run(security.verify_and_update_password, password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.get_password_hash, password)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
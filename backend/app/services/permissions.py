@@ -0,0 +1,204 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, FrozenSet, Optional, Tuple
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from app.core.config import settings
+from app.models.core import User, Role, Permission, user_roles, role_permissions
+
+_PENDING_KEY = "permission_invalidations"
+_PENDING_ROLES_KEY = "permission_version_roles"
+_ALL_USERS = object()
+
+
+class TTLCache:
+    """Bounded LRU keyed by user id whose entries expire after ttl_seconds."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, user_id: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return value
+
+    def set(self, user_id: int, value: Any) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+# user_id -> (permissions_version or None, permission codes)
+permission_cache = TTLCache(
+    ttl_seconds=settings.PERMISSION_CACHE_TTL_SECONDS,
+    max_entries=settings.PERMISSION_CACHE_MAX_ENTRIES,
+)
+
+# user_id -> (permissions_version, is_active), used to revoke stateless tokens
+principal_state_cache = TTLCache(
+    ttl_seconds=settings.PRINCIPAL_VERSION_TTL_SECONDS,
+    max_entries=settings.PERMISSION_CACHE_MAX_ENTRIES,
+)
+
+
+async def load_user_permissions(db: AsyncSession, user_id: int) -> FrozenSet[str]:
+    result = await db.execute(
+        select(Permission.code)
+        .join(role_permissions, role_permissions.c.permission_id == Permission.id)
+        .join(user_roles, user_roles.c.role_id == role_permissions.c.role_id)
+        .where(user_roles.c.user_id == user_id)
+        .distinct()
+    )
+    return frozenset(result.scalars().all())
+
+
+async def get_user_permissions(db: AsyncSession, user_id: int, version: Optional[int] = None) -> FrozenSet[str]:
+    """Permission codes of a user, cached for PERMISSION_CACHE_TTL_SECONDS.
+
+    Entries are tagged with the permissions_version they were loaded for;
+    passing the user's current version reloads an entry whose roles were
+    changed since, including by another process.
+    """
+    entry = permission_cache.get(user_id)
+    if entry is not None and (version is None or entry[0] == version):
+        return entry[1]
+    codes = await load_user_permissions(db, user_id)
+    permission_cache.set(user_id, (version, codes))
+    return codes
+
+
+def cache_user_permissions(user: User) -> FrozenSet[str]:
+    """Permission codes of a user loaded with roles and their permissions,
+    cached under the permissions_version read with them."""
+    codes = frozenset(
+        permission.code for role in user.roles for permission in role.permissions
+    )
+    permission_cache.set(user.id, (user.permissions_version or 0, codes))
+    return codes
+
+
+async def get_principal_state(db: AsyncSession, user_id: int) -> Optional[Tuple[int, bool]]:
+    state = principal_state_cache.get(user_id)
+    if state is None:
+        result = await db.execute(
+            select(User.permissions_version, User.is_active).where(User.id == user_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        state = (row.permissions_version or 0, bool(row.is_active))
+        principal_state_cache.set(user_id, state)
+    return state
+
+
+def invalidate_permissions(user_id: Optional[int] = None) -> None:
+    """Drop cached permissions for one user, or for everyone when user_id is None.
+
+    Call this after changing user_roles/role_permissions outside the ORM
+    relationships (raw SQL, bulk inserts); ORM changes are tracked automatically.
+    Stateless tokens of affected users additionally need their
+    permissions_version bumped to be rejected by other processes.
+    """
+    permission_cache.invalidate(user_id)
+    principal_state_cache.invalidate(user_id)
+
+
+# Invalidation on ORM changes. Entries are dropped after the session commits so
+# a concurrent request cannot re-populate the cache from pre-commit data.
+
+def _schedule_invalidation(target, key) -> None:
+    session = object_session(target)
+    if session is None:
+        invalidate_permissions(None if key is _ALL_USERS else key)
+        return
+    session.info.setdefault(_PENDING_KEY, set()).add(key)
+
+
+def _bump_version(user: User) -> None:
+    user.permissions_version = (user.permissions_version or 0) + 1
+
+
+def _on_user_roles_change(target, value, initiator):
+    _bump_version(target)
+    if target.id is not None:
+        _schedule_invalidation(target, target.id)
+
+
+def _on_role_users_change(target, value, initiator):
+    _bump_version(value)
+    if value.id is not None:
+        _schedule_invalidation(target, value.id)
+
+
+def _on_role_permissions_change(target, value, initiator):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_ROLES_KEY, set()).add(target)
+    _schedule_invalidation(target, _ALL_USERS)
+
+
+def _on_user_active_change(target, value, oldvalue, initiator):
+    if target.id is not None and value != oldvalue:
+        _bump_version(target)
+        _schedule_invalidation(target, target.id)
+
+
+for _identifier in ("append", "remove"):
+    event.listen(User.roles, _identifier, _on_user_roles_change)
+    event.listen(Role.users, _identifier, _on_role_users_change)
+    event.listen(Role.permissions, _identifier, _on_role_permissions_change)
+event.listen(User.is_active, "set", _on_user_active_change)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_role_member_versions(session, flush_context):
+    roles = session.info.pop(_PENDING_ROLES_KEY, None)
+    role_ids = [role.id for role in roles or () if role.id is not None]
+    if not role_ids:
+        return
+    users = User.__table__
+    members = select(user_roles.c.user_id).where(user_roles.c.role_id.in_(role_ids))
+    session.connection().execute(
+        users.update()
+        .where(users.c.id.in_(members))
+        .values(permissions_version=users.c.permissions_version + 1)
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_invalidations(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    if _ALL_USERS in pending:
+        invalidate_permissions()
+        return
+    for user_id in pending:
+        invalidate_permissions(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_PENDING_ROLES_KEY, None)
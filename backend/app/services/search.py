@@ -0,0 +1,325 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from threading import Lock
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+from sqlalchemy import column, delete, event, func, insert, inspect, literal, literal_column, or_, select, table, tuple_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core import database
+from app.core.config import settings
+from app.models.core import SearchDocument
+from app.models.crm import Customer, Lead
+from app.models.hr import Employee
+from app.models.inventory import Product
+from app.services.jobs import PeriodicJob
+
+# Global search: every searchable entity has one search_documents row (title
+# plus the other searchable columns as body) written in the same transaction
+# as the entity. Queries go to the backend's full-text index; the optional
+# in-process trigram index supplies typo-tolerant matches on top.
+
+Key = Tuple[str, int]
+
+MAX_TERMS = 8
+SYNC_BATCH_SIZE = 10000
+
+
+class SearchType:
+    def __init__(self, name: str, model, permission: str, title, body: list):
+        self.name = name
+        self.model = model
+        self.permission = permission
+        self.title = title
+        self.body = body
+        # Attributes whose change rewrites the document
+        self.keys = {title.key, *(c.key for c in body)}
+
+    def documents(self):
+        body = func.coalesce(self.body[0], "")
+        for col in self.body[1:]:
+            body = body + " " + func.coalesce(col, "")
+        return select(literal(self.name), self.model.id, self.title, func.trim(body))
+
+
+SEARCH_TYPES = {
+    "customer": SearchType(
+        "customer", Customer, "crm.customers.read", Customer.name,
+        [Customer.company, Customer.email, Customer.phone],
+    ),
+    "lead": SearchType("lead", Lead, "crm.leads.read", Lead.name, [Lead.email, Lead.phone, Lead.source]),
+    "product": SearchType("product", Product, "inv.products.read", Product.name, [Product.sku, Product.description]),
+    "employee": SearchType("employee", Employee, "hr.employees.read", Employee.full_name, [Employee.title, Employee.email]),
+}
+_TYPES_BY_MODEL = {spec.model: spec for spec in SEARCH_TYPES.values()}
+
+
+def _reindex(connection, spec: SearchType, where: Optional[Callable] = None, replace: bool = True) -> None:
+    # where(id_column) restricts both statements to the affected entity ids
+    if replace:
+        stale = delete(SearchDocument).where(SearchDocument.entity_type == spec.name)
+        if where is not None:
+            stale = stale.where(where(SearchDocument.entity_id))
+        connection.execute(stale)
+    documents = spec.documents()
+    if where is not None:
+        documents = documents.where(where(spec.model.id))
+    connection.execute(
+        insert(SearchDocument).from_select(["entity_type", "entity_id", "title", "body"], documents)
+    )
+
+
+def _text_changed(obj, spec: SearchType) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[key].history.has_changes() for key in spec.keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _index_flushed_rows(session, flush_context):
+    # Documents follow ORM writes inside the same transaction, so a rollback
+    # undoes both.
+    created, changed, deleted = defaultdict(set), defaultdict(set), defaultdict(set)
+    for obj in session.new:
+        spec = _TYPES_BY_MODEL.get(type(obj))
+        if spec:
+            created[spec].add(obj.id)
+    for obj in session.dirty:
+        spec = _TYPES_BY_MODEL.get(type(obj))
+        if spec and _text_changed(obj, spec):
+            changed[spec].add(obj.id)
+    for obj in session.deleted:
+        spec = _TYPES_BY_MODEL.get(type(obj))
+        if spec:
+            deleted[spec].add(obj.id)
+    if not (created or changed or deleted):
+        return
+    connection = session.connection()
+    for spec, ids in created.items():
+        _reindex(connection, spec, lambda id_column, ids=ids: id_column.in_(ids), replace=False)
+    for spec, ids in changed.items():
+        _reindex(connection, spec, lambda id_column, ids=ids: id_column.in_(ids))
+    for spec, ids in deleted.items():
+        connection.execute(
+            delete(SearchDocument)
+            .where(SearchDocument.entity_type == spec.name, SearchDocument.entity_id.in_(ids))
+        )
+
+
+async def index_rows(db: AsyncSession, model, ids: List[int]) -> None:
+    """Index the new rows ids of model, written with Core statements that
+    bypass the ORM flush hook."""
+    spec = _TYPES_BY_MODEL.get(model)
+    if spec is None or not ids:
+        return
+    await db.run_sync(
+        lambda session: _reindex(session.connection(), spec, lambda id_column: id_column.in_(ids), replace=False)
+    )
+
+
+def rebuild_search_index(db: Session) -> int:
+    """Recreate every document from the entity tables and commit."""
+    db.execute(delete(SearchDocument))
+    for spec in SEARCH_TYPES.values():
+        _reindex(db.connection(), spec, replace=False)
+    db.commit()
+    return db.scalar(select(func.count()).select_from(SearchDocument))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words without diacritics, split like the FTS5 unicode61
+    tokenizer."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.findall(r"[^\W_]+", text)
+
+
+def trigrams(word: str) -> FrozenSet[str]:
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class TrigramIndex:
+    """In-process, word-level trigram index for typo-tolerant lookups.
+
+    Each trigram maps to the words containing it and each word to the
+    documents containing it; a query term matches the words whose trigram
+    similarity (as in pg_trgm) reaches min_similarity. Entries are only
+    candidates: search() re-checks them against the current documents.
+    """
+
+    def __init__(self):
+        self.last_id = 0  # highest search_documents.id loaded
+        self._lock = Lock()
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._word_trigrams: Dict[str, FrozenSet[str]] = {}
+        self._word_documents: Dict[str, Set[Key]] = {}
+        self._document_words: Dict[Key, FrozenSet[str]] = {}
+
+    def add(self, key: Key, text: str) -> None:
+        words = frozenset(tokenize(text))
+        with self._lock:
+            old = self._document_words.get(key, frozenset())
+            for word in old - words:
+                documents = self._word_documents[word]
+                documents.discard(key)
+                if not documents:
+                    del self._word_documents[word]
+                    for gram in self._word_trigrams.pop(word):
+                        self._postings[gram].discard(word)
+            for word in words - old:
+                if word not in self._word_documents:
+                    self._word_documents[word] = set()
+                    self._word_trigrams[word] = trigrams(word)
+                    for gram in self._word_trigrams[word]:
+                        self._postings[gram].add(word)
+                self._word_documents[word].add(key)
+            self._document_words[key] = words
+
+    def search(self, terms: List[str], types: Set[str], limit: int, min_similarity: float) -> List[Tuple[Key, float]]:
+        """Keys whose words match every term, best mean similarity first."""
+        scores: Optional[Dict[Key, float]] = None
+        with self._lock:
+            for term in terms:
+                grams = trigrams(term)
+                shared = Counter()
+                for gram in grams:
+                    shared.update(self._postings.get(gram, ()))
+                best: Dict[Key, float] = {}
+                for word, count in shared.items():
+                    score = count / (len(grams) + len(self._word_trigrams[word]) - count)
+                    if score < min_similarity:
+                        continue
+                    for key in self._word_documents[word]:
+                        if key[0] in types and score > best.get(key, 0.0):
+                            best[key] = score
+                scores = best if scores is None else {k: scores[k] + s for k, s in best.items() if k in scores}
+                if not scores:
+                    return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(key, score / len(terms)) for key, score in ranked]
+
+
+trigram_index = TrigramIndex()
+
+
+def _fuzzy_score(terms: List[str], text: str, min_similarity: float) -> Optional[float]:
+    words = [trigrams(word) for word in tokenize(text)]
+    total = 0.0
+    for term in terms:
+        grams = trigrams(term)
+        best = max((similarity(grams, word) for word in words), default=0.0)
+        if best < min_similarity:
+            return None
+        total += best
+    return total / len(terms)
+
+
+def _fulltext_query(terms: List[str]):
+    docs = SearchDocument
+    dialect = database.engine.dialect.name
+    if dialect == "sqlite":
+        fts = table("search_documents_fts", column("rowid"))
+        score = (-func.bm25(literal_column("search_documents_fts"), 4.0, 1.0)).label("score")
+        return (
+            select(docs.entity_type, docs.entity_id, docs.title, docs.body, score)
+            .join(fts, fts.c.rowid == docs.id)
+            .where(literal_column("search_documents_fts").op("MATCH")(" ".join(f'"{t}"*' for t in terms)))
+        )
+    if dialect == "mysql":
+        relevance = match(docs.title, docs.body, against=" ".join(f"+{t}*" for t in terms)).in_boolean_mode()
+        return (
+            select(docs.entity_type, docs.entity_id, docs.title, docs.body, relevance.label("score"))
+            .where(relevance)
+        )
+    # No full-text index on this backend
+    query = select(docs.entity_type, docs.entity_id, docs.title, docs.body, literal(1.0).label("score"))
+    for term in terms:
+        query = query.where(or_(docs.title.ilike(f"%{term}%"), docs.body.ilike(f"%{term}%")))
+    return query
+
+
+def _hit(row, score: float, match_type: str) -> dict:
+    return {
+        "entity_type": row.entity_type,
+        "entity_id": row.entity_id,
+        "title": row.title,
+        "detail": row.body or None,
+        "score": round(float(score), 4),
+        "match": match_type,
+    }
+
+
+async def search_documents(db: AsyncSession, q: str, types: List[str], limit: int) -> List[dict]:
+    """Ranked hits for q among the given entity types: full-text (prefix)
+    matches first, then trigram matches for misspelled terms."""
+    terms = tokenize(q)[:MAX_TERMS]
+    if not terms or not types:
+        return []
+    result = await db.execute(
+        _fulltext_query(terms)
+        .where(SearchDocument.entity_type.in_(types))
+        .order_by(literal_column("score").desc(), SearchDocument.id)
+        .limit(limit)
+    )
+    hits = [_hit(row, row.score, "fulltext") for row in result]
+    if not settings.SEARCH_TRIGRAM_ENABLED or len(hits) >= limit:
+        return hits
+
+    found = {(hit["entity_type"], hit["entity_id"]) for hit in hits}
+    min_similarity = settings.SEARCH_TRIGRAM_MIN_SIMILARITY
+    candidates = [
+        key for key, _ in trigram_index.search(terms, set(types), 2 * limit, min_similarity)
+        if key not in found
+    ]
+    if not candidates:
+        return hits
+    result = await db.execute(
+        select(SearchDocument.entity_type, SearchDocument.entity_id, SearchDocument.title, SearchDocument.body)
+        .where(tuple_(SearchDocument.entity_type, SearchDocument.entity_id).in_(candidates))
+    )
+    fuzzy = []
+    for row in result:
+        score = _fuzzy_score(terms, f"{row.title} {row.body or ''}", min_similarity)
+        if score is not None:
+            fuzzy.append(_hit(row, score, "fuzzy"))
+    fuzzy.sort(key=lambda hit: (-hit["score"], hit["entity_type"], hit["entity_id"]))
+    return hits + fuzzy[:limit - len(hits)]
+
+
+_backfill_checked = False
+
+
+def sync_search_index(db: Session) -> int:
+    """Backfill an empty search_documents table once, then load documents
+    written since the last run into the trigram index."""
+    global _backfill_checked
+    if not _backfill_checked:
+        if db.scalar(select(SearchDocument.id).limit(1)) is None:
+            rebuild_search_index(db)
+        _backfill_checked = True
+    if not settings.SEARCH_TRIGRAM_ENABLED:
+        return 0
+    loaded = 0
+    while True:
+        rows = db.execute(
+            select(SearchDocument.id, SearchDocument.entity_type, SearchDocument.entity_id,
+                   SearchDocument.title, SearchDocument.body)
+            .where(SearchDocument.id > trigram_index.last_id)
+            .order_by(SearchDocument.id)
+            .limit(SYNC_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return loaded
+        for row in rows:
+            trigram_index.add((row.entity_type, row.entity_id), f"{row.title} {row.body or ''}")
+        trigram_index.last_id = rows[-1].id
+        loaded += len(rows)
+
+
+search_indexer = PeriodicJob("search-indexer", settings.SEARCH_SYNC_INTERVAL_SECONDS, sync_search_index)
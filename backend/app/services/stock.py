@@ -0,0 +1,118 @@
+import logging
+from typing import Any, Dict
+from sqlalchemy import case, event, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.inventory import (
+    InventoryTransaction, Product, StockAlert, StockAlertType, TransactionType
+)
+
+logger = logging.getLogger(__name__)
+
+
+def stock_delta(type: str, quantity: int) -> int:
+    """Signed change a movement applies to Product.current_stock.
+
+    ADJUSTMENT is relative (adds quantity, which may be negative), matching the
+    requirement that adjustments can increase or decrease stock.
+    """
+    if type == TransactionType.IN:
+        return quantity
+    if type == TransactionType.OUT:
+        return -quantity
+    if type == TransactionType.ADJUSTMENT:
+        return quantity
+    raise ValueError(f"Unknown transaction type: {type}")
+
+
+def signed_quantity():
+    """SQL expression for stock_delta over InventoryTransaction rows."""
+    return case(
+        (InventoryTransaction.type == TransactionType.OUT, -InventoryTransaction.quantity),
+        else_=InventoryTransaction.quantity,
+    )
+
+
+def _column_default(column) -> Any:
+    return column.default.arg if column.default is not None else None
+
+
+def is_low_stock(stock, threshold) -> bool:
+    # Unset values take the column defaults they will be inserted with
+    if stock is None:
+        stock = _column_default(Product.__table__.c.current_stock)
+    if threshold is None:
+        threshold = _column_default(Product.__table__.c.low_stock_threshold)
+    return stock <= threshold
+
+
+def with_low_stock_flag(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Set is_low_stock on product rows inserted with Core (bulk import)."""
+    values["is_low_stock"] = is_low_stock(values.get("current_stock"), values.get("low_stock_threshold"))
+    return values
+
+
+def refresh_low_stock_flags(db: Session) -> None:
+    """Recompute is_low_stock for every product, e.g. after adding the column
+    to an existing database."""
+    db.execute(
+        update(Product).values(is_low_stock=Product.current_stock <= Product.low_stock_threshold)
+    )
+    db.commit()
+
+
+@event.listens_for(Product, "before_insert")
+def _flag_new_product(mapper, connection, target):
+    target.is_low_stock = is_low_stock(target.current_stock, target.low_stock_threshold)
+
+
+def _alert(product_id: int, low: bool, stock: int, threshold: int) -> Dict[str, Any]:
+    alert_type = StockAlertType.LOW if low else StockAlertType.RESTORED
+    logger.info("Product %s stock %s: %s (threshold %s)", product_id, alert_type.value, stock, threshold)
+    return {"product_id": product_id, "type": alert_type, "stock": stock, "threshold": threshold}
+
+
+@event.listens_for(Product, "before_update")
+def _flag_updated_product(mapper, connection, target):
+    # Crossing the threshold in either direction records a StockAlert in the
+    # same transaction as the stock change
+    low = is_low_stock(target.current_stock, target.low_stock_threshold)
+    if low == target.is_low_stock:
+        return
+    target.is_low_stock = low
+    connection.execute(
+        insert(StockAlert).values(_alert(target.id, low, target.current_stock, target.low_stock_threshold))
+    )
+
+
+async def write_stock_levels(db: AsyncSession, products: Dict[int, Product], stock: Dict[int, int]) -> None:
+    """Set current_stock of the (locked) products to stock[id] in a single
+    UPDATE ... CASE, with the is_low_stock flags and threshold-crossing
+    alerts the ORM hooks above would write one product at a time.
+
+    The products are reloaded afterwards with one SELECT.
+    """
+    changed = {pid: level for pid, level in stock.items() if level != products[pid].current_stock}
+    if not changed:
+        return
+    low = {pid: is_low_stock(level, products[pid].low_stock_threshold) for pid, level in changed.items()}
+    await db.execute(
+        update(Product)
+        .where(Product.id.in_(changed))
+        .values(
+            current_stock=case(changed, value=Product.id),
+            is_low_stock=case(low, value=Product.id),
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    alerts = [
+        _alert(pid, low[pid], level, products[pid].low_stock_threshold)
+        for pid, level in changed.items()
+        if low[pid] != products[pid].is_low_stock
+    ]
+    if alerts:
+        await db.execute(insert(StockAlert), alerts)
+    await db.execute(
+        select(Product).where(Product.id.in_(changed)).execution_options(populate_existing=True)
+    )
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+from sqlalchemy import DateTime, and_, exists, func, insert, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.inventory import InventoryTransaction, Product, StockSnapshot
+from app.services.jobs import PeriodicJob
+from app.services.stock import signed_quantity
+
+# Point-in-time stock: stock as of T is the nearest snapshot plus the movements
+# between the snapshot and T, so a query replays at most one snapshot interval
+# of the ledger per product.
+
+# Snapshots are taken this far in the past so transactions still in flight
+# when the job runs are already covered by current_stock.
+SNAPSHOT_LAG = timedelta(minutes=1)
+
+
+def take_snapshots(db: Session) -> int:
+    """Snapshot the products that moved since their last snapshot, in a
+    single INSERT ... SELECT.
+
+    The value is derived from current_stock minus the movements created since
+    taken_at, read in the same transaction. Products without new movements
+    keep their last snapshot, which stock_as_of replays from.
+    """
+    taken_at = db.scalar(select(func.now())) - SNAPSHOT_LAG
+    last = (
+        select(StockSnapshot.product_id, func.max(StockSnapshot.taken_at).label("taken_at"))
+        .group_by(StockSnapshot.product_id)
+        .subquery()
+    )
+    moved = exists().where(
+        InventoryTransaction.product_id == Product.id,
+        InventoryTransaction.created_at < taken_at,
+        or_(last.c.taken_at.is_(None), InventoryTransaction.created_at >= last.c.taken_at),
+    )
+    recent = (
+        select(InventoryTransaction.product_id, func.sum(signed_quantity()).label("delta"))
+        .where(InventoryTransaction.created_at >= taken_at)
+        .group_by(InventoryTransaction.product_id)
+        .subquery()
+    )
+    result = db.execute(
+        insert(StockSnapshot).from_select(
+            ["product_id", "taken_at", "stock"],
+            select(
+                Product.id,
+                literal(taken_at, DateTime(timezone=True)),
+                func.coalesce(Product.current_stock, 0) - func.coalesce(recent.c.delta, 0),
+            )
+            .outerjoin(recent, recent.c.product_id == Product.id)
+            .outerjoin(last, last.c.product_id == Product.id)
+            .where(moved),
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _nearest_snapshots(product_ids, at: datetime, before: bool):
+    if before:
+        nearest = func.max(StockSnapshot.taken_at).label("taken_at")
+        condition = StockSnapshot.taken_at <= at
+    else:
+        nearest = func.min(StockSnapshot.taken_at).label("taken_at")
+        condition = StockSnapshot.taken_at > at
+    return (
+        select(StockSnapshot.product_id, nearest)
+        .where(StockSnapshot.product_id.in_(product_ids), condition)
+        .group_by(StockSnapshot.product_id)
+        .subquery()
+    )
+
+
+async def _movements(db: AsyncSession, product_ids, lower, upper=None, nearest=None) -> Dict[int, int]:
+    # Net movement per product with lower <= created_at < upper; a bound may
+    # be the taken_at column of the joined nearest-snapshot subquery.
+    query = select(InventoryTransaction.product_id, func.sum(signed_quantity())).where(
+        InventoryTransaction.product_id.in_(product_ids),
+        InventoryTransaction.created_at >= lower,
+    )
+    if upper is not None:
+        query = query.where(InventoryTransaction.created_at < upper)
+    if nearest is not None:
+        query = query.join(nearest, nearest.c.product_id == InventoryTransaction.product_id)
+    result = await db.execute(query.group_by(InventoryTransaction.product_id))
+    return {product_id: delta or 0 for product_id, delta in result.all()}
+
+
+async def _from_snapshots(db: AsyncSession, product_ids, at: datetime, before: bool) -> Dict[int, int]:
+    nearest = _nearest_snapshots(product_ids, at, before)
+    result = await db.execute(
+        select(StockSnapshot.product_id, StockSnapshot.stock).join(
+            nearest,
+            and_(
+                StockSnapshot.product_id == nearest.c.product_id,
+                StockSnapshot.taken_at == nearest.c.taken_at,
+            ),
+        )
+    )
+    stock = dict(result.all())
+    if not stock:
+        return stock
+    if before:
+        # Replay forward from the snapshot up to at
+        deltas = await _movements(db, list(stock), nearest.c.taken_at, at, nearest)
+        return {pid: value + deltas.get(pid, 0) for pid, value in stock.items()}
+    # Undo the movements between at and the later snapshot
+    deltas = await _movements(db, list(stock), at, nearest.c.taken_at, nearest)
+    return {pid: value - deltas.get(pid, 0) for pid, value in stock.items()}
+
+
+async def stock_as_of(db: AsyncSession, products: Iterable[Product], at: datetime) -> Dict[int, int]:
+    """Stock of each product after every movement created before at.
+
+    Uses the latest snapshot before at where one exists, otherwise the
+    earliest snapshot after it (or current_stock) replayed backwards. Products
+    created after at had no stock yet.
+    """
+    products = {p.id: p for p in products if p.created_at is None or p.created_at < at}
+    if not products:
+        return {}
+    stock = await _from_snapshots(db, list(products), at, before=True)
+    remaining = [pid for pid in products if pid not in stock]
+    if remaining:
+        stock.update(await _from_snapshots(db, remaining, at, before=False))
+        remaining = [pid for pid in remaining if pid not in stock]
+    if remaining:
+        deltas = await _movements(db, remaining, at)
+        for pid in remaining:
+            stock[pid] = (products[pid].current_stock or 0) - deltas.get(pid, 0)
+    return stock
+
+
+stock_snapshotter = PeriodicJob(
+    "stock-snapshotter", settings.STOCK_SNAPSHOT_INTERVAL_SECONDS, take_snapshots
+)
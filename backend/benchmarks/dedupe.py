@@ -0,0 +1,143 @@
+"""Duplicate clustering benchmark on synthetic customers.
+
+Run from backend/:
+
+    python -m benchmarks.dedupe [--rows 100000] [--duplicates 0.1] [--seed 7]
+
+Fills a throwaway SQLite database (or DATABASE_URL) with --rows customers,
+a --duplicates share of which are variants of another row (case and
+whitespace, email +tags, phone formatting, a typo in the name, dropped
+fields). Times the duplicate key backfill and the clustering job, then
+scores the clusters against the known duplicate pairs. Exits non-zero when
+recall or precision falls below --min-recall / --min-precision.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+SYLLABLES = ["ka", "lo", "ve", "ra", "mi", "to", "sun", "del", "ar", "ni", "po", "zel", "ta", "ri", "mon", "ga",
+             "bes", "qui", "fa", "nor", "eth", "wu", "jin", "hal", "cor", "yen", "pi", "dra"]
+SUFFIXES = ["Ltd", "Inc", "LLC", "(Pvt) Ltd", "Corp", ""]
+
+
+def word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 4))).capitalize()
+
+
+def typo(rng, text):
+    i = rng.randrange(1, len(text) - 1)
+    if rng.random() < 0.5:
+        return text[:i] + text[i + 1:]
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def variant(rng, original):
+    row = dict(original)
+    if rng.random() < 0.5:
+        row["name"] = "  ".join(row["name"].upper().split())
+    else:
+        row["name"] = typo(rng, row["name"])
+    if row["email"] and rng.random() < 0.5:
+        local, _, domain = row["email"].partition("@")
+        row["email"] = f"{local.upper()}+crm@{domain}"
+    elif rng.random() < 0.5:
+        row["email"] = None
+    if row["phone"] and rng.random() < 0.5:
+        digits = row["phone"]
+        row["phone"] = f"+94 {digits[1:3]} {digits[3:6]} {digits[6:]}"
+    elif rng.random() < 0.5:
+        row["phone"] = None
+    if rng.random() < 0.3:
+        row["company"] = None
+    return row
+
+
+def generate(rows, duplicate_share, seed):
+    rng = random.Random(seed)
+    originals, labels = [], []
+    records = []
+    for entity_id in range(1, rows + 1):
+        if originals and rng.random() < duplicate_share:
+            source_id = rng.choice(originals)
+            records.append(variant(rng, records[source_id - 1]))
+            labels.append(labels[source_id - 1])
+            continue
+        company = f"{word(rng)} {word(rng)}"
+        name = f"{word(rng)} {word(rng)}"
+        records.append({
+            "name": name,
+            "email": f"{name.replace(' ', '.').lower()}{entity_id}@example.com" if rng.random() < 0.8 else None,
+            "phone": f"07{entity_id:08d}" if rng.random() < 0.7 else None,
+            "company": f"{company} {rng.choice(SUFFIXES)}".strip() if rng.random() < 0.7 else None,
+        })
+        originals.append(entity_id)
+        labels.append(entity_id)
+    return records, labels
+
+
+def pairs(sizes):
+    return sum(n * (n - 1) // 2 for n in sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="customers generated")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of rows that duplicate another")
+    parser.add_argument("--seed", type=int, default=7, help="random seed")
+    parser.add_argument("--min-recall", type=float, default=0.9)
+    parser.add_argument("--min-precision", type=float, default=0.9)
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="erp-dedupe-"), "dedupe.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from sqlalchemy import insert, select
+    from app.core.database import Base, SessionLocal, engine
+    from app.models.crm import Customer, DuplicateCluster
+    from app.services.dedupe import DEDUPE_TYPES, _index_rows, cluster_duplicates
+
+    Base.metadata.create_all(bind=engine)
+    records, labels = generate(args.rows, args.duplicates, args.seed)
+    with engine.begin() as conn:
+        for start in range(0, len(records), 50000):
+            conn.execute(insert(Customer), [
+                {"id": start + offset + 1, **record}
+                for offset, record in enumerate(records[start:start + 50000])
+            ])
+
+    spec = DEDUPE_TYPES["customer"]
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        _index_rows(db, spec)
+        db.commit()
+        indexed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        clusters = cluster_duplicates(db, spec)
+        clustered = time.perf_counter() - started
+
+        members = db.execute(select(DuplicateCluster.entity_id, DuplicateCluster.cluster_id)).all()
+
+    by_cluster = defaultdict(list)
+    for entity_id, cluster_id in members:
+        by_cluster[cluster_id].append(labels[entity_id - 1])
+    predicted = pairs(len(group) for group in by_cluster.values())
+    correct = sum(pairs(Counter(group).values()) for group in by_cluster.values())
+    expected = pairs(Counter(labels).values())
+    recall = correct / expected if expected else 1.0
+    precision = correct / predicted if predicted else 1.0
+
+    print(f"customers        {args.rows} rows, {expected} duplicate pairs")
+    print(f"key backfill     {indexed:8.1f} s  ({args.rows / indexed:,.0f} rows/s)")
+    print(f"clustering       {clustered:8.1f} s  ({args.rows / clustered:,.0f} rows/s), {clusters} clusters")
+    print(f"pairs            recall {recall:.3f}  precision {precision:.3f}")
+    sys.exit(0 if recall >= args.min_recall and precision >= args.min_precision else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""Load benchmark for the v1 API endpoints.
+
+Run from backend/:
+
+    python -m benchmarks.endpoints --requests 200 --concurrency 8 --output results.json
+    python -m benchmarks.endpoints --baseline results.json        # run and flag regressions
+    python -m benchmarks.endpoints --compare old.json new.json    # diff two stored runs
+
+Boots app.main.app in-process (httpx over ASGI, no network) against a
+throwaway SQLite database unless DATABASE_URL is set (point it at a scratch
+MySQL schema for realistic numbers), seeds it, then drives every endpoint in
+SCENARIOS with --concurrency requests in flight and reports throughput and
+p50/p95/p99 latency. Exits non-zero when --baseline/--compare finds a
+regression beyond --threshold.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+ADMIN = ("admin@erp.com", "admin123")
+
+# name -> (method, build(i, ctx) -> (path, request kwargs)); paths are
+# relative to API_V1_STR and requests are sent with the admin token unless
+# the kwargs carry their own headers.
+SCENARIOS = {
+    "auth.login": ("POST", lambda i, ctx: ("/auth/login", {
+        "data": {"username": ADMIN[0], "password": ADMIN[1]}, "headers": {},
+    })),
+    "auth.me": ("GET", lambda i, ctx: ("/auth/me", {})),
+    "users.list": ("GET", lambda i, ctx: ("/users/", {})),
+    "users.create": ("POST", lambda i, ctx: ("/users/", {
+        "json": {"email": f"bench-{ctx['run']}-{i}@erp.com", "password": "bench-password"},
+    })),
+    "users.audit_logs": ("GET", lambda i, ctx: ("/users/audit-logs", {})),
+    "users.audit_logs_export": ("GET", lambda i, ctx: ("/users/audit-logs/export", {})),
+    "hr.departments.list": ("GET", lambda i, ctx: ("/hr/departments", {})),
+    "hr.departments.create": ("POST", lambda i, ctx: ("/hr/departments", {
+        "json": {"name": f"Bench {ctx['run']}-{i}"},
+    })),
+    "hr.employees.list": ("GET", lambda i, ctx: ("/hr/employees", {})),
+    "hr.employees.me": ("GET", lambda i, ctx: ("/hr/employees/me", {})),
+    "hr.employees.create": ("POST", lambda i, ctx: ("/hr/employees", {
+        "json": {"full_name": f"Bench {i}", "email": f"bench{i}@erp.com", "department_id": 1},
+    })),
+    "hr.employees.bulk": ("POST", lambda i, ctx: ("/hr/employees/bulk", {
+        "json": [{"full_name": f"Bulk {i}-{j}", "email": f"bulk{j}@erp.com"} for j in range(100)],
+    })),
+    "hr.leave.list": ("GET", lambda i, ctx: ("/hr/leave-requests", {})),
+    "hr.leave.create": ("POST", lambda i, ctx: ("/hr/leave-requests", {
+        "json": {"employee_id": ctx["employee_ids"][i % len(ctx["employee_ids"])],
+                 "start_date": "2026-01-01", "end_date": "2026-01-02"},
+    })),
+    "hr.leave.approve": ("POST", lambda i, ctx: (f"/hr/leave-requests/{ctx['pending_leave'].pop()}/approve", {})),
+    "hr.leave.reject": ("POST", lambda i, ctx: (f"/hr/leave-requests/{ctx['pending_leave'].pop()}/reject", {})),
+    "inventory.products.list": ("GET", lambda i, ctx: ("/inventory/products", {})),
+    "inventory.products.list_fields": ("GET", lambda i, ctx: ("/inventory/products", {
+        "params": {"fields": "sku,name,current_stock"},
+    })),
+    "inventory.products.create": ("POST", lambda i, ctx: ("/inventory/products", {
+        "json": {"sku": f"BENCH-{ctx['run']}-{i}", "name": f"Bench {i}", "current_stock": 100},
+    })),
+    "inventory.products.bulk": ("POST", lambda i, ctx: ("/inventory/products/bulk", {
+        "json": [{"sku": f"BULK-{ctx['run']}-{i}-{j}", "name": f"Bulk {j}"} for j in range(100)],
+    })),
+    "inventory.transactions.create": ("POST", lambda i, ctx: ("/inventory/transactions", {
+        "json": {"product_id": ctx["product_ids"][i % len(ctx["product_ids"])], "type": "IN", "quantity": 1},
+    })),
+    "inventory.transactions.batch": ("POST", lambda i, ctx: ("/inventory/transactions/batch", {
+        "json": {"lines": [
+            {"product_id": ctx["product_ids"][(i + j) % len(ctx["product_ids"])], "type": "IN", "quantity": 1}
+            for j in range(20)
+        ]},
+    })),
+    "inventory.transactions.list": ("GET", lambda i, ctx: ("/inventory/transactions", {})),
+    "inventory.transactions.export": ("GET", lambda i, ctx: ("/inventory/transactions/export", {})),
+    "inventory.stock_as_of": ("GET", lambda i, ctx: ("/inventory/stock-as-of", {
+        "params": {"date": date.today().isoformat()},
+    })),
+    "inventory.low_stock": ("GET", lambda i, ctx: ("/inventory/low-stock", {})),
+    "crm.customers.list": ("GET", lambda i, ctx: ("/crm/customers", {})),
+    "crm.customers.create": ("POST", lambda i, ctx: ("/crm/customers", {
+        "json": {"name": f"Bench {i}", "email": f"bench-{ctx['run']}-{i}@example.com"},
+    })),
+    "crm.customers.duplicates": ("POST", lambda i, ctx: ("/crm/customers/duplicates", {
+        "json": {"name": f"BENCH  {i}", "email": f"Bench-{ctx['run']}-{i}@Example.com"},
+    })),
+    "crm.customers.duplicate_clusters": ("GET", lambda i, ctx: ("/crm/customers/duplicate-clusters", {})),
+    "crm.customers.bulk": ("POST", lambda i, ctx: ("/crm/customers/bulk", {
+        "json": [{"name": f"Bulk {i}-{j}"} for j in range(100)],
+    })),
+    "crm.customers.export": ("GET", lambda i, ctx: ("/crm/customers/export", {})),
+    "crm.leads.list": ("GET", lambda i, ctx: ("/crm/leads", {})),
+    "crm.leads.list_with_customer": ("GET", lambda i, ctx: ("/crm/leads", {"params": {"include": "customer"}})),
+    "crm.leads.create": ("POST", lambda i, ctx: ("/crm/leads", {
+        "json": {"name": f"Bench {i}", "customer_id": ctx["customer_ids"][i % len(ctx["customer_ids"])]},
+    })),
+    "crm.leads.bulk": ("POST", lambda i, ctx: ("/crm/leads/bulk", {
+        "json": [{"name": f"Bulk {i}-{j}"} for j in range(100)],
+    })),
+    "crm.opportunities.list": ("GET", lambda i, ctx: ("/crm/opportunities", {})),
+    "crm.opportunities.create": ("POST", lambda i, ctx: ("/crm/opportunities", {
+        "json": {"title": f"Bench {i}", "customer_id": ctx["customer_ids"][i % len(ctx["customer_ids"])],
+                 "value": 100},
+    })),
+    "crm.opportunities.stage": ("POST", lambda i, ctx: (
+        f"/crm/opportunities/{ctx['opportunity_ids'][i % len(ctx['opportunity_ids'])]}/stage",
+        {"params": {"stage": "IN_PROGRESS"}},
+    )),
+    "crm.opportunities.export": ("GET", lambda i, ctx: ("/crm/opportunities/export", {})),
+    "dashboard.summary": ("GET", lambda i, ctx: ("/dashboard/summary", {})),
+    "dashboard.recent_activity": ("GET", lambda i, ctx: ("/dashboard/recent-activity", {})),
+    "dashboard.stock_alerts": ("GET", lambda i, ctx: ("/dashboard/stock-alerts", {})),
+    "search": ("GET", lambda i, ctx: ("/search/", {"params": {"q": f"bench {i % 10}"}})),
+    "search.fuzzy": ("GET", lambda i, ctx: ("/search/", {"params": {"q": "prodcut", "types": "product"}})),
+}
+
+
+def percentile(sorted_values, p):
+    # Nearest-rank percentile
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    ms = lambda v: None if v is None else round(v * 1000, 3)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round((len(latencies) + errors) / elapsed, 2) if elapsed else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else None,
+    }
+
+
+async def seed_context(client, api, headers, requests, run):
+    async def post(path, **kwargs):
+        response = await client.post(f"{api}{path}", headers=headers, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def ids(path):
+        page = await client.get(f"{api}{path}", headers=headers, params={"limit": 500})
+        return [item["id"] for item in page.json()["items"]]
+
+    await post("/inventory/products/bulk", json=[
+        {"sku": f"SEED-{run}-{i}", "name": f"Seed {i}", "current_stock": 1000} for i in range(200)
+    ])
+    await post("/crm/customers/bulk", json=[{"name": f"Seed {i}"} for i in range(200)])
+    await post("/hr/employees/bulk", json=[
+        {"full_name": f"Seed {i}", "email": f"seed{i}@erp.com", "department_id": 1} for i in range(200)
+    ])
+    # The admin's own employee record, for /hr/employees/me
+    me = (await client.get(f"{api}/auth/me", headers=headers)).json()
+    await post("/hr/employees", json={
+        "full_name": "Bench Admin", "email": f"admin-{run}@erp.com", "department_id": 1, "user_id": me["id"],
+    })
+    ctx = {
+        "run": run,
+        "product_ids": await ids("/inventory/products"),
+        "customer_ids": await ids("/crm/customers"),
+        "employee_ids": await ids("/hr/employees"),
+    }
+    ctx["opportunity_ids"] = [
+        (await post("/crm/opportunities", json={"title": f"Seed {i}", "customer_id": cid, "value": 10}))["id"]
+        for i, cid in enumerate(ctx["customer_ids"][:20])
+    ]
+    # Approve and reject each consume one pending request per call
+    ctx["pending_leave"] = [
+        (await post("/hr/leave-requests", json={
+            "employee_id": ctx["employee_ids"][i % len(ctx["employee_ids"])],
+            "start_date": "2026-01-01", "end_date": "2026-01-02",
+        }))["id"]
+        for i in range(2 * requests)
+    ]
+    return ctx
+
+
+async def run_scenario(client, api, headers, method, build, ctx, requests, concurrency):
+    latencies, errors = [], 0
+    indexes = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            path, kwargs = build(i, ctx)
+            kwargs.setdefault("headers", headers)
+            start = time.perf_counter()
+            response = await client.request(method, f"{api}{path}", **kwargs)
+            await response.aread()
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_benchmark(args):
+    import httpx
+    import seed
+    from app.core.config import settings
+    from app.main import app
+
+    seed.seed()
+    api = settings.API_V1_STR
+    pattern = re.compile(args.only) if args.only else None
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post(
+                f"{api}/auth/login", data={"username": ADMIN[0], "password": ADMIN[1]}
+            )
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            ctx = await seed_context(client, api, headers, args.requests, int(time.time()))
+            for name, (method, build) in SCENARIOS.items():
+                if pattern and not pattern.search(name):
+                    continue
+                results[name] = await run_scenario(
+                    client, api, headers, method, build, ctx, args.requests, args.concurrency
+                )
+                print(format_row(name, results[name]), flush=True)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": settings.DATABASE_URL.split("@")[-1],
+            "db_async": settings.DB_ASYNC,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+        },
+        "endpoints": results,
+    }
+
+
+def format_row(name, stats):
+    cell = lambda v: "-" if v is None else f"{v:.1f}"
+    return (
+        f"{name:32} {cell(stats['throughput_rps']):>9} rps  p50 {cell(stats['p50_ms']):>8}  "
+        f"p95 {cell(stats['p95_ms']):>8}  p99 {cell(stats['p99_ms']):>8} ms  errors {stats['errors']}"
+    )
+
+
+def compare(baseline, current, threshold):
+    """Print per-endpoint changes and return the names that regressed: p95 up
+    or throughput down by more than threshold (a fraction)."""
+    regressions = []
+    print(f"\n{'endpoint':32} {'p95 base':>10} {'p95 now':>10} {'change':>8}   {'rps base':>9} {'rps now':>9}")
+    for name, now in current["endpoints"].items():
+        base = baseline["endpoints"].get(name)
+        if not base or base["p95_ms"] is None or now["p95_ms"] is None:
+            print(f"{name:32} {'(no baseline)':>10}")
+            continue
+        p95_change = now["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps_change = now["throughput_rps"] / base["throughput_rps"] - 1 if base["throughput_rps"] else 0.0
+        regressed = p95_change > threshold or rps_change < -threshold or now["errors"] > base["errors"]
+        flag = "  REGRESSION" if regressed else ""
+        print(
+            f"{name:32} {base['p95_ms']:>10.1f} {now['p95_ms']:>10.1f} {p95_change:>+8.0%}   "
+            f"{base['throughput_rps']:>9.1f} {now['throughput_rps']:>9.1f}{flag}"
+        )
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight per endpoint")
+    parser.add_argument("--only", help="regex selecting endpoint names to run")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare this run against")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="compare two stored runs without benchmarking")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative p95/throughput change counted as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="erp-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    results = asyncio.run(run_benchmark(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} endpoint(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
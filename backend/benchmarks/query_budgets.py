@@ -0,0 +1,91 @@
+"""SQL statement budget check for the v1 API endpoints.
+
+Run from backend/:
+
+    python -m benchmarks.query_budgets [--only REGEX] [--require-budget]
+
+Boots app.main.app in-process with QUERY_BUDGET_STRICT on, against a
+throwaway SQLite database unless DATABASE_URL is set, seeds a few hundred rows
+per table so that per-row lazy loads would blow any budget, then calls every
+endpoint in benchmarks.endpoints.SCENARIOS once. Endpoints over their
+@query_budget are listed with the statements they ran and the run exits
+non-zero; --require-budget also fails endpoints that declare no budget.
+tests/test_query_budgets.py runs the same scenarios under pytest.
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+
+from benchmarks.endpoints import ADMIN, SCENARIOS, seed_context
+
+
+async def run_checks(args):
+    import httpx
+    import seed
+    from app.core.config import settings
+    from app.core.query_budget import QueryBudgetExceeded, record_queries
+    from app.main import app
+
+    seed.seed()
+    api = settings.API_V1_STR
+    pattern = re.compile(args.only) if args.only else None
+    failures = checked = 0
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://budget") as client:
+            response = await client.post(
+                f"{api}/auth/login", data={"username": ADMIN[0], "password": ADMIN[1]}
+            )
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            ctx = await seed_context(client, api, headers, 1, int(time.time()))
+            for name, (method, build) in SCENARIOS.items():
+                if pattern and not pattern.search(name):
+                    continue
+                checked += 1
+                path, kwargs = build(0, ctx)
+                kwargs.setdefault("headers", headers)
+                try:
+                    with record_queries() as log:
+                        response = await client.request(method, f"{api}{path}", **kwargs)
+                        await response.aread()
+                except QueryBudgetExceeded as error:
+                    print(f"FAIL  {name}\n{error}")
+                    failures += 1
+                    continue
+                budget = response.headers.get("x-query-budget")
+                if response.status_code >= 400:
+                    print(f"FAIL  {name}: {path} returned {response.status_code}")
+                    failures += 1
+                elif budget is None:
+                    print(f"{'FAIL' if args.require_budget else '--':5} {name}: {log.count} queries, no budget")
+                    failures += args.require_budget
+                else:
+                    print(f"ok    {name}: {log.count}/{budget} queries")
+    return checked, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", help="regex selecting scenario names")
+    parser.add_argument("--require-budget", action="store_true", help="fail endpoints without a budget")
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="erp-budgets-"), "budgets.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    # Every call must reach the database
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ["QUERY_DEBUG"] = "true"
+    os.environ["QUERY_BUDGET_STRICT"] = "true"
+
+    checked, failures = asyncio.run(run_checks(args))
+    print(f"{checked - failures}/{checked} endpoints within budget")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
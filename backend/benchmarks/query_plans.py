@@ -0,0 +1,224 @@
+"""Query-plan regression check for the API's read endpoints.
+
+Run from backend/:
+
+    python -m benchmarks.query_plans [--rows 500] [--verbose]
+
+Boots app.main.app in-process against a throwaway SQLite database unless
+DATABASE_URL is set (a scratch MySQL schema works too), seeds some data,
+calls each endpoint in CHECKS while recording the SELECTs it issues, and
+runs every statement through EXPLAIN. Exits non-zero when a plan scans a
+table the check does not expect to scan, or sorts a LIMIT query in a temp
+structure instead of reading it in index order. tests/test_query_plans.py
+runs the same checks under pytest.
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date
+from sqlalchemy import event
+
+# (name, method, path, params, user, tables allowed to be scanned).
+# Unfiltered keyset lists walk the primary key in order and stop at the page
+# limit, and recent activity walks the created_at indexes the same way, so
+# those scans are expected; a lost index there shows up as a sort instead.
+CHECKS = [
+    ("products", "get", "/inventory/products", {}, "admin", {"products"}),
+    ("low stock", "get", "/inventory/low-stock", {}, "admin", set()),
+    ("transactions", "get", "/inventory/transactions", {}, "admin", {"inventory_transactions"}),
+    ("transactions by product", "get", "/inventory/transactions", {"product_id": 1}, "admin", set()),
+    ("stock as of", "get", "/inventory/stock-as-of", {"date": date.today().isoformat()}, "admin", {"products"}),
+    ("stock as of product", "get", "/inventory/stock-as-of",
+     {"date": date.today().isoformat(), "product_id": 1}, "admin", set()),
+    ("departments", "get", "/hr/departments", {}, "admin", {"departments"}),
+    ("employees", "get", "/hr/employees", {}, "admin", {"employees"}),
+    ("leave requests", "get", "/hr/leave-requests", {}, "admin", {"leave_requests"}),
+    ("own leave requests", "get", "/hr/leave-requests", {}, "employee", set()),
+    ("customers", "get", "/crm/customers", {}, "admin", {"customers"}),
+    ("leads", "get", "/crm/leads", {}, "admin", {"leads"}),
+    ("leads with customer", "get", "/crm/leads", {"include": "customer"}, "admin", {"leads"}),
+    ("opportunities", "get", "/crm/opportunities", {}, "admin", {"opportunities"}),
+    ("users", "get", "/users/", {}, "admin", {"users"}),
+    ("audit logs", "get", "/users/audit-logs", {}, "admin", {"audit_logs"}),
+    ("dashboard summary", "get", "/dashboard/summary", {}, "admin", {"entity_counters"}),
+    ("recent activity", "get", "/dashboard/recent-activity", {}, "admin",
+     {"inventory_transactions", "leave_requests"}),
+    ("stock alerts", "get", "/dashboard/stock-alerts", {}, "admin", {"stock_alerts"}),
+    ("me", "get", "/auth/me", {}, "admin", set()),
+]
+
+USERS = {
+    "admin": ("admin@erp.com", "admin123"),
+    "employee": ("employee@erp.com", "employee123"),
+}
+
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?$")
+
+
+def explain(connection, statement, parameters):
+    """Return [(table, scans, sorts, detail)] for each step of the plan."""
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        plan = []
+        for row in rows:
+            detail = row[-1]
+            match = SQLITE_SCAN.match(detail)
+            if match:
+                plan.append((match.group(1), True, False, detail))
+            elif detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+                plan.append((None, False, True, detail))
+            else:
+                plan.append((None, False, False, detail))
+        return plan
+    rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+    return [
+        (
+            row["table"],
+            row["type"] in ("ALL", "index"),
+            "Using filesort" in (row["Extra"] or ""),
+            f"{row['table']}: type={row['type']} key={row['key']} extra={row['Extra']}",
+        )
+        for row in rows
+    ]
+
+
+async def seed_data(client, api, headers, rows):
+    async def post(path, json):
+        response = await client.post(f"{api}{path}", headers=headers, json=json)
+        response.raise_for_status()
+
+    await post("/inventory/products/bulk", [
+        {"sku": f"PLAN-{i}", "name": f"Plan {i}", "current_stock": i % 50} for i in range(rows)
+    ])
+    await post("/crm/customers/bulk", [{"name": f"Customer {i}"} for i in range(rows)])
+    await post("/crm/leads/bulk", [{"name": f"Lead {i}", "customer_id": 1 + i % rows} for i in range(rows)])
+    await post("/hr/employees/bulk", [
+        {"full_name": f"Employee {i}", "email": f"e{i}@erp.com", "department_id": 1} for i in range(rows)
+    ])
+    # Link the seeded employee login to an employee record
+    await post("/hr/employees", {
+        "full_name": "Seed Employee", "email": "employee@erp.com", "department_id": 1, "user_id": 3,
+    })
+    for i in range(0, rows, 100):
+        await post("/inventory/transactions/batch", {"lines": [
+            {"product_id": 1 + (i + j) % rows, "type": "IN", "quantity": 5} for j in range(100)
+        ]})
+    for i in range(min(rows, 50)):
+        await post("/crm/opportunities", {"title": f"Opportunity {i}", "customer_id": 1 + i, "value": 100})
+        await post("/hr/leave-requests", {
+            "employee_id": 1 + i, "start_date": "2026-01-01", "end_date": "2026-01-02",
+        })
+
+
+async def login(client, api):
+    """Bearer headers for each of USERS."""
+    headers = {}
+    for name, (email, password) in USERS.items():
+        response = await client.post(f"{api}/auth/login", data={"username": email, "password": password})
+        headers[name] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return headers
+
+
+@contextmanager
+def capture_selects(engine):
+    """Collect the (statement, parameters) of the SELECTs run on engine."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def plan_problems(connection, captured, allowed_scans):
+    """[(statement, plan step)] for unexpected table scans, and for sorts of
+    LIMIT queries, in the plans of the captured statements."""
+    from app.core.database import Base
+
+    problems = []
+    for statement, parameters in captured:
+        has_limit = " LIMIT " in statement.upper()
+        for table, scans, sorts, detail in explain(connection, statement, parameters):
+            # Derived tables (subqueries) are not in the metadata
+            if scans and table in Base.metadata.tables and table not in allowed_scans:
+                problems.append((statement, detail))
+            if sorts and has_limit:
+                problems.append((statement, detail))
+    return problems
+
+
+def format_problems(problems):
+    return "\n".join(
+        f"        {detail}\n          in: {' '.join(statement.split())[:200]}" for statement, detail in problems
+    )
+
+
+async def run_checks(args):
+    import httpx
+    import seed
+    from app.core import database
+    from app.core.config import settings
+    from app.main import app
+
+    seed.seed()
+    api = settings.API_V1_STR
+    failures = 0
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://plans") as client:
+            headers = await login(client, api)
+            await seed_data(client, api, headers["admin"], args.rows)
+
+            with database.engine.connect() as connection:
+                for name, method, path, params, user, allowed_scans in CHECKS:
+                    with capture_selects(database.engine) as captured:
+                        response = await client.request(
+                            method.upper(), f"{api}{path}", params=params, headers=headers[user]
+                        )
+                    if response.status_code != 200:
+                        print(f"FAIL  {name}: {path} returned {response.status_code}")
+                        failures += 1
+                        continue
+                    problems = plan_problems(connection, captured, allowed_scans)
+                    print(f"{'FAIL' if problems else 'ok':5} {name} ({len(captured)} queries)")
+                    if args.verbose:
+                        for statement, parameters in captured:
+                            print(f"      {' '.join(statement.split())[:160]}")
+                            for *_, detail in explain(connection, statement, parameters):
+                                print(f"        {detail}")
+                    if problems:
+                        print(format_problems(problems))
+                    failures += bool(problems)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500, help="rows seeded per table")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="erp-plans-"), "plans.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    # Every call must reach the database
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ["DB_ASYNC"] = "false"
+
+    failures = asyncio.run(run_checks(args))
+    from app.core.config import settings
+    print(f"{len(CHECKS) - failures}/{len(CHECKS)} checks passed on {settings.DATABASE_URL}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
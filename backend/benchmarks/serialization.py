@@ -0,0 +1,112 @@
+"""List serialization benchmark: response_model path vs the orjson row path.
+
+Run from backend/:
+
+    python -m benchmarks.serialization [--rows 5000] [--repeat 5]
+
+Fills a throwaway SQLite database (or DATABASE_URL) with --rows products,
+customers and audit logs, then times a page of each the way the API used to
+render it (ORM objects validated into the Pydantic schema, then encoded with
+the json module) against app.core.responses (column tuples straight into
+orjson). Exits non-zero unless both produce the same bytes.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def populate(engine, rows):
+    from sqlalchemy import insert
+    from app.models import AuditLog, Customer, Product
+
+    start = datetime(2026, 1, 1, 8, 30)
+    with engine.begin() as conn:
+        conn.execute(insert(Product), [
+            {"sku": f"SER-{i}", "name": f"Product {i}", "description": "x" * 480, "unit": "pcs",
+             "current_stock": i % 100, "low_stock_threshold": 10, "is_low_stock": i % 100 <= 10,
+             "created_at": start + timedelta(seconds=i, microseconds=i % 7)}
+            for i in range(rows)
+        ])
+        conn.execute(insert(Customer), [
+            {"name": f"Customer {i}", "email": f"c{i}@example.com", "phone": "555-0100",
+             "company": f"Company {i % 50}", "created_at": start + timedelta(seconds=i)}
+            for i in range(rows)
+        ])
+        conn.execute(insert(AuditLog), [
+            {"actor_user_id": None, "action": "UPDATE", "entity_type": "product", "entity_id": i,
+             "metadata_json": {"sku": f"SER-{i}", "fields": ["name", "unit"], "delta": i % 9 - 4},
+             "created_at": start + timedelta(seconds=i)}
+            for i in range(rows)
+        ])
+
+
+def timed(fn, repeat):
+    best, output = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="rows per table, all rendered in one page")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path, the best is reported")
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="erp-serialization-"), "serialization.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.fields import Fields
+    from app.core.responses import ORJSONResponse
+    from app.models import AuditLog, Customer, Product
+    from app.schemas.core import AuditLog as AuditLogSchema
+    from app.schemas.crm import Customer as CustomerSchema
+    from app.schemas.inventory import Product as ProductSchema
+    from app.schemas.pagination import Page
+
+    Base.metadata.create_all(bind=engine)
+    populate(engine, args.rows)
+
+    failures = 0
+    for model, schema in ((Product, ProductSchema), (Customer, CustomerSchema), (AuditLog, AuditLogSchema)):
+        adapter = TypeAdapter(Page[schema])
+        columns = Fields(model, schema)(fields=None).columns
+
+        def model_path():
+            with SessionLocal() as db:
+                items = db.scalars(select(model).order_by(model.id)).all()
+                page = adapter.validate_python({"items": items, "next_cursor": None}, from_attributes=True)
+                return json.dumps(
+                    adapter.dump_python(page, mode="json"), ensure_ascii=False, separators=(",", ":")
+                ).encode("utf-8")
+
+        def row_path():
+            with SessionLocal() as db:
+                rows = db.execute(select(*columns).order_by(model.id)).all()
+                return ORJSONResponse({"items": [row._asdict() for row in rows], "next_cursor": None}).body
+
+        slow, expected = timed(model_path, args.repeat)
+        fast, actual = timed(row_path, args.repeat)
+        same = expected == actual
+        failures += not same
+        print(
+            f"{model.__tablename__:12} {args.rows} rows  response_model {slow * 1000:8.1f} ms  "
+            f"orjson rows {fast * 1000:8.1f} ms  x{slow / fast:4.1f}  "
+            f"{len(actual) / 1024:7.0f} KiB  {'identical' if same else 'OUTPUT DIFFERS'}"
+        )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
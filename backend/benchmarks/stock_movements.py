@@ -0,0 +1,79 @@
+"""Throughput of single-line vs batched stock movements.
+
+Run from backend/:
+
+    python -m benchmarks.stock_movements --lines 2000 --batch-size 200
+
+Boots app.main.app in-process against a throwaway SQLite database unless
+DATABASE_URL is set (point it at a scratch MySQL schema for real numbers).
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000, help="stock movement lines per run")
+    parser.add_argument("--batch-size", type=int, default=200, help="lines per batch request")
+    parser.add_argument("--products", type=int, default=50)
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="erp-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    import seed
+    from fastapi.testclient import TestClient
+    from app.core.config import settings
+    from app.main import app
+
+    seed.seed()
+    api = settings.API_V1_STR
+    with TestClient(app) as client:
+        token = client.post(
+            f"{api}/auth/login", data={"username": "admin@erp.com", "password": "admin123"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        run_id = int(time.time())
+        products = [
+            {"sku": f"BENCH-{run_id}-{i}", "name": f"Bench {i}", "current_stock": 1_000_000}
+            for i in range(args.products)
+        ]
+        client.post(f"{api}/inventory/products/bulk", headers=headers, json=products).raise_for_status()
+        page = client.get(
+            f"{api}/inventory/products", headers=headers, params={"limit": settings.PAGE_MAX_LIMIT}
+        ).json()
+        product_ids = [p["id"] for p in page["items"] if p["sku"].startswith(f"BENCH-{run_id}-")]
+
+        rng = random.Random(42)
+        lines = [
+            {"product_id": rng.choice(product_ids), "type": rng.choice(["IN", "OUT"]), "quantity": rng.randint(1, 10)}
+            for _ in range(args.lines)
+        ]
+
+        start = time.perf_counter()
+        for line in lines:
+            client.post(f"{api}/inventory/transactions", headers=headers, json=line).raise_for_status()
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(0, len(lines), args.batch_size):
+            client.post(
+                f"{api}/inventory/transactions/batch",
+                headers=headers,
+                json={"lines": lines[i:i + args.batch_size]},
+            ).raise_for_status()
+        batched = time.perf_counter() - start
+
+    print(f"lines: {args.lines}, batch size: {args.batch_size}, database: {settings.DATABASE_URL}")
+    print(f"single-line: {single:8.2f}s  {args.lines / single:10.1f} lines/s")
+    print(f"batched:     {batched:8.2f}s  {args.lines / batched:10.1f} lines/s")
+    print(f"speedup:     {single / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
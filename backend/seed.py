@@ -3,11 +3,15 @@ from app.core.database import SessionLocal, engine
 from app.models.core import User, Role, Permission, user_roles, role_permissions
 from app.models.hr import Department
 from app.core.security import get_password_hash
-from app.core.database import Base
+from app.core.schema import upgrade_schema
+from app.services.counters import reconcile_counters
+from app.services.dedupe import rebuild_duplicate_keys
+from app.services.search import rebuild_search_index
+from app.services.stock import refresh_low_stock_flags
 
 def seed():
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create tables, and add what an older database lacks
+    upgrade_schema(engine)
     
     db = SessionLocal()
     try:
@@ -98,6 +102,10 @@ def seed():
                 db.add(Department(name=dname))
 
         db.commit()
+        reconcile_counters(db)
+        refresh_low_stock_flags(db)
+        rebuild_search_index(db)
+        rebuild_duplicate_keys(db)
         print("Database seeded successfully!")
     except Exception as e:
         print(f"Error seeding database: {e}")
@@ -0,0 +1,321 @@
+"""Synthetic data at benchmark scale, on top of seed.py.
+
+    python seed_scale.py --size 1m [--seed 42] [--chunk-size 50000]
+
+Runs seed() for permissions, roles, departments and the demo logins, then
+appends users, employees, leave requests, products, inventory transactions,
+customers, leads, opportunities and audit logs with skewed distributions
+(a few products, customers and departments get most of the activity). Rows
+are written with chunked Core executemany INSERTs using precomputed ids, so
+no ORM objects are built. The size preset is the total number of rows added.
+"""
+import argparse
+import bisect
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, func, insert, select, update
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.models.core import AuditLog, Role, User, user_roles
+from app.models.crm import Customer, Lead, LeadStatus, Opportunity, OpportunityStage
+from app.models.hr import Department, Employee, LeaveRequest, LeaveStatus
+from app.models.inventory import InventoryTransaction, Product, StockSnapshot, TransactionType
+from app.services.counters import reconcile_counters
+from app.services.dedupe import rebuild_duplicate_keys
+from app.services.search import rebuild_search_index
+from app.services.stock_history import take_snapshots
+from seed import seed
+
+SIZES = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+# Share of the total rows per table
+SHARES = {
+    "users": 0.025,
+    "employees": 0.025,
+    "leave_requests": 0.04,
+    "products": 0.03,
+    "inventory_transactions": 0.5,
+    "customers": 0.05,
+    "leads": 0.08,
+    "opportunities": 0.05,
+    "audit_logs": 0.2,
+}
+
+# Data spans this many days back from now, ids ascending with created_at
+HISTORY_DAYS = 730
+
+FIRST_NAMES = ["Amal", "Nimal", "Kamala", "Sunil", "Priya", "Ravi", "Anna", "John", "Maria", "Chen",
+               "Fatima", "Omar", "Lena", "Diego", "Aisha", "Kenji", "Sara", "Tom", "Ines", "Yusuf"]
+LAST_NAMES = ["Perera", "Silva", "Fernando", "Smith", "Garcia", "Wang", "Khan", "Müller", "Rossi",
+              "Tanaka", "Jones", "Dias", "Cohen", "Novak", "Haddad", "Kumar", "Brown", "Lopez"]
+COMPANY_WORDS = ["Global", "Lanka", "Prime", "Blue", "Summit", "Vertex", "Green", "Nova", "Apex", "Delta"]
+COMPANY_KINDS = ["Traders", "Holdings", "Logistics", "Foods", "Textiles", "Systems", "Motors", "Labs"]
+TITLES = ["Engineer", "Analyst", "Manager", "Clerk", "Officer", "Associate", "Technician", "Director"]
+UNITS = ["pcs", "pcs", "pcs", "box", "kg", "l", "m"]
+LEAD_SOURCES = ["web", "referral", "email", "trade-show", "cold-call", None]
+AUDIT_ACTIONS = [("TRANSACT", "product", 50), ("CREATE", "customer", 10), ("CREATE", "lead", 12),
+                 ("UPDATE_STAGE", "opportunity", 8), ("CREATE", "product", 5), ("SUBMIT", "leave_request", 6),
+                 ("APPROVE", "leave_request", 4), ("CREATE", "employee", 3), ("CREATE", "user", 2)]
+
+
+class Skewed:
+    """Zipf-like choice over ids: rank k is picked with weight 1 / k**s."""
+
+    def __init__(self, rng: random.Random, ids, s: float = 1.1):
+        self.rng = rng
+        self.ids = list(ids)
+        self.rng.shuffle(self.ids)
+        self.cumulative = list(itertools.accumulate(1 / (k ** s) for k in range(1, len(self.ids) + 1)))
+
+    def __call__(self):
+        return self.ids[bisect.bisect(self.cumulative, self.rng.random() * self.cumulative[-1])]
+
+
+class Generator:
+    def __init__(self, db, total: int, seed_value: int, chunk_size: int):
+        self.db = db
+        self.rng = random.Random(seed_value)
+        self.chunk_size = chunk_size
+        self.counts = {name: max(1, int(total * share)) for name, share in SHARES.items()}
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.start = self.now - timedelta(days=HISTORY_DAYS)
+
+    def next_id(self, model) -> int:
+        return (self.db.scalar(select(func.max(model.id))) or 0) + 1
+
+    def timestamps(self, n: int):
+        # Evenly spread over the history with jitter, never decreasing
+        step = HISTORY_DAYS * 86400 / n
+        previous = self.start
+        for i in range(n):
+            value = self.start + timedelta(seconds=step * i + self.rng.random() * step)
+            previous = max(previous, value.replace(microsecond=0))
+            yield previous
+
+    def insert(self, table, rows) -> int:
+        written = 0
+        started = time.perf_counter()
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.db.execute(insert(table), chunk)
+            self.db.commit()
+            written += len(chunk)
+        name = table.__table__.name if hasattr(table, "__table__") else table.name
+        elapsed = time.perf_counter() - started
+        print(f"  {name:24} {written:>10} rows  {elapsed:7.1f}s  {written / max(elapsed, 1e-9):10.0f} rows/s")
+        return written
+
+    def name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def users(self):
+        first_id = self.next_id(User)
+        n = self.counts["users"]
+        # bcrypt is far too slow per row; every generated login shares a password
+        password_hash = get_password_hash("password123")
+        self.insert(User, (
+            {"id": first_id + i, "email": f"user{first_id + i}@example.com", "password_hash": password_hash,
+             "is_active": self.rng.random() > 0.05, "created_at": created_at}
+            for i, created_at in enumerate(self.timestamps(n))
+        ))
+        role_id = self.db.scalar(select(Role.id).where(Role.name == "EMPLOYEE"))
+        self.insert(user_roles, ({"user_id": first_id + i, "role_id": role_id} for i in range(n)))
+        self.user_ids = range(first_id, first_id + n)
+
+    def employees(self):
+        first_id = self.next_id(Employee)
+        n = self.counts["employees"]
+        departments = Skewed(self.rng, self.db.scalars(select(Department.id)).all(), s=0.8)
+        user_ids = list(self.user_ids)
+        self.insert(Employee, (
+            {"id": first_id + i, "user_id": user_ids[i] if i < len(user_ids) and self.rng.random() < 0.9 else None,
+             "full_name": self.name(), "email": f"employee{first_id + i}@example.com",
+             "department_id": departments(), "title": self.rng.choice(TITLES),
+             "status": "ACTIVE" if self.rng.random() < 0.93 else "INACTIVE", "created_at": created_at}
+            for i, created_at in enumerate(self.timestamps(n))
+        ))
+        self.employee_ids = range(first_id, first_id + n)
+
+    def leave_requests(self):
+        first_id = self.next_id(LeaveRequest)
+        employees = Skewed(self.rng, self.employee_ids, s=0.6)
+        statuses = [LeaveStatus.APPROVED] * 7 + [LeaveStatus.REJECTED] + [LeaveStatus.PENDING] * 2
+
+        def rows():
+            for i, created_at in enumerate(self.timestamps(self.counts["leave_requests"])):
+                start = created_at.date() + timedelta(days=self.rng.randint(1, 60))
+                status = self.rng.choice(statuses)
+                yield {
+                    "id": first_id + i, "employee_id": employees(), "start_date": start,
+                    "end_date": start + timedelta(days=self.rng.choice([0, 0, 1, 2, 4, 9])),
+                    "reason": self.rng.choice(["Annual leave", "Sick leave", "Personal", None]),
+                    "status": status, "created_at": created_at,
+                    "reviewed_by_user_id": 1 if status != LeaveStatus.PENDING else None,
+                    "reviewed_at": created_at + timedelta(hours=self.rng.randint(1, 72))
+                    if status != LeaveStatus.PENDING else None,
+                }
+        self.insert(LeaveRequest, rows())
+
+    def products(self):
+        first_id = self.next_id(Product)
+        n = self.counts["products"]
+        self.opening_stock = {}
+
+        def rows():
+            for i, created_at in enumerate(self.timestamps(n)):
+                product_id = first_id + i
+                stock = int(self.rng.lognormvariate(4, 1))
+                self.opening_stock[product_id] = stock
+                yield {
+                    "id": product_id, "sku": f"SKU-{product_id:08d}", "name": f"Product {product_id}",
+                    "unit": self.rng.choice(UNITS), "current_stock": stock,
+                    "low_stock_threshold": self.rng.choice([5, 10, 10, 20, 50]),
+                    "is_low_stock": False, "created_at": created_at,
+                }
+        self.insert(Product, rows())
+        self.product_ids = range(first_id, first_id + n)
+
+    def inventory_transactions(self):
+        first_id = self.next_id(InventoryTransaction)
+        products = Skewed(self.rng, self.product_ids)
+        stock = dict(self.opening_stock)
+        # Backdated snapshots as the snapshot job would have taken them: one
+        # per interval for each product that moved during it
+        interval = timedelta(seconds=settings.STOCK_SNAPSHOT_INTERVAL_SECONDS)
+        snapshots = []
+
+        def rows():
+            next_snapshot, moved = self.start + interval, set()
+            for i, created_at in enumerate(self.timestamps(self.counts["inventory_transactions"])):
+                while interval and created_at >= next_snapshot:
+                    snapshots.extend(
+                        {"product_id": pid, "taken_at": next_snapshot, "stock": stock[pid]} for pid in moved
+                    )
+                    next_snapshot, moved = next_snapshot + interval, set()
+                product_id = products()
+                moved.add(product_id)
+                roll = self.rng.random()
+                quantity = max(1, int(self.rng.lognormvariate(2, 0.9)))
+                if roll < 0.03:
+                    type, quantity = TransactionType.ADJUSTMENT, self.rng.randint(-3, 3) or 1
+                elif roll < 0.45 and stock[product_id] >= quantity:
+                    type, quantity = TransactionType.OUT, quantity
+                else:
+                    type, quantity = TransactionType.IN, quantity * 2
+                delta = -quantity if type == TransactionType.OUT else quantity
+                if stock[product_id] + delta < 0:
+                    type, quantity, delta = TransactionType.IN, abs(quantity), abs(quantity)
+                stock[product_id] += delta
+                yield {
+                    "id": first_id + i, "product_id": product_id, "type": type, "quantity": quantity,
+                    "actor_user_id": 1, "created_at": created_at,
+                }
+        self.insert(InventoryTransaction, rows())
+        self.insert(StockSnapshot, snapshots)
+
+        # Bring current_stock in line with the generated ledger
+        table = Product.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("product_id"))
+            .values(current_stock=bindparam("stock"))
+        )
+        items = list(stock.items())
+        for offset in range(0, len(items), self.chunk_size):
+            self.db.execute(statement, [
+                {"product_id": pid, "stock": value} for pid, value in items[offset:offset + self.chunk_size]
+            ])
+        self.db.execute(update(table).values(is_low_stock=table.c.current_stock <= table.c.low_stock_threshold))
+        self.db.commit()
+
+    def customers(self):
+        first_id = self.next_id(Customer)
+        n = self.counts["customers"]
+        self.insert(Customer, (
+            {"id": first_id + i, "name": self.name(), "email": f"customer{first_id + i}@example.com",
+             "phone": f"+94 7{self.rng.randint(0, 9)} {self.rng.randint(1000000, 9999999)}",
+             "company": f"{self.rng.choice(COMPANY_WORDS)} {self.rng.choice(COMPANY_KINDS)}",
+             "created_at": created_at}
+            for i, created_at in enumerate(self.timestamps(n))
+        ))
+        self.customer_ids = range(first_id, first_id + n)
+
+    def leads(self):
+        first_id = self.next_id(Lead)
+        customers = Skewed(self.rng, self.customer_ids)
+        statuses = list(LeadStatus)
+        self.insert(Lead, (
+            {"id": first_id + i, "customer_id": customers() if self.rng.random() < 0.7 else None,
+             "name": self.name(), "email": f"lead{first_id + i}@example.com",
+             "source": self.rng.choice(LEAD_SOURCES),
+             "status": self.rng.choices(statuses, weights=[40, 30, 20, 10])[0], "created_at": created_at}
+            for i, created_at in enumerate(self.timestamps(self.counts["leads"]))
+        ))
+
+    def opportunities(self):
+        first_id = self.next_id(Opportunity)
+        customers = Skewed(self.rng, self.customer_ids)
+        stages = list(OpportunityStage)
+        self.insert(Opportunity, (
+            {"id": first_id + i, "customer_id": customers(), "title": f"Deal {first_id + i}",
+             "value": round(self.rng.lognormvariate(8, 1.2), 2),
+             "stage": self.rng.choices(stages, weights=[30, 30, 25, 15])[0], "created_at": created_at}
+            for i, created_at in enumerate(self.timestamps(self.counts["opportunities"]))
+        ))
+
+    def audit_logs(self):
+        actions = [(action, entity) for action, entity, _ in AUDIT_ACTIONS]
+        weights = [weight for *_, weight in AUDIT_ACTIONS]
+        actors = Skewed(self.rng, [1, 2] + list(self.user_ids)[:1000], s=1.5)
+        self.insert(AuditLog, (
+            {"actor_user_id": actors(), "action": action, "entity_type": entity,
+             "entity_id": self.rng.randint(1, 1000), "metadata_json": None, "created_at": created_at}
+            for created_at, (action, entity) in zip(
+                self.timestamps(self.counts["audit_logs"]),
+                iter(lambda: self.rng.choices(actions, weights=weights)[0], None),
+            )
+        ))
+
+    def run(self):
+        for step in SHARES:
+            getattr(self, step)()
+        reconcile_counters(self.db)
+        rebuild_search_index(self.db)
+        rebuild_duplicate_keys(self.db)
+        # Snapshot what moved since the last backdated one
+        take_snapshots(self.db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="10k", help="total rows to add")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="rows per executemany INSERT")
+    args = parser.parse_args()
+
+    seed()
+    total = SIZES[args.size]
+    print(f"Generating {total} rows ({args.size})")
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        Generator(db, total, args.seed, args.chunk_size).run()
+    finally:
+        db.close()
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# Settings are read once, when app.core.config is first imported: point the
+# app at a throwaway SQLite database unless DATABASE_URL is set (a scratch
+# MySQL schema works too), and make every call reach the database.
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="erp-tests-"), "tests.db")
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["DB_ASYNC"] = "false"
+# X-Query-Budget on every response, for tests/test_query_budgets.py
+os.environ["QUERY_DEBUG"] = "true"
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Run a coroutine on the event loop shared by the session's client."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def client(run):
+    """httpx client calling app.main.app in-process, on a seeded database."""
+    import httpx
+    import seed
+    from app.main import app
+
+    seed.seed()
+    lifespan = app.router.lifespan_context(app)
+    run(lifespan.__aenter__())
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    yield client
+    run(client.aclose())
+    run(lifespan.__aexit__(None, None, None))
+
+
+@pytest.fixture(scope="session")
+def api():
+    from app.core.config import settings
+
+    return settings.API_V1_STR
+
+
+@pytest.fixture(scope="session")
+def headers(run, client, api):
+    """Bearer headers of the seeded users, by name (admin, employee)."""
+    from benchmarks.query_plans import login
+
+    return run(login(client, api))
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.core import database
+from app.core.config import settings
+from app.models.core import AuditLog
+from app.services.audit import PENDING_KEY, AuditBuffer, log_action
+
+
+def _entries(action, n, created_at=None):
+    return [
+        {"actor_user_id": None, "action": action, "entity_type": "test", "entity_id": i,
+         "metadata_json": None, "created_at": created_at or datetime.now(timezone.utc)}
+        for i in range(n)
+    ]
+
+
+def _rows(action):
+    with database.SessionLocal() as db:
+        return db.scalars(select(AuditLog).where(AuditLog.action == action).order_by(AuditLog.entity_id)).all()
+
+
+def test_stop_writes_entries_waiting_for_room(client, run):
+    buffer = AuditBuffer(max_size=1, flush_batch_size=10, flush_interval=0.05, enqueue_timeout=5.0)
+
+    async def burst():
+        buffer.enqueue(_entries("buffer-waiting", 20))
+        assert buffer.counters["delayed"] > 0
+        await buffer.stop()
+
+    run(burst())
+    assert len(_rows("buffer-waiting")) == 20
+    assert buffer.stats()["dropped"] == 0
+
+
+def test_enqueue_after_stop_writes_directly(client, run):
+    buffer = AuditBuffer(max_size=10, flush_batch_size=10, flush_interval=0.05, enqueue_timeout=0.05)
+    buffer.start()
+    run(buffer.stop())
+
+    buffer.enqueue(_entries("buffer-late", 3))
+    assert buffer._thread is None
+    assert len(_rows("buffer-late")) == 3
+
+
+def test_buffered_entries_keep_their_recorded_time(client, run, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_MODE", "buffered")
+    with database.SessionLocal() as db:
+        run(log_action(db, None, "buffer-time", "test"))
+        recorded = db.info[PENDING_KEY][0]["created_at"]
+    assert abs(recorded - datetime.now(timezone.utc)) < timedelta(seconds=5)
+
+    # Written late, e.g. after waiting for room: created_at is still the
+    # time the entry was recorded
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    buffer = AuditBuffer(max_size=10, flush_batch_size=10, flush_interval=0.05, enqueue_timeout=0.05)
+    buffer.enqueue(_entries("buffer-time", 1, created_at=past))
+    run(buffer.stop())
+    (row,) = _rows("buffer-time")
+    assert abs(row.created_at.replace(tzinfo=None) - past.replace(tzinfo=None)) < timedelta(seconds=1)
@@ -0,0 +1,97 @@
+from sqlalchemy import func, select
+
+from app.core import database
+from app.core.config import settings
+from app.models.inventory import Product
+from app.schemas.inventory import ProductCreate
+from app.services.bulk import bulk_insert
+from app.services.stock import with_low_stock_flag
+
+
+def _import(run, client, api, headers, content_type=None, **kwargs):
+    request_headers = dict(headers["admin"])
+    if content_type:
+        request_headers["Content-Type"] = content_type
+    return run(client.post(f"{api}/inventory/products/bulk", headers=request_headers, **kwargs))
+
+
+def _products(*skus):
+    with database.SessionLocal() as db:
+        return {p.sku: p for p in db.scalars(select(Product).where(Product.sku.in_(skus)))}
+
+
+def test_json_rows_report_per_row_errors(run, client, api, headers):
+    _import(run, client, api, headers, json=[{"sku": "BULK-TAKEN", "name": "Taken"}])
+    response = _import(run, client, api, headers, json=[
+        {"sku": "BULK-J1", "name": "One", "current_stock": 50},
+        {"sku": "BULK-J2"},
+        {"sku": "BULK-J1", "name": "Again"},
+        {"sku": "BULK-TAKEN", "name": "Taken again"},
+        {"sku": "BULK-J3", "name": "Three", "current_stock": "lots"},
+        {"sku": "BULK-J4", "name": "Four"},
+    ])
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["total"], result["inserted"], result["failed"]) == (6, 2, 4)
+    assert [(e["row"], e["errors"][0]["field"]) for e in result["errors"]] == [
+        (2, "name"), (3, "sku"), (4, "sku"), (5, "current_stock"),
+    ]
+    assert result["errors"][1]["errors"][0]["message"] == "Duplicate value in import"
+    assert result["errors"][2]["errors"][0]["message"] == "Already exists"
+    products = _products("BULK-J1", "BULK-J4")
+    assert (products["BULK-J1"].is_low_stock, products["BULK-J4"].is_low_stock) == (False, True)
+
+
+def test_csv_body_and_upload(run, client, api, headers):
+    csv = "sku,name,current_stock\r\nBULK-C1,Comma one,20\r\nBULK-C2,\"Comma, two\",\r\n"
+    response = _import(run, client, api, headers, content=csv.encode(), content_type="text/csv")
+    assert response.json()["inserted"] == 2
+    products = _products("BULK-C1", "BULK-C2")
+    # Empty cells take the schema defaults
+    assert products["BULK-C2"].name == "Comma, two"
+    assert (products["BULK-C1"].current_stock, products["BULK-C2"].current_stock) == (20, 0)
+
+    upload = "﻿sku,name\nBULK-U1,Uploaded\n,Missing sku\n".encode("utf-8")
+    response = _import(run, client, api, headers, files={"file": ("products.csv", upload, "text/csv")})
+    result = response.json()
+    assert (result["inserted"], result["failed"]) == (1, 1)
+    assert result["errors"][0]["row"] == 2
+    assert "BULK-U1" in _products("BULK-U1")
+
+
+def test_malformed_bodies_are_rejected(run, client, api, headers, monkeypatch):
+    assert _import(run, client, api, headers, files={"other": ("x.csv", b"sku,name\n")}).status_code == 400
+    assert _import(run, client, api, headers, json={"sku": "BULK-X"}).status_code == 400
+    assert _import(run, client, api, headers, json=["BULK-X"]).status_code == 400
+    assert _import(run, client, api, headers, content=b"{not json").status_code == 400
+    monkeypatch.setattr(settings, "BULK_MAX_ROWS", 2)
+    assert _import(run, client, api, headers, json=[{}, {}, {}]).status_code == 413
+
+
+def test_rejected_chunk_falls_back_to_per_row_savepoints(client, run):
+    with database.SessionLocal() as db:
+        db.add(Product(sku="BULK-RACE", name="Inserted concurrently"))
+        db.commit()
+        before = db.scalar(select(func.count()).select_from(Product))
+
+    rows = [{"sku": f"BULK-S{i}", "name": f"Savepoint {i}"} for i in range(5)]
+    # Without the unique pre-check, as if another writer inserted the sku
+    # after it ran
+    rows[3]["sku"] = "BULK-RACE"
+
+    async def insert():
+        db = database.SyncSessionAdapter(database.RequestSessionLocal())
+        try:
+            return await bulk_insert(
+                db, model=Product, schema=ProductCreate, rows=rows, actor_id=None,
+                entity_type="product", prepare=with_low_stock_flag, chunk_size=2,
+            )
+        finally:
+            await db.close()
+
+    result = run(insert())
+    assert (result["inserted"], result["failed"]) == (4, 1)
+    assert result["errors"] == [{"row": 4, "errors": [{"field": "sku", "message": "Already exists"}]}]
+    assert set(_products(*(f"BULK-S{i}" for i in range(5)))) == {"BULK-S0", "BULK-S1", "BULK-S2", "BULK-S4"}
+    with database.SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(Product)) == before + 4
@@ -0,0 +1,38 @@
+from fastapi import Request
+from sqlalchemy import text
+
+from app.core import cache, database, deps
+from app.core.config import settings
+
+
+def _request():
+    return Request({"type": "http", "method": "GET", "path": "/cached", "query_string": b"", "headers": []})
+
+
+def test_reader_from_before_a_write_does_not_store(client, run, monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+
+    async def effective_permissions(db, user):
+        return frozenset()
+
+    monkeypatch.setattr(deps, "get_effective_permissions", effective_permissions)
+    renders = []
+
+    @cache.cached_response("test-generations")
+    async def endpoint(request, db, current_user):
+        renders.append(1)
+        return {"renders": len(renders)}
+
+    with database.SessionLocal() as reader, database.SessionLocal() as writer:
+        reader.execute(text("SELECT 1"))  # reader's transaction, and snapshot, begin here
+        writer.execute(text("SELECT 1"))
+        cache.invalidate_on_commit(writer, "test-generations")
+        writer.commit()
+
+        # Served, but not stored: it may have read data from before the commit
+        assert run(endpoint(request=_request(), db=reader, current_user=None)).body == b'{"renders":1}'
+        assert run(endpoint(request=_request(), db=reader, current_user=None)).body == b'{"renders":2}'
+
+        reader.commit()
+        assert run(endpoint(request=_request(), db=reader, current_user=None)).body == b'{"renders":3}'
+        assert run(endpoint(request=_request(), db=reader, current_user=None)).body == b'{"renders":3}'
@@ -0,0 +1,83 @@
+import json
+
+import brotli
+import pytest
+import zstandard
+
+
+@pytest.fixture(scope="module")
+def rows(run, client, api, headers):
+    async def create():
+        for path, rows in (
+            ("/inventory/products/bulk", [{"sku": f"ZIP-{i}", "name": f"Compressed {i}"} for i in range(40)]),
+            ("/crm/customers/bulk", [{"name": f"Compressed customer {i}"} for i in range(200)]),
+        ):
+            response = await client.post(f"{api}{path}", json=rows, headers=headers["admin"])
+            response.raise_for_status()
+
+    run(create())
+
+
+def _get_raw(run, client, url, headers):
+    async def get():
+        async with client.stream("GET", url, headers=headers) as response:
+            return response, b"".join([chunk async for chunk in response.aiter_raw()])
+
+    return run(get())
+
+
+def _zstd_decode(body):
+    # Streamed frames carry no content size, so decode incrementally
+    return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+
+
+@pytest.mark.parametrize("encoding, decode", [
+    ("br", brotli.decompress),
+    ("zstd", _zstd_decode),
+    ("gzip", None),
+])
+def test_compressed_page_decodes(rows, run, client, api, headers, encoding, decode):
+    url = f"{api}/crm/customers?limit=200"
+    plain = run(client.get(url, headers={**headers["admin"], "Accept-Encoding": "identity"}))
+    assert "content-encoding" not in plain.headers
+
+    response, raw = _get_raw(run, client, url, {**headers["admin"], "Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) == len(raw) < len(plain.content)
+    if decode is not None:
+        assert json.loads(decode(raw)) == plain.json()
+
+
+@pytest.mark.parametrize("encoding, decode", [("br", brotli.decompress), ("zstd", _zstd_decode)])
+def test_streamed_export_decodes(rows, run, client, api, headers, encoding, decode):
+    url = f"{api}/crm/customers/export?format=ndjson"
+    plain = run(client.get(url, headers={**headers["admin"], "Accept-Encoding": "identity"}))
+    response, raw = _get_raw(run, client, url, {**headers["admin"], "Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert "content-length" not in response.headers
+    assert decode(raw) == plain.content
+
+
+def test_compressed_etag_is_weak_and_revalidates(rows, run, client, api, headers, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    url = f"{api}/inventory/products?limit=100"
+    plain = run(client.get(url, headers={**headers["admin"], "Accept-Encoding": "identity"}))
+    strong = plain.headers["etag"]
+    assert not strong.startswith("W/")
+
+    compressed = run(client.get(url, headers={**headers["admin"], "Accept-Encoding": "br"}))
+    assert compressed.headers["content-encoding"] == "br"
+    assert compressed.headers["etag"] == "W/" + strong
+
+    # Both the weak tag of the compressed copy and the strong one match
+    for tag in (compressed.headers["etag"], strong):
+        revalidated = run(client.get(url, headers={
+            **headers["admin"], "Accept-Encoding": "br", "If-None-Match": tag,
+        }))
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+    changed = run(client.get(url, headers={**headers["admin"], "If-None-Match": 'W/"stale"'}))
+    assert changed.status_code == 200
@@ -0,0 +1,74 @@
+import pytest
+
+from app.core.config import settings
+
+
+def _create(run, client, api, headers, path, json, **params):
+    return run(client.post(f"{api}{path}", json=json, params=params, headers=headers["admin"]))
+
+
+@pytest.fixture(scope="module")
+def existing(run, client, api, headers):
+    customer = _create(run, client, api, headers, "/crm/customers", {
+        "name": "Kestrel Marine Supplies", "email": "j.doe@gmail.com",
+        "phone": "+94 77 123 4567", "company": "Kestrel Group",
+    })
+    lead = _create(run, client, api, headers, "/crm/leads", {"name": "Wren Okafor", "email": "wren@okafor.example"})
+    assert customer.status_code == lead.status_code == 200
+    assert customer.json()["possible_duplicates"] == lead.json()["possible_duplicates"] == []
+    return {"customer": customer.json(), "lead": lead.json()}
+
+
+@pytest.mark.parametrize("record, reasons", [
+    # Gmail ignores dots and the googlemail domain
+    ({"name": "Jane Doe", "email": "JDoe@googlemail.com"}, ["email"]),
+    # Phones compare on their trailing digits
+    ({"name": "Someone Else", "phone": "077-123 4567"}, ["phone"]),
+    ({"name": "Kestrel Marine Suplies Ltd"}, ["name"]),
+])
+def test_create_reports_possible_duplicates(existing, run, client, api, headers, record, reasons):
+    response = _create(run, client, api, headers, "/crm/customers", record)
+    assert response.status_code == 200, response.text
+    (candidate,) = [c for c in response.json()["possible_duplicates"] if c["entity_id"] == existing["customer"]["id"]]
+    assert candidate["reasons"] == reasons
+    assert candidate["name"] == "Kestrel Marine Supplies"
+
+
+def test_lead_create_reports_possible_duplicates(existing, run, client, api, headers):
+    response = _create(run, client, api, headers, "/crm/leads", {"name": "W. Okafor", "email": "WREN@okafor.example"})
+    assert response.status_code == 200, response.text
+    (candidate,) = response.json()["possible_duplicates"]
+    assert (candidate["entity_id"], candidate["score"]) == (existing["lead"]["id"], 1.0)
+
+
+def test_block_on_create_refuses_strong_matches(existing, run, client, api, headers, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUPE_BLOCK_ON_CREATE", True)
+    record = {"name": "Kestrel Marine", "email": "jdoe@gmail.com"}
+
+    response = _create(run, client, api, headers, "/crm/customers", record)
+    assert response.status_code == 409
+    detail = response.json()["detail"]
+    assert existing["customer"]["id"] in [c["entity_id"] for c in detail["duplicates"]]
+    assert "allow_duplicate" in detail["message"]
+    # Nothing was written
+    assert _create(run, client, api, headers, "/crm/customers", record).status_code == 409
+
+    forced = _create(run, client, api, headers, "/crm/customers", record, allow_duplicate="true")
+    assert forced.status_code == 200
+    assert existing["customer"]["id"] in [c["entity_id"] for c in forced.json()["possible_duplicates"]]
+
+    # A name-only match without a shared company stays below the block score
+    weak = _create(run, client, api, headers, "/crm/customers", {"name": "Kestrel Marine Suplies"})
+    assert weak.status_code == 200
+    assert all(c["score"] < settings.DEDUPE_BLOCK_SCORE for c in weak.json()["possible_duplicates"])
+
+    lead = _create(run, client, api, headers, "/crm/leads", {"name": "Wren O.", "email": "wren@okafor.example"})
+    assert lead.status_code == 409
+
+
+def test_check_can_be_disabled(existing, run, client, api, headers, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUPE_ON_CREATE", False)
+    monkeypatch.setattr(settings, "DEDUPE_BLOCK_ON_CREATE", True)
+    response = _create(run, client, api, headers, "/crm/customers", {"name": "Copy", "email": "j.doe@gmail.com"})
+    assert response.status_code == 200
+    assert response.json()["possible_duplicates"] == []
@@ -0,0 +1,86 @@
+import base64
+
+import pytest
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+
+
+@pytest.fixture(scope="module")
+def customers(run, client, api, headers):
+    rows = [{"name": f"Paged customer {i}"} for i in range(7)]
+    response = run(client.post(f"{api}/crm/customers/bulk", json=rows, headers=headers["admin"]))
+    response.raise_for_status()
+    # Audit entries for the descending list
+    for name in ("Quill", "Rook", "Sable", "Tern"):
+        response = run(client.post(f"{api}/crm/customers", json={"name": name}, headers=headers["admin"]))
+        response.raise_for_status()
+
+
+def _get(run, client, url, headers, **params):
+    return run(client.get(url, params=params, headers=headers["admin"]))
+
+
+def _cursor(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_pages_cover_every_row_once(customers, run, client, api, headers):
+    url = f"{api}/crm/customers"
+    everything = [item["id"] for item in _get(run, client, url, headers, limit=500).json()["items"]]
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3} if cursor is None else {"limit": 3, "cursor": cursor}
+        page = _get(run, client, url, headers, **params).json()
+        assert len(page["items"]) <= 3
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == everything == sorted(everything)
+
+
+def test_descending_pages_continue_below_the_cursor(customers, run, client, api, headers):
+    url = f"{api}/users/audit-logs"
+    first = _get(run, client, url, headers, limit=2).json()
+    second = _get(run, client, url, headers, limit=2, cursor=first["next_cursor"]).json()
+    ids = [item["id"] for item in first["items"] + second["items"]]
+    assert len(ids) == 4
+    assert ids == sorted(set(ids), reverse=True)
+
+
+def test_last_page_has_no_cursor(customers, run, client, api, headers):
+    url = f"{api}/crm/customers"
+    everything = _get(run, client, url, headers, limit=500).json()["items"]
+    last = _get(run, client, url, headers, limit=2, cursor=encode_cursor(None, everything[-3]["id"])).json()
+    assert [item["id"] for item in last["items"]] == [item["id"] for item in everything[-2:]]
+    assert last["next_cursor"] is None
+
+
+def test_limit_is_clamped_to_the_maximum(customers, run, client, api, headers, monkeypatch):
+    monkeypatch.setattr(settings, "PAGE_MAX_LIMIT", 4)
+    page = _get(run, client, f"{api}/crm/customers", headers, limit=1000).json()
+    assert len(page["items"]) == 4
+    assert page["next_cursor"] is not None
+
+
+@pytest.mark.parametrize("limit", [0, -1, "many"])
+def test_invalid_limit_is_rejected(customers, run, client, api, headers, limit):
+    assert _get(run, client, f"{api}/crm/customers", headers, limit=limit).status_code == 422
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    _cursor(b"\xff\xfe"),
+    _cursor(b"{}"),
+    _cursor(b"null"),
+    _cursor(b"[1]"),
+    _cursor(b'[["v",1],"x"]'),
+    _cursor(b'[["v",1],null]'),
+    _cursor(b'[["dt","yesterday"],1]'),
+    _cursor(b'[["v",1],100000000000000000000000]'),
+])
+def test_tampered_cursor_is_a_400(customers, run, client, api, headers, cursor):
+    response = _get(run, client, f"{api}/crm/customers", headers, cursor=cursor)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
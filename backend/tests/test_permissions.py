@@ -0,0 +1,56 @@
+from sqlalchemy import insert, select, update
+
+from app.core.database import engine
+from app.models.core import Role, User, user_roles
+
+
+def _grant_elsewhere(email, role_name):
+    """Give the user a role the way another process would: the rows and
+    permissions_version change, this process's caches are not told."""
+    with engine.begin() as connection:
+        user_id = connection.execute(select(User.id).where(User.email == email)).scalar_one()
+        role_id = connection.execute(select(Role.id).where(Role.name == role_name)).scalar_one()
+        connection.execute(insert(user_roles).values(user_id=user_id, role_id=role_id))
+        connection.execute(
+            update(User).where(User.id == user_id).values(permissions_version=User.permissions_version + 1)
+        )
+
+
+def test_role_change_in_another_process_is_seen(run, client, api, headers):
+    email, password = "no-roles@erp.com", "secret123"
+    response = run(client.post(
+        f"{api}/users/", json={"email": email, "password": password, "is_active": True},
+        headers=headers["admin"],
+    ))
+    assert response.status_code == 200, response.text
+    response = run(client.post(f"{api}/auth/login", data={"username": email, "password": password}))
+    assert response.json()["permissions"] == []
+    user_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Caches the empty permission set
+    assert run(client.get(f"{api}/crm/customers", headers=user_headers)).status_code == 403
+
+    _grant_elsewhere(email, "MANAGER")
+
+    assert run(client.get(f"{api}/crm/customers", headers=user_headers)).status_code == 200
+    response = run(client.post(f"{api}/auth/login", data={"username": email, "password": password}))
+    assert "crm.customers.read" in response.json()["permissions"]
+
+
+def test_stateless_token_claims_match_version(run, client, api, headers, monkeypatch):
+    from jose import jwt
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "AUTH_STATELESS_PRINCIPAL", True)
+    email, password = "stateless@erp.com", "secret123"
+    run(client.post(
+        f"{api}/users/", json={"email": email, "password": password, "is_active": True},
+        headers=headers["admin"],
+    ))
+    run(client.post(f"{api}/auth/login", data={"username": email, "password": password}))
+
+    _grant_elsewhere(email, "EMPLOYEE")
+
+    response = run(client.post(f"{api}/auth/login", data={"username": email, "password": password}))
+    claims = jwt.decode(response.json()["access_token"], settings.SECRET_KEY, algorithms=["HS256"])
+    assert claims["pv"] == 1
+    assert "hr.leave.submit" in claims["perms"]
@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+from benchmarks.endpoints import SCENARIOS, seed_context
+from app.core.query_budget import QueryBudgetExceeded, record_queries
+
+
+@pytest.fixture(scope="module")
+def context(run, client, api, headers):
+    return run(seed_context(client, api, headers["admin"], 1, int(time.time())))
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_query_budget(context, run, client, api, headers, name):
+    method, build = SCENARIOS[name]
+    path, kwargs = build(0, context)
+    kwargs.setdefault("headers", headers["admin"])
+
+    async def call():
+        with record_queries() as log:
+            response = await client.request(method, f"{api}{path}", **kwargs)
+            await response.aread()
+        return response, log
+
+    response, log = run(call())
+    assert response.status_code < 400, response.text
+    # The route, and so the budget, is only resolved by the app: the
+    # middleware reports it in X-Query-Budget (QUERY_DEBUG)
+    budget = response.headers.get("x-query-budget")
+    if budget is None and path.endswith("/bulk"):
+        # Bulk imports run a fixed set of statements per chunk, so their
+        # count grows with the upload and they declare no budget
+        pytest.skip("bulk import, no budget")
+    assert budget is not None, f"{name}: {method} {path} declares no @query_budget"
+    if log.count > int(budget):
+        raise QueryBudgetExceeded(f"{name} ({method} {path})", int(budget), log)
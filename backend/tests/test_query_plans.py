@@ -0,0 +1,20 @@
+import pytest
+
+from benchmarks.query_plans import CHECKS, capture_selects, format_problems, plan_problems, seed_data
+
+
+@pytest.fixture(scope="module")
+def plan_data(run, client, api, headers):
+    run(seed_data(client, api, headers["admin"], 500))
+
+
+@pytest.mark.parametrize("name, method, path, params, user, allowed_scans", CHECKS, ids=[c[0] for c in CHECKS])
+def test_query_plan(plan_data, run, client, api, headers, name, method, path, params, user, allowed_scans):
+    from app.core import database
+
+    with capture_selects(database.engine) as captured:
+        response = run(client.request(method.upper(), f"{api}{path}", params=params, headers=headers[user]))
+    assert response.status_code == 200, response.text
+    with database.engine.connect() as connection:
+        problems = plan_problems(connection, captured, allowed_scans)
+    assert not problems, f"{name}: unexpected scans or sorts\n{format_problems(problems)}"
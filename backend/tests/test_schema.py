@@ -0,0 +1,29 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.database import Base
+from app.core.schema import upgrade_schema
+
+
+def test_upgrade_schema_adds_what_an_older_database_lacks(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(engine)
+    # Roll back to the shape of a database from before these were added
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_products_is_low_stock"))
+        connection.execute(text("ALTER TABLE products DROP COLUMN is_low_stock"))
+        connection.execute(text("ALTER TABLE users DROP COLUMN permissions_version"))
+        connection.execute(text("DROP INDEX ix_leave_requests_employee_id"))
+        connection.execute(text("DROP TABLE stock_alerts"))
+        connection.execute(text("INSERT INTO users (email, password_hash, is_active) VALUES ('old@erp.com', 'x', 1)"))
+
+    added = upgrade_schema(engine)
+
+    assert set(added) == {
+        "stock_alerts", "products.is_low_stock", "users.permissions_version",
+        "ix_products_is_low_stock", "ix_leave_requests_employee_id",
+    }
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT permissions_version FROM users")).scalar_one() == 0
+    assert "ix_products_is_low_stock" in {index["name"] for index in inspect(engine).get_indexes("products")}
+    assert upgrade_schema(engine) == []
+    engine.dispose()
@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import select
+
+from app.core import database
+from app.models.inventory import StockAlert, StockAlertType
+
+
+def _post(run, client, api, headers, path, json):
+    response = run(client.post(f"{api}{path}", json=json, headers=headers["admin"]))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _alerts(product_id):
+    with database.SessionLocal() as db:
+        return [
+            (alert.type, alert.stock, alert.threshold)
+            for alert in db.scalars(select(StockAlert).where(StockAlert.product_id == product_id).order_by(StockAlert.id))
+        ]
+
+
+def _low_stock_ids(run, client, api, headers):
+    response = run(client.get(f"{api}/inventory/low-stock", params={"limit": 500}, headers=headers["admin"]))
+    return {item["id"] for item in response.json()["items"]}
+
+
+def _product(run, client, api, headers, sku, stock, threshold=10):
+    return _post(run, client, api, headers, "/inventory/products", {
+        "sku": sku, "name": sku, "current_stock": stock, "low_stock_threshold": threshold,
+    })
+
+
+def test_single_transactions_alert_on_crossings_only(run, client, api, headers):
+    product = _product(run, client, api, headers, "ALERT-SINGLE", 20)
+    assert product["is_low_stock"] is False
+
+    for type, quantity, low in [
+        ("OUT", 5, False),          # 15
+        ("OUT", 5, True),           # 10: at the threshold counts as low
+        ("OUT", 1, True),           # 9: still low, no second alert
+        ("ADJUSTMENT", 3, False),   # 12
+        ("IN", 1, False),           # 13
+        ("ADJUSTMENT", -13, True),  # 0
+    ]:
+        transaction = _post(run, client, api, headers, "/inventory/transactions",
+                            {"product_id": product["id"], "type": type, "quantity": quantity})
+        assert transaction["product"]["is_low_stock"] is low
+        assert (product["id"] in _low_stock_ids(run, client, api, headers)) is low
+
+    assert _alerts(product["id"]) == [
+        (StockAlertType.LOW, 10, 10),
+        (StockAlertType.RESTORED, 12, 10),
+        (StockAlertType.LOW, 0, 10),
+    ]
+
+
+def test_new_products_are_flagged_without_an_alert(run, client, api, headers):
+    product = _product(run, client, api, headers, "ALERT-NEW", 3)
+    assert product["is_low_stock"] is True
+    assert product["id"] in _low_stock_ids(run, client, api, headers)
+    assert _alerts(product["id"]) == []
+
+
+@pytest.mark.parametrize("sku, lines, expected", [
+    # Net change decides: dipping below and back within a batch is no crossing
+    ("ALERT-DIP", [("OUT", 15), ("IN", 15)], []),
+    ("ALERT-DROP", [("OUT", 4), ("OUT", 4)], [(StockAlertType.LOW, 7, 10)]),
+    ("ALERT-STAY", [("IN", 1)], []),
+])
+def test_batches_alert_on_the_net_crossing(run, client, api, headers, sku, lines, expected):
+    product = _product(run, client, api, headers, sku, 15)
+    _post(run, client, api, headers, "/inventory/transactions/batch", {
+        "lines": [{"product_id": product["id"], "type": type, "quantity": quantity} for type, quantity in lines],
+    })
+    assert _alerts(product["id"]) == expected
+
+
+def test_batch_restores_and_lowers_several_products(run, client, api, headers):
+    low = _product(run, client, api, headers, "ALERT-BATCH-LOW", 2)
+    high = _product(run, client, api, headers, "ALERT-BATCH-HIGH", 11)
+    result = _post(run, client, api, headers, "/inventory/transactions/batch", {"lines": [
+        {"product_id": low["id"], "type": "IN", "quantity": 20},
+        {"product_id": high["id"], "type": "OUT", "quantity": 5},
+    ]})
+    flags = {item["id"]: item["is_low_stock"] for item in result["products"]}
+    assert flags == {low["id"]: False, high["id"]: True}
+    assert _alerts(low["id"]) == [(StockAlertType.RESTORED, 22, 10)]
+    assert _alerts(high["id"]) == [(StockAlertType.LOW, 6, 10)]
+    ids = _low_stock_ids(run, client, api, headers)
+    assert high["id"] in ids and low["id"] not in ids
@@ -0,0 +1,143 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core import database
+from app.models.inventory import InventoryTransaction, Product, StockSnapshot
+from app.services import stock_history
+
+
+def _post(run, client, api, headers, path, json):
+    response = run(client.post(f"{api}{path}", json=json, headers=headers["admin"]))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _snapshots(product_id):
+    with database.SessionLocal() as db:
+        return db.scalars(
+            select(StockSnapshot.stock).where(StockSnapshot.product_id == product_id).order_by(StockSnapshot.taken_at)
+        ).all()
+
+
+def _current_stock(product_id):
+    with database.SessionLocal() as db:
+        return db.get(Product, product_id).current_stock
+
+
+def _backdate(product_ids, delta):
+    with database.SessionLocal() as db:
+        db.execute(
+            update(InventoryTransaction)
+            .where(InventoryTransaction.product_id.in_(product_ids))
+            .values(created_at=InventoryTransaction.created_at - delta)
+        )
+        db.commit()
+
+
+def _take_snapshots(monkeypatch, lag=stock_history.SNAPSHOT_LAG):
+    monkeypatch.setattr(stock_history, "SNAPSHOT_LAG", lag)
+    with database.SessionLocal() as db:
+        return stock_history.take_snapshots(db)
+
+
+def test_snapshots_only_products_that_moved(run, client, api, headers, monkeypatch):
+    moving = _post(run, client, api, headers, "/inventory/products", {"sku": "SNAP-MOVING", "name": "Moving"})
+    idle = _post(run, client, api, headers, "/inventory/products", {"sku": "SNAP-IDLE", "name": "Idle"})
+    unused = _post(run, client, api, headers, "/inventory/products", {"sku": "SNAP-UNUSED", "name": "Unused"})
+    for product in (moving, idle):
+        _post(run, client, api, headers, "/inventory/transactions",
+              {"product_id": product["id"], "type": "IN", "quantity": 5})
+
+    _backdate([moving["id"], idle["id"]], timedelta(hours=1))
+
+    assert _take_snapshots(monkeypatch) >= 2
+    assert _take_snapshots(monkeypatch) == 0
+
+    _post(run, client, api, headers, "/inventory/transactions",
+          {"product_id": moving["id"], "type": "OUT", "quantity": 2})
+    # A negative lag puts taken_at after the movement just created
+    _take_snapshots(monkeypatch, timedelta(seconds=-2))
+    assert _snapshots(moving["id"]) == [5, 3]
+    assert _snapshots(idle["id"]) == [5]
+    assert _snapshots(unused["id"]) == []
+
+
+# Day offset (from DAY0), hour, type, quantity
+LEDGER = [
+    (1, 9, "IN", 10),
+    (2, 14, "OUT", 3),
+    (3, 8, "ADJUSTMENT", -2),
+    (3, 17, "ADJUSTMENT", 5),
+    (5, 11, "OUT", 6),
+    (6, 23, "IN", 1),
+]
+OPENING = 4
+DAY0 = datetime.combine(date.today() - timedelta(days=10), time.min)
+
+
+def _replayed(day):
+    # Stock at the end of DAY0 + day, straight from the ledger
+    stock = OPENING
+    for offset, _, type, quantity in LEDGER:
+        if offset <= day:
+            stock += -quantity if type == "OUT" else quantity
+    return stock
+
+
+@pytest.fixture(scope="module")
+def ledger_product(run, client, api, headers):
+    product = _post(run, client, api, headers, "/inventory/products",
+                    {"sku": "ASOF-1", "name": "As of", "current_stock": OPENING})
+    with database.SessionLocal() as db:
+        db.execute(update(Product).where(Product.id == product["id"]).values(created_at=DAY0))
+        db.commit()
+    for offset, hour, type, quantity in LEDGER:
+        transaction = _post(run, client, api, headers, "/inventory/transactions",
+                            {"product_id": product["id"], "type": type, "quantity": quantity})
+        with database.SessionLocal() as db:
+            db.execute(
+                update(InventoryTransaction)
+                .where(InventoryTransaction.id == transaction["id"])
+                .values(created_at=DAY0 + timedelta(days=offset, hours=hour))
+            )
+            db.commit()
+    return product
+
+
+def _stock_as_of(run, client, api, headers, product_id, day):
+    response = run(client.get(f"{api}/inventory/stock-as-of", headers=headers["admin"], params={
+        "date": (DAY0 + timedelta(days=day)).date().isoformat(), "product_id": product_id,
+    }))
+    assert response.status_code == 200, response.text
+    (item,) = response.json()["items"]
+    return item["stock"]
+
+
+def _snapshot(product_id, taken_at, stock):
+    with database.SessionLocal() as db:
+        db.add(StockSnapshot(product_id=product_id, taken_at=taken_at, stock=stock))
+        db.commit()
+
+
+def test_stock_as_of_matches_the_replayed_ledger(ledger_product, run, client, api, headers):
+    product_id = ledger_product["id"]
+    days = range(-1, 9)
+    # ADJUSTMENT is relative: -2 then +5, not "set to"
+    assert _current_stock(ledger_product["id"]) == _replayed(8) == 4 + 10 - 3 - 2 + 5 - 6 + 1
+
+    # Ledger only: current_stock replayed backwards
+    assert [_stock_as_of(run, client, api, headers, product_id, d) for d in days] == \
+        [0] + [_replayed(d) for d in days[1:]]
+
+    # A snapshot after every day asked for, undone backwards to each day
+    _snapshot(product_id, DAY0 + timedelta(days=9), _replayed(8))
+    assert [_stock_as_of(run, client, api, headers, product_id, d) for d in days[1:]] == \
+        [_replayed(d) for d in days[1:]]
+
+    # A snapshot between the two adjustments: days before it use the later
+    # one, days after replay forward from it
+    _snapshot(product_id, DAY0 + timedelta(days=3, hours=12), _replayed(2) - 2)
+    assert [_stock_as_of(run, client, api, headers, product_id, d) for d in days[1:]] == \
+        [_replayed(d) for d in days[1:]]
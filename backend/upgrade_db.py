@@ -0,0 +1,37 @@
+"""Upgrade an existing database to the current models and backfill.
+
+    python upgrade_db.py
+
+Adds the tables, columns and indexes a database created by an earlier
+version lacks (see app.core.schema), then recomputes the data derived from
+the entity tables: products.is_low_stock, the dashboard counters, the search
+documents and the duplicate keys, as seed.py and seed_scale.py do. Safe to
+re-run; run it with the application stopped.
+"""
+import time
+from app.core.database import SessionLocal, engine
+from app.core.schema import upgrade_schema
+from app.services.counters import reconcile_counters
+from app.services.dedupe import rebuild_duplicate_keys
+from app.services.search import rebuild_search_index
+from app.services.stock import refresh_low_stock_flags
+
+
+def upgrade():
+    added = upgrade_schema(engine)
+    print(f"Schema: added {', '.join(added)}" if added else "Schema: up to date")
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        refresh_low_stock_flags(db)
+        counts = reconcile_counters(db)
+        documents = rebuild_search_index(db)
+        keys = rebuild_duplicate_keys(db)
+        print(f"Backfilled low-stock flags, counters {counts}, {documents} search documents, "
+              f"duplicate keys {keys} in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    upgrade()
@@ -0,0 +1,37 @@
+import { useCallback, useState } from 'react';
+import api from './axios';
+
+export const PAGE_SIZE = 50;
+
+// List endpoints return keyset pages ({ items, next_cursor }); pass
+// next_cursor back as cursor to get the page after it.
+export const fetchPage = async (url, { cursor, limit = PAGE_SIZE, ...params } = {}) => {
+  const res = await api.get(url, {
+    params: { ...params, limit, ...(cursor ? { cursor } : {}) },
+  });
+  return res.data;
+};
+
+// One page of a list at a time: reload() fetches the first page again,
+// loadMore() appends the next one while hasMore is true.
+export const usePagedList = (url) => {
+  const [items, setItems] = useState([]);
+  const [cursor, setCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
+
+  const load = useCallback(async (after) => {
+    setLoading(true);
+    try {
+      const page = await fetchPage(url, { cursor: after });
+      setItems((current) => (after ? [...current, ...page.items] : page.items));
+      setCursor(page.next_cursor);
+    } finally {
+      setLoading(false);
+    }
+  }, [url]);
+
+  const reload = useCallback(() => load(null), [load]);
+  const loadMore = useCallback(() => load(cursor), [load, cursor]);
+
+  return { items, hasMore: Boolean(cursor), loading, reload, loadMore };
+};
@@ -0,0 +1,21 @@
+import React from 'react';
+import { ChevronDown } from 'lucide-react';
+
+const LoadMore = ({ hasMore, loading, onClick }) => {
+    if (!hasMore) return null;
+
+    return (
+        <div className="flex justify-center">
+            <button
+                className="glass px-6 py-2.5 flex items-center gap-2 text-slate-300 font-bold text-sm disabled:opacity-50"
+                onClick={onClick}
+                disabled={loading}
+            >
+                <ChevronDown size={16} />
+                {loading ? 'Loading...' : 'Load more'}
+            </button>
+        </div>
+    );
+};
+
+export default LoadMore;
@@ -1,20 +1,21 @@
-import React, { useEffect, useState } from 'react';
-import api from '../api/axios';
+import React, { useEffect } from 'react';
+import { usePagedList } from '../api/pagination';
 import { ShieldAlert, Terminal, Clock, Fingerprint } from 'lucide-react';
 import toast from 'react-hot-toast';
+import LoadMore from '../components/LoadMore';
 
 const AuditLog = () => {
-    const [logs, setLogs] = useState([]);
+    const { items: logs, hasMore, loading, reload, loadMore } = usePagedList('/users/audit-logs');
+
+    const fetchLogs = async (next = false) => {
+        try {
+            await (next ? loadMore() : reload());
+        } catch (err) {
+            toast.error('Failed to fetch audit logs');
+        }
+    };
 
     useEffect(() => {
-        const fetchLogs = async () => {
-            try {
-                const res = await api.get('/users/audit-logs');
-                setLogs(res.data);
-            } catch (err) {
-                toast.error('Failed to fetch audit logs');
-            }
-        };
         fetchLogs();
     }, []);
 
@@ -79,6 +80,8 @@ const AuditLog = () => {
                     )}
                 </div>
             </div>
+
+            <LoadMore hasMore={hasMore} loading={loading} onClick={() => fetchLogs(true)} />
         </div>
     );
 };
@@ -1,10 +1,12 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api/axios';
+import { usePagedList } from '../api/pagination';
 import { Users, UserPlus, Search, Filter, Mail, Phone, MapPin } from 'lucide-react';
 import toast from 'react-hot-toast';
+import LoadMore from '../components/LoadMore';
 
 const Customers = () => {
-    const [customers, setCustomers] = useState([]);
+    const { items: customers, hasMore, loading, reload, loadMore } = usePagedList('/crm/customers');
     const [showModal, setShowModal] = useState(false);
     const [newCustomer, setNewCustomer] = useState({
         full_name: '',
@@ -13,10 +15,9 @@ const Customers = () => {
         address: ''
     });
 
-    const fetchCustomers = async () => {
+    const fetchCustomers = async (next = false) => {
         try {
-            const res = await api.get('/crm/customers');
-            setCustomers(res.data);
+            await (next ? loadMore() : reload());
         } catch (err) {
             toast.error('Failed to fetch customers');
         }
@@ -29,8 +30,12 @@ const Customers = () => {
     const handleCreate = async (e) => {
         e.preventDefault();
         try {
-            await api.post('/crm/customers', newCustomer);
+            const res = await api.post('/crm/customers', newCustomer);
             toast.success('Customer registered successfully');
+            const duplicates = res.data.possible_duplicates || [];
+            if (duplicates.length) {
+                toast(`Possible duplicate of existing customer: ${duplicates.map((d) => d.name).join(', ')}`, { icon: '⚠️' });
+            }
             setShowModal(false);
             setNewCustomer({ full_name: '', email: '', phone: '', address: '' });
             fetchCustomers();
@@ -131,6 +136,8 @@ const Customers = () => {
                 </div>
             </div>
 
+            <LoadMore hasMore={hasMore} loading={loading} onClick={() => fetchCustomers(true)} />
+
             {showModal && (
                 <div className="fixed inset-0 z-50 flex items-center justify-center p-4">
                     <div className="absolute inset-0 bg-slate-950/80 backdrop-blur-md" onClick={() => setShowModal(false)} />
@@ -1,27 +1,37 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api/axios';
+import { fetchPage, usePagedList } from '../api/pagination';
 import { UserPlus, Building, Mail, Briefcase, Search, Filter } from 'lucide-react';
 import toast from 'react-hot-toast';
+import LoadMore from '../components/LoadMore';
 
 const Employees = () => {
-    const [employees, setEmployees] = useState([]);
+    const { items: employees, hasMore, loading, reload, loadMore } = usePagedList('/hr/employees');
     const [departments, setDepartments] = useState([]);
     const [showModal, setShowModal] = useState(false);
     const [newEmp, setNewEmp] = useState({ full_name: '', email: '', department_id: '', title: '', status: 'ACTIVE' });
 
     const fetchData = async () => {
         try {
-            const [empRes, deptRes] = await Promise.all([
-                api.get('/hr/employees'),
-                api.get('/hr/departments')
+            // Departments fill the select below; one page at the largest limit
+            const [, depts] = await Promise.all([
+                reload(),
+                fetchPage('/hr/departments', { limit: 500 })
             ]);
-            setEmployees(empRes.data);
-            setDepartments(deptRes.data);
+            setDepartments(depts.items);
         } catch (err) {
             toast.error('Failed to fetch data');
         }
     };
 
+    const fetchMoreEmployees = async () => {
+        try {
+            await loadMore();
+        } catch (err) {
+            toast.error('Failed to fetch employees');
+        }
+    };
+
     useEffect(() => {
         fetchData();
     }, []);
@@ -124,6 +134,8 @@ const Employees = () => {
                 </div>
             </div>
 
+            <LoadMore hasMore={hasMore} loading={loading} onClick={fetchMoreEmployees} />
+
             {showModal && (
                 <div className="fixed inset-0 z-50 flex items-center justify-center p-4">
                     <div className="absolute inset-0 bg-slate-950/80 backdrop-blur-md" onClick={() => setShowModal(false)} />
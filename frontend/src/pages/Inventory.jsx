@@ -1,17 +1,18 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api/axios';
+import { usePagedList } from '../api/pagination';
 import { Package, Plus, AlertTriangle, Search, Filter, ArrowRight } from 'lucide-react';
 import toast from 'react-hot-toast';
+import LoadMore from '../components/LoadMore';
 
 const Inventory = () => {
-    const [products, setProducts] = useState([]);
+    const { items: products, hasMore, loading, reload, loadMore } = usePagedList('/inventory/products');
     const [showModal, setShowModal] = useState(false);
     const [newProduct, setNewProduct] = useState({ sku: '', name: '', description: '', current_stock: 0, low_stock_threshold: 10, unit: 'pcs' });
 
-    const fetchProducts = async () => {
+    const fetchProducts = async (next = false) => {
         try {
-            const res = await api.get('/inventory/products');
-            setProducts(res.data);
+            await (next ? loadMore() : reload());
         } catch (err) {
             toast.error('Failed to fetch products');
         }
@@ -114,6 +115,8 @@ const Inventory = () => {
                 </div>
             </div>
 
+            <LoadMore hasMore={hasMore} loading={loading} onClick={() => fetchProducts(true)} />
+
             {showModal && (
                 <div className="fixed inset-0 z-50 flex items-center justify-center p-4">
                     <div className="absolute inset-0 bg-slate-950/80 backdrop-blur-md" onClick={() => setShowModal(false)} />
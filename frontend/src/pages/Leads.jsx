@@ -1,10 +1,12 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api/axios';
+import { usePagedList } from '../api/pagination';
 import { Target, Plus, Search, Filter, MessageSquare, Briefcase, Zap } from 'lucide-react';
 import toast from 'react-hot-toast';
+import LoadMore from '../components/LoadMore';
 
 const Leads = () => {
-    const [leads, setLeads] = useState([]);
+    const { items: leads, hasMore, loading, reload, loadMore } = usePagedList('/crm/leads');
     const [showModal, setShowModal] = useState(false);
     const [newLead, setNewLead] = useState({
         full_name: '',
@@ -14,10 +16,9 @@ const Leads = () => {
         status: 'NEW'
     });
 
-    const fetchLeads = async () => {
+    const fetchLeads = async (next = false) => {
         try {
-            const res = await api.get('/crm/leads');
-            setLeads(res.data);
+            await (next ? loadMore() : reload());
         } catch (err) {
             toast.error('Failed to fetch leads');
         }
@@ -30,8 +31,12 @@ const Leads = () => {
     const handleCreate = async (e) => {
         e.preventDefault();
         try {
-            await api.post('/crm/leads', newLead);
+            const res = await api.post('/crm/leads', newLead);
             toast.success('Lead captured successfully');
+            const duplicates = res.data.possible_duplicates || [];
+            if (duplicates.length) {
+                toast(`Possible duplicate of existing lead: ${duplicates.map((d) => d.name).join(', ')}`, { icon: '⚠️' });
+            }
             setShowModal(false);
             setNewLead({ full_name: '', email: '', phone: '', source: '', status: 'NEW' });
             fetchLeads();
@@ -121,6 +126,8 @@ const Leads = () => {
                 )}
             </div>
 
+            <LoadMore hasMore={hasMore} loading={loading} onClick={() => fetchLeads(true)} />
+
             {showModal && (
                 <div className="fixed inset-0 z-50 flex items-center justify-center p-4">
                     <div className="absolute inset-0 bg-slate-950/80 backdrop-blur-md" onClick={() => setShowModal(false)} />
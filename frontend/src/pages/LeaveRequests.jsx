@@ -1,19 +1,20 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api/axios';
+import { usePagedList } from '../api/pagination';
 import { useAuth } from '../auth/AuthContext';
 import { Calendar, FileText, Check, X, Clock, Plus } from 'lucide-react';
 import toast from 'react-hot-toast';
+import LoadMore from '../components/LoadMore';
 
 const LeaveRequests = () => {
-    const [requests, setRequests] = useState([]);
+    const { items: requests, hasMore, loading, reload, loadMore } = usePagedList('/hr/leave-requests');
     const [showModal, setShowModal] = useState(false);
-    const { user, hasPermission } = useAuth();
+    const { hasPermission } = useAuth();
     const [newRequest, setNewRequest] = useState({ start_date: '', end_date: '', reason: '', employee_id: null });
 
-    const fetchRequests = async () => {
+    const fetchRequests = async (next = false) => {
         try {
-            const res = await api.get('/hr/leave-requests');
-            setRequests(res.data);
+            await (next ? loadMore() : reload());
         } catch (err) {
             toast.error('Failed to fetch leave requests');
         }
@@ -36,9 +37,12 @@ const LeaveRequests = () => {
     const handleSubmit = async (e) => {
         e.preventDefault();
         try {
-            const empRes = await api.get('/hr/employees');
-            const employee = empRes.data.find(e => e.user_id === user.id);
-            if (!employee) throw new Error('No employee record linked to your user account');
+            const employee = await api.get('/hr/employees/me')
+                .then(res => res.data)
+                .catch(err => {
+                    if (err.response?.status === 404) throw new Error('No employee record linked to your user account');
+                    throw err;
+                });
 
             await api.post('/hr/leave-requests', { ...newRequest, employee_id: employee.id });
             toast.success('Leave request submitted to management');
@@ -135,6 +139,8 @@ const LeaveRequests = () => {
                 </div>
             </div>
 
+            <LoadMore hasMore={hasMore} loading={loading} onClick={() => fetchRequests(true)} />
+
             {showModal && (
                 <div className="fixed inset-0 z-50 flex items-center justify-center p-4">
                     <div className="absolute inset-0 bg-slate-950/80 backdrop-blur-md" onClick={() => setShowModal(false)} />
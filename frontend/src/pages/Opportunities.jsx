@@ -1,10 +1,12 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api/axios';
+import { usePagedList } from '../api/pagination';
 import { DollarSign, Plus, Search, Filter, Calendar, TrendingUp, ShieldCheck } from 'lucide-react';
 import toast from 'react-hot-toast';
+import LoadMore from '../components/LoadMore';
 
 const Opportunities = () => {
-    const [opportunities, setOpportunities] = useState([]);
+    const { items: opportunities, hasMore, loading, reload, loadMore } = usePagedList('/crm/opportunities');
     const [showModal, setShowModal] = useState(false);
     const [newOpp, setNewOpp] = useState({
         title: '',
@@ -14,10 +16,9 @@ const Opportunities = () => {
         customer_id: null
     });
 
-    const fetchOpportunities = async () => {
+    const fetchOpportunities = async (next = false) => {
         try {
-            const res = await api.get('/crm/opportunities');
-            setOpportunities(res.data);
+            await (next ? loadMore() : reload());
         } catch (err) {
             toast.error('Failed to fetch opportunities');
         }
@@ -69,7 +70,7 @@ const Opportunities = () => {
                 </div>
                 <div className="glass p-6 border-l-4 border-amber-500">
                     <div className="text-[10px] font-bold text-slate-500 uppercase tracking-[0.2em] mb-1">Active Negotiations</div>
-                    <div className="text-3xl font-extrabold text-white">{opportunities.length} Contracts</div>
+                    <div className="text-3xl font-extrabold text-white">{opportunities.length}{hasMore ? '+' : ''} Contracts</div>
                 </div>
                 <div className="glass p-6 border-l-4 border-indigo-500">
                     <div className="text-[10px] font-bold text-slate-500 uppercase tracking-[0.2em] mb-1">Conversion Velocity</div>
@@ -127,6 +128,8 @@ const Opportunities = () => {
                 </div>
             </div>
 
+            <LoadMore hasMore={hasMore} loading={loading} onClick={() => fetchOpportunities(true)} />
+
             {showModal && (
                 <div className="fixed inset-0 z-50 flex items-center justify-center p-4">
                     <div className="absolute inset-0 bg-slate-950/80 backdrop-blur-md" onClick={() => setShowModal(false)} />
@@ -1,17 +1,18 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api/axios';
+import { usePagedList } from '../api/pagination';
 import { UserPlus, Shield, Mail, CheckCircle, XCircle } from 'lucide-react';
 import toast from 'react-hot-toast';
+import LoadMore from '../components/LoadMore';
 
 const Users = () => {
-    const [users, setUsers] = useState([]);
+    const { items: users, hasMore, loading, reload, loadMore } = usePagedList('/users/');
     const [showModal, setShowModal] = useState(false);
     const [newUser, setNewUser] = useState({ email: '', password: '', is_active: true });
 
-    const fetchUsers = async () => {
+    const fetchUsers = async (next = false) => {
         try {
-            const res = await api.get('/users/');
-            setUsers(res.data);
+            await (next ? loadMore() : reload());
         } catch (err) {
             toast.error('Failed to fetch users');
         }
@@ -110,6 +111,8 @@ const Users = () => {
                 </div>
             </div>
 
+            <LoadMore hasMore={hasMore} loading={loading} onClick={() => fetchUsers(true)} />
+
             {showModal && (
                 <div className="fixed inset-0 z-50 flex items-center justify-center p-4">
                     <div className="absolute inset-0 bg-slate-950/80 backdrop-blur-sm" onClick={() => setShowModal(false)} />